@@ -1,5 +1,7 @@
 from flask import Flask, render_template
-from routes import product, reservation, ops, finance
+from routes import product, reservation, ops, finance, system, jobs, quotation
+from services.job_service import job_queue
+from services.triage_service import sentiment_triage
 import os
 
 app = Flask(__name__)
@@ -9,6 +11,26 @@ app.register_blueprint(product.bp)
 app.register_blueprint(reservation.bp)
 app.register_blueprint(ops.bp)
 app.register_blueprint(finance.bp)
+app.register_blueprint(system.bp)
+app.register_blueprint(jobs.bp)
+app.register_blueprint(quotation.bp)
+
+def start_background_workers():
+    """
+    작업 큐 워커 / 카톡 감시 스레드 시작 (여러 번 불러도 한 번만 뜸)
+    - import 시점이 아니라 요청을 받는 서버 프로세스에서만 시작: PDF 파싱 프로세스 풀(spawn)이나 app을 import 하는
+      스크립트/벤치마크는 모듈을 다시 import 하므로, 거기서 작업 스레드가 떠서 jobs.db 작업을 가져가면 안 됨
+    """
+    # 재시작 전에 남아 있던 견적서 작업부터 이어서 처리
+    job_queue.start()
+    # TRIAGE_WATCH=1 이면 카톡 대화 폴더를 감시하며 새 고객 메시지의 불가(부정) 여부를 바로 분류
+    if os.environ.get('TRIAGE_WATCH') == '1':
+        sentiment_triage.watch()
+
+@app.before_request
+def _ensure_background_workers():
+    # gunicorn 등 __main__ 없이 뜨는 워커는 첫 요청에서 시작
+    start_background_workers()
 
 @app.route('/')
 def index():
@@ -104,4 +126,8 @@ if __name__ == '__main__':
         os.makedirs(model_dir)
         print(f"Created missing model directory: {model_dir}")
 
+    # debug 리로더: 감시만 하는 부모 프로세스가 아니라 실제 서버 자식 프로세스에서 바로 시작
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
+
     app.run(host='0.0.0.0', port=7878, debug=True)
@@ -0,0 +1,75 @@
+import os
+import random
+import re
+import tempfile
+import time
+from benchmark_master_lookup import make_masters, variant
+from services.gazetteer_service import Gazetteer
+from services.master_service import MasterCatalog, normalize_name
+
+# ======================================================
+# [벤치마크] 호텔/골프장/도시 사전 매칭 (Aho-Corasick) - 문서 길이에 비례하는지 + 이름별 검색과 비교
+# 샘플: 합성 마스터(benchmark_master_lookup과 같은 생성기) + 일정 문장 사이에 표기를 바꾼 이름을 섞은 문서
+# 실행: python benchmark_gazetteer.py   (임시 DB 사용, 실제 MASTER_DB는 건드리지 않음)
+# ======================================================
+DOC_CHARS = [10_000, 50_000, 100_000, 200_000]
+FILLER = ["1일차 인천 출발 KE463 09:00, 현지 도착 후 가이드 미팅", "조식 후 라운드 (18홀, 카트비 포함)",
+          "석식 후 호텔 휴식, 자유 일정", "요금 1,590,000원 (유류할증료 별도)", "※ 취소 시 규정에 따라 위약금 발생"]
+SEED = 0
+
+
+def make_document(rng, hotels, golf, chars):
+    parts, size = [], 0
+    while size < chars:
+        line = rng.choice(FILLER)
+        if rng.random() < 0.5:
+            kind, names = ("hotel", hotels) if rng.random() < 0.5 else ("golf", golf)
+            line = f"{variant(rng.choice(names), kind, rng)} {line}"
+        parts.append(line)
+        size += len(line) + 1
+    return "\n".join(parts)[:chars]
+
+
+def naive_find(names, text):
+    """ 비교용: 이름마다 정규화 문서를 따로 검색 (이름 수 x 문서 길이) """
+    stream = re.sub(r'[^\w]+', '', text.lower())
+    return sum(stream.count(name) for name in names)
+
+
+def main():
+    rng = random.Random(SEED)
+    hotels, golf = make_masters(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = MasterCatalog(os.path.join(tmp, "master.db"))
+        for name in hotels: catalog.register("hotel", name_kr=name)
+        for name in golf: catalog.register("golf", name_kr=name)
+        gazetteer = Gazetteer(catalog)
+        start = time.perf_counter()
+        gazetteer.sync()
+        print(f"사전 구성: {gazetteer.get_stats()['patterns']}개 이름 {time.perf_counter() - start:.2f}s")
+
+        names = [normalize_name(name) for name in hotels + golf]
+        print(f"\n{'문서(자)':>10}{'매칭':>8}{'사전(ms)':>10}{'us/자':>8}{'이름별(ms)':>12}")
+        for chars in DOC_CHARS:
+            text = make_document(rng, hotels, golf, chars)
+            start = time.perf_counter()
+            spans = gazetteer.find(text)
+            elapsed = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            naive_find(names, text)
+            naive = (time.perf_counter() - start) * 1000
+            print(f"{chars:>10,}{len(spans):>8}{elapsed:>10.1f}{elapsed * 1000 / chars:>8.2f}{naive:>12.1f}")
+
+        # 증분 갱신: 새 이름 등록 후 첫 검색까지 (보조 오토마톤만 다시 구성)
+        text = make_document(rng, hotels, golf, 10_000)
+        timings = []
+        for i in range(20):
+            catalog.register("golf", name_kr=f"신규 골프장 {i}")
+            start = time.perf_counter()
+            gazetteer.find(text)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"\n새 이름 등록 직후 검색(1만 자): 평균 {sum(timings) / len(timings):.1f}ms, {gazetteer.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from services.master_service import MasterCatalog
+
+# ======================================================
+# [벤치마크] 견적서에서 추출한 호텔/골프장 이름 -> 마스터 레코드 매칭 시간 + 중복 등록 여부
+# 샘플: 합성 마스터(호텔 HOTELS개, 골프장 GOLF_COURSES개) + 표기를 조금씩 바꾼 견적서 QUOTATIONS건
+# 실행: python benchmark_master_lookup.py   (임시 DB 사용, 실제 MASTER_DB는 건드리지 않음)
+# ======================================================
+HOTELS = 2000
+GOLF_COURSES = 1000
+QUOTATIONS = 5000
+SEED = 0
+
+PREFIXES = ["그랜드", "로얄", "오션", "선셋", "하버", "팜", "시티", "마리나", "가든", "스카이", "레이크", "힐사이드"]
+BRANDS = ["하얏트", "힐튼", "쉐라톤", "노보텔", "머큐어", "이비스", "풀만", "인터컨티넨탈", "메리어트", "롯데", "신라", "산스이"]
+CITIES = ["다낭", "나트랑", "세부", "오키나와", "치앙마이", "방콕", "클락", "후쿠오카", "미야코지마", "보홀"]
+GOLF_WORDS = ["레가시", "파노라마", "쿤탄", "노스힐", "몽고메리", "카누차", "알펜시아", "팜힐스", "선밸리", "마운틴뷰"]
+
+
+def make_masters(rng):
+    hotels, golf = set(), set()
+    while len(hotels) < HOTELS:
+        hotels.add(f"{rng.choice(BRANDS)} {rng.choice(PREFIXES)} {rng.choice(CITIES)} {rng.randint(1, 40)}")
+    while len(golf) < GOLF_COURSES:
+        golf.add(f"{rng.choice(GOLF_WORDS)} {rng.choice(PREFIXES)} {rng.choice(CITIES)} {rng.randint(1, 20)}")
+    return sorted(hotels), sorted(golf)
+
+
+def variant(name, kind, rng):
+    """ 견적서마다 다른 표기: 공백 제거, 접미어(호텔/CC/골프클럽), 괄호 지역, 오타 한 글자 """
+    choice = rng.random()
+    if choice < 0.3: return name
+    if choice < 0.5: return name.replace(" ", "")
+    if choice < 0.7: return f"{name} {'호텔' if kind == 'hotel' else rng.choice(['CC', '골프클럽', 'Golf Club'])}"
+    if choice < 0.85: return f"{name} ({rng.choice(CITIES)})" if rng.random() < 0.2 else f"  {name}  "
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    chars.insert(i, chars[i])
+    return "".join(chars)
+
+
+def timed(catalog, extracted):
+    timings = []
+    for kind, name in extracted:
+        start = time.perf_counter()
+        catalog.resolve(kind, name, create=True)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return np.array(timings)
+
+
+def main():
+    rng = random.Random(SEED)
+    hotels, golf = make_masters(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = MasterCatalog(os.path.join(tmp, "master.db"))
+        start = time.perf_counter()
+        for name in hotels: catalog.register("hotel", name_kr=name)
+        for name in golf: catalog.register("golf", name_kr=name)
+        print(f"마스터 등록: {HOTELS + GOLF_COURSES}건 {time.perf_counter() - start:.1f}s")
+
+        extracted = [("hotel", variant(rng.choice(hotels), "hotel", rng)) if rng.random() < 0.6
+                     else ("golf", variant(rng.choice(golf), "golf", rng)) for _ in range(QUOTATIONS)]
+
+        # 1회차: 퍼지 매칭 + 못 찾은 이름 미확인 등록 / 2회차: 같은 이름 재등장 (캐시)
+        before = catalog.get_stats()
+        first = timed(catalog, extracted)
+        after = catalog.get_stats()
+        second = timed(catalog, extracted)
+
+        # 캐시 없이 정확 일치/퍼지 색인 경로만
+        catalog._cache.clear()
+        catalog.stats = dict.fromkeys(catalog.stats, 0)
+        uncached = timed(catalog, extracted)
+
+        created = after["hotels"] + after["golf_courses"] - before["hotels"] - before["golf_courses"]
+        print(f"\n{'구간':<22}{'p50(us)':>10}{'p95(us)':>10}{'max(us)':>12}")
+        for label, values in [("1회차 (퍼지+새 등록)", first), ("2회차 (같은 이름 재등장)", second), ("캐시 없이 (색인)", uncached)]:
+            print(f"{label:<22}{np.percentile(values, 50):>10.1f}{np.percentile(values, 95):>10.1f}{values.max():>12.0f}")
+        print(f"\n1회차 매칭: 정확 {after['exact'] - before['exact']}, 퍼지 {after['fuzzy'] - before['fuzzy']}, "
+              f"미확인 {after['unverified'] - before['unverified']}, 새로 등록 {created} / {QUOTATIONS}건")
+        print(f"캐시 없이 재실행: {catalog.stats}")
+
+
+if __name__ == "__main__":
+    main()
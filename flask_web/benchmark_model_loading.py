@@ -0,0 +1,63 @@
+import multiprocessing as mp
+import os
+import time
+
+# ======================================================
+# [벤치마크] 워커 N개가 같은 NER 모델을 로드할 때 로드 시간 / 워커별 RSS, PSS
+# - copy: 가중치를 프로세스 메모리로 복사해 두는 방식 (예전 transformers의 from_pretrained, torch.load 등)
+# - from_pretrained(MODEL_MMAP=0): 설치된 transformers 그대로 (버전에 따라 safetensors를 자체 매핑하기도 함)
+# - mmap(MODEL_MMAP=1): model.safetensors 매핑, 워커끼리 페이지 캐시 공유 (PSS = 공유분을 워커 수로 나눈 실제 부담)
+# 각 워커는 로드 후 한 번 추론(가중치 페이지를 실제로 읽음)하고, 전원이 로드를 마친 상태에서 메모리를 잼
+# 실행: python benchmark_model_loading.py   (MODEL_DIR/koelectra_ner 또는 BENCH_MODEL 폴더)
+# ======================================================
+WORKERS = int(os.environ.get('BENCH_WORKERS', 8))
+MODEL_PATH = os.environ.get('BENCH_MODEL', os.path.join(
+    os.environ.get('MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models')), 'koelectra_ner'))
+
+
+def worker(mode, barrier, results):
+    # 환경변수는 서비스 모듈을 import 하기 전에 (spawn이라 워커마다 새 인터프리터)
+    os.environ['MODEL_MMAP'] = '1' if mode == 'mmap' else '0'
+    import torch
+    from transformers import ElectraForTokenClassification
+    from services.model_loader import load_pretrained, process_memory
+    torch.set_num_threads(1)
+
+    start = time.perf_counter()
+    model = load_pretrained(ElectraForTokenClassification, MODEL_PATH)
+    if mode == 'copy':
+        for param in model.parameters():
+            param.data = param.data.clone()
+    load_seconds = time.perf_counter() - start
+    with torch.no_grad():
+        model(input_ids=torch.ones(1, 64, dtype=torch.long))
+
+    barrier.wait()
+    results.put(dict(process_memory(), load_seconds=load_seconds))
+    barrier.wait()
+
+
+def run(mode):
+    ctx = mp.get_context('spawn')
+    barrier, results = ctx.Barrier(WORKERS), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(mode, barrier, results)) for _ in range(WORKERS)]
+    for p in processes: p.start()
+    stats = [results.get() for _ in processes]
+    for p in processes: p.join()
+    return stats
+
+
+def main():
+    weights = os.path.join(MODEL_PATH, 'model.safetensors')
+    print(f"모델: {MODEL_PATH} ({os.path.getsize(weights) / 1024 / 1024:.0f}MB), 워커 {WORKERS}개")
+    print(f"\n{'방식':<16}{'로드 p50(s)':>12}{'RSS/워커(MB)':>14}{'PSS/워커(MB)':>14}{'공유(MB)':>10}{'PSS 합계(MB)':>14}")
+    for mode in ['copy', 'from_pretrained', 'mmap']:
+        stats = run(mode)
+        loads = sorted(s["load_seconds"] for s in stats)
+        avg = lambda key: sum(s.get(key, 0) for s in stats) / len(stats)
+        print(f"{mode:<16}{loads[len(loads) // 2]:>12.3f}{avg('rss_mb'):>14.0f}{avg('pss_mb'):>14.0f}"
+              f"{avg('shared_mb'):>10.0f}{sum(s.get('pss_mb', 0) for s in stats):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import csv
+import os
+import time
+import torch
+from transformers import AutoTokenizer, ElectraConfig, ElectraForSequenceClassification, ElectraForTokenClassification
+from services.multitask_model import ElectraForMultiTask
+from train_multitask import SENTIMENT_DATA_FILE
+from train_ner import LABEL_LIST
+
+# ======================================================
+# [벤치마크] 랜드사 답변 태깅 + 3중 분류: 모델 두 개(NER, 분류) vs 멀티태스크 모델 하나 (인코더 한 번)
+# 샘플: 3중분류.csv 메시지 전체, KoELECTRA-base 크기 모델(가중치는 랜덤 - 연산량만 비교)
+# 실행: python benchmark_multitask.py   (MODEL_DIR/tokenizer 사용)
+# ======================================================
+MODEL_DIR = os.environ.get('MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+BATCH_SIZE = 16
+REPEAT = 3
+CONFIG = dict(embedding_size=768, hidden_size=768, num_hidden_layers=12, num_attention_heads=12,
+              intermediate_size=3072)
+
+
+def batches(tokenizer, texts):
+    texts = sorted(texts, key=len)
+    return [tokenizer(texts[i:i + BATCH_SIZE], padding=True, truncation=True, max_length=512, return_tensors="pt")
+            for i in range(0, len(texts), BATCH_SIZE)]
+
+
+def timed(fn, inputs):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        with torch.no_grad():
+            for batch in inputs: fn(batch)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(os.path.join(MODEL_DIR, 'tokenizer'))
+    with open(SENTIMENT_DATA_FILE, 'r', encoding='utf-8-sig') as f:
+        texts = [row['text'] for row in csv.DictReader(f) if row.get('text')]
+    inputs = batches(tokenizer, texts)
+    CONFIG["vocab_size"] = len(tokenizer)
+
+    ner = ElectraForTokenClassification(ElectraConfig(**CONFIG, num_labels=len(LABEL_LIST))).eval()
+    sentiment = ElectraForSequenceClassification(ElectraConfig(**CONFIG, num_labels=3)).eval()
+    multitask = ElectraForMultiTask(ElectraConfig(**CONFIG, num_labels=len(LABEL_LIST), num_sentiment_labels=3)).eval()
+
+    def separate(batch):
+        ner(**batch)
+        sentiment(**batch)
+
+    two_models = timed(separate, inputs)
+    shared = timed(lambda batch: multitask(**batch), inputs)
+    print(f"메시지 {len(texts)}건, 배치 {BATCH_SIZE}, torch 스레드 {torch.get_num_threads()}")
+    print(f"  모델 두 개 (NER + 분류): {two_models:.2f}s")
+    print(f"  멀티태스크 (인코더 한 번): {shared:.2f}s  -> {shared / two_models:.0%}")
+
+
+if __name__ == "__main__":
+    main()
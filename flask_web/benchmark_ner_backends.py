@@ -0,0 +1,121 @@
+import glob
+import json
+import os
+import sys
+import time
+import torch
+from services.ai_service import ai_service
+from services.ner_backends import load_ner_model, NER_BACKENDS
+from services.parsing_service import parsing_manager
+
+# ======================================================
+# [패리티 검사 + 벤치마크] NER 백엔드(torch fp32 / int8 / onnx) 비교
+# - 태그 일치율: fp32 모델과 같은 토큰에 같은 BIO 태그를 예측한 비율
+# - 엔티티 일치율: 문장별로 복원한 {태그: [문자열]} 결과가 fp32와 완전히 같은 비율
+# - 태그 일치율이 PARITY_MIN_AGREEMENT 미만인 백엔드가 있으면 종료 코드 1
+# 실행: python benchmark_ner_backends.py
+# ======================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(os.path.dirname(BASE_DIR), 'ERP 필요한 데이터')
+DATA_FILE = os.path.join(BASE_DIR, 'train_data.json')
+PARITY_MIN_AGREEMENT = float(os.environ.get('PARITY_MIN_AGREEMENT', 0.98))
+BATCH_SIZE = 16
+REPEAT = 3
+
+
+def load_samples():
+    """ 학습 문장 + 실제 랜드사 문서 조각(페이지/시트) """
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        texts = [item['text'] for item in json.load(f)]
+    for pattern in ['*.pdf', '*.docx', '*.xlsx']:
+        for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, '7. *', '**', pattern), recursive=True))[:3]:
+            texts.extend(chunk['text'] for chunk in parsing_manager.iter_chunks(path))
+    return texts
+
+
+def rss_mb():
+    """ 현재 프로세스 상주 메모리(MB), /proc 이 없으면 0 """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def predict(model, batches):
+    """ 배치별 (토큰 라벨 확률, 마스크) 목록 """
+    results = []
+    with torch.no_grad():
+        for inputs in batches:
+            logits = model(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask']).logits
+            results.append((torch.softmax(logits.float(), dim=2), inputs['attention_mask'].bool()))
+    return results
+
+
+def decode(texts, batches, predictions):
+    """ 문장별 {태그: [문자열]} ([CLS]/[SEP]/[PAD] 처럼 원문 위치가 없는 토큰은 제외) """
+    decoded = []
+    for inputs, (probs, _) in zip(batches, predictions):
+        for offsets, row in zip(inputs['offset_mapping'].numpy(), probs.numpy()):
+            keep = offsets[:, 1] > offsets[:, 0]
+            spans = ai_service._decode_spans(texts[len(decoded)], offsets[keep], row[keep])
+            decoded.append(ai_service._spans_to_tags(spans))
+    return decoded
+
+
+def benchmark():
+    model_path = os.path.join(ai_service.model_dir, 'koelectra_ner')
+    tokenizer = ai_service.tokenizer
+    texts = load_samples()
+
+    reference = load_ner_model(model_path, torch.device('cpu'), 'torch')
+    max_length = min(512, reference.config.max_position_embeddings)
+    batches = [tokenizer(texts[i:i + BATCH_SIZE], truncation=True, max_length=max_length, padding=True,
+                         return_offsets_mapping=True, return_tensors='pt') for i in range(0, len(texts), BATCH_SIZE)]
+    reference_preds = predict(reference, batches)
+    reference_entities = decode(texts, batches, reference_preds)
+    del reference
+
+    print(f"\n📊 NER 백엔드 비교 ({len(texts)}개 문장/조각, 최대 {max_length} 토큰, {REPEAT}회 중 최소값)")
+    print(f"{'백엔드':<8} {'시간':>9} {'x배':>6} {'로드 RSS':>9} {'태그 일치':>9} {'엔티티 일치':>11}")
+
+    failed = []
+    base_time = None
+    for backend in NER_BACKENDS:
+        rss_before = rss_mb()
+        model = load_ner_model(model_path, torch.device('cpu'), backend)
+        rss_delta = rss_mb() - rss_before
+
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            preds = predict(model, batches)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        base_time = base_time or best
+
+        same = total = 0
+        for (ref, mask), (pred, _) in zip(reference_preds, preds):
+            same += int(((ref.argmax(dim=2) == pred.argmax(dim=2)) & mask).sum())
+            total += int(mask.sum())
+        agreement = same / total if total else 1.0
+        entities = decode(texts, batches, preds)
+        entity_match = sum(a == b for a, b in zip(reference_entities, entities)) / len(entities)
+
+        print(f"{backend:<8} {best:>8.3f}s {base_time / best:>5.1f}x {rss_delta:>7.1f}MB "
+              f"{agreement:>9.2%} {entity_match:>11.2%}")
+        if agreement < PARITY_MIN_AGREEMENT: failed.append(backend)
+        del model
+
+    if failed:
+        print(f"\n❌ 태그 일치율 {PARITY_MIN_AGREEMENT:.0%} 미만: {', '.join(failed)}")
+        return False
+    print(f"\n✅ 모든 백엔드 태그 일치율 {PARITY_MIN_AGREEMENT:.0%} 이상")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark() else 1)
@@ -0,0 +1,129 @@
+import glob
+import os
+import time
+import pandas as pd
+import pdfplumber
+from services.parsing_service import parsing_manager, EXCEL_VECTORIZE_MIN_CELLS
+
+# ======================================================
+# [벤치마크] 문서 파싱 속도 비교 (기존 구현 vs 현재 구현)
+# 샘플: 저장소의 'ERP 필요한 데이터' 폴더에 있는 실제 랜드사 파일
+# 실행: python benchmark_parsing.py
+# ======================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(os.path.dirname(BASE_DIR), 'ERP 필요한 데이터')
+REPEAT = 3
+# 샘플 요금표는 수십~수백 행이라, 대형 통합문서를 흉내 내기 위해 행을 N배로 복제한 경우도 측정
+SCALE = 100
+
+
+def legacy_frame_to_lines(df):
+    """ 기존 구현: df.iterrows() + 셀마다 str().strip() 두 번 """
+    df = df.fillna("")
+    cleaned_text_lines = []
+    for index, row in df.iterrows():
+        valid_cells = [str(item).strip() for item in row if str(item).strip()]
+        if valid_cells:
+            cleaned_text_lines.append(" | ".join(valid_cells))
+    return cleaned_text_lines
+
+
+def legacy_parse_excel(file_path):
+    """ 기존 구현 전체 (첫 시트만 읽음) """
+    df = pd.read_excel(file_path, header=None, engine='openpyxl')
+    return "\n".join(legacy_frame_to_lines(df))
+
+
+def legacy_parse_pdf(file_path):
+    """ 기존 구현: 페이지 순차 처리 + full_text += 문자열 누적 """
+    full_text = ""
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text: full_text += text + "\n"
+            for table in page.extract_tables():
+                for row in table:
+                    clean_row = [str(cell) if cell else "" for cell in row]
+                    full_text += " | ".join(clean_row) + "\n"
+    return full_text
+
+
+def measure(fn, *args):
+    """ REPEAT 번 실행 중 최소 시간(초)과 결과 반환 """
+    best, result = None, None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def convert_all(convert, sheets, *args):
+    return [convert(df, *args) for df in sheets.values()]
+
+
+def benchmark_excel():
+    files = sorted(glob.glob(os.path.join(SAMPLE_DIR, '**', '*.xlsx'), recursive=True))
+    print(f"\n📊 엑셀 파싱 ({len(files)}개 파일, {REPEAT}회 중 최소값)")
+    print("  - 변환: 같은 DataFrame(전체 시트)을 텍스트로 바꾸는 단계만 측정 (iterrows vs 셀 단위 vs 열 단위)")
+    print(f"  - 기본값은 셀 {EXCEL_VECTORIZE_MIN_CELLS}개 이상인 시트만 열 단위")
+    print("  - 전체: legacy = 첫 시트만 / frame, stream = 모든 시트")
+    print("  - 결과: ✓ 셀/열 단위 변환, frame/stream 전체 텍스트 모두 동일 / ≠ 다름 (모드와 상관없이 같은 NER 입력)")
+    print(f"{'파일':<36} {'변환 legacy':>11} {'변환 cell':>11} {'변환 column':>11} {f'x{SCALE} legacy':>11} "
+          f"{f'x{SCALE} cell':>11} {f'x{SCALE} column':>11} {'전체 legacy':>11} {'전체 frame':>11} {'전체 stream':>11} {'결과':>4}")
+
+    totals = [0.0] * 9
+    for path in files:
+        sheets = pd.read_excel(path, header=None, sheet_name=None, engine='openpyxl')
+        scaled = {name: pd.concat([df] * SCALE, ignore_index=True) for name, df in sheets.items()}
+
+        t_conv_legacy, _ = measure(convert_all, legacy_frame_to_lines, sheets)
+        t_conv_cell, cell_lines = measure(convert_all, parsing_manager._frame_to_lines, sheets, False)
+        t_conv_column, column_lines = measure(convert_all, parsing_manager._frame_to_lines, sheets, True)
+
+        t_scaled_legacy, _ = measure(convert_all, legacy_frame_to_lines, scaled)
+        t_scaled_cell, _ = measure(convert_all, parsing_manager._frame_to_lines, scaled, False)
+        t_scaled_column, _ = measure(convert_all, parsing_manager._frame_to_lines, scaled, True)
+
+        t_full_legacy, _ = measure(legacy_parse_excel, path)
+        t_full_frame, frame_text = measure(parsing_manager._parse_excel, path, False)
+        t_full_stream, stream_text = measure(parsing_manager._parse_excel, path, True)
+        same = "✓" if frame_text == stream_text and cell_lines == column_lines else "≠"
+
+        row = [t_conv_legacy, t_conv_cell, t_conv_column, t_scaled_legacy, t_scaled_cell, t_scaled_column,
+               t_full_legacy, t_full_frame, t_full_stream]
+        totals = [total + t for total, t in zip(totals, row)]
+        name = os.path.basename(path)[:34]
+        print(f"{name:<36} " + " ".join(f"{t:>10.4f}s" for t in row) + f" {same:>4}")
+
+    print(f"{'합계':<36} " + " ".join(f"{t:>10.4f}s" for t in totals))
+    print(f"\n  변환 속도 (legacy 대비 셀 / 열): x1 {totals[0] / totals[1]:.1f}배 / {totals[0] / totals[2]:.1f}배, "
+          f"x{SCALE} {totals[3] / totals[4]:.1f}배 / {totals[3] / totals[5]:.1f}배")
+
+
+def benchmark_pdf():
+    files = sorted(glob.glob(os.path.join(SAMPLE_DIR, '**', '*.pdf'), recursive=True))
+    print(f"\n📊 PDF 파싱 ({len(files)}개 파일, {REPEAT}회 중 최소값, 병렬 워커 풀은 재사용)")
+    print(f"{'파일':<36} {'페이지':>5} {'legacy':>10} {'sequential':>10} {'parallel':>10} {'x배':>6} {'결과':>4}")
+
+    totals = [0.0] * 3
+    for path in files:
+        with pdfplumber.open(path) as pdf:
+            page_count = len(pdf.pages)
+        t_legacy, legacy_text = measure(legacy_parse_pdf, path)
+        t_seq, _ = measure(parsing_manager._parse_pdf, path, False)
+        t_par, parallel_text = measure(parsing_manager._parse_pdf, path, True)
+        totals = [totals[0] + t_legacy, totals[1] + t_seq, totals[2] + t_par]
+
+        same = "✓" if legacy_text == parallel_text else "≠"
+        name = os.path.basename(path)[:34]
+        print(f"{name:<36} {page_count:>5} {t_legacy:>9.3f}s {t_seq:>9.3f}s {t_par:>9.3f}s "
+              f"{t_legacy / t_par:>5.1f}x {same:>4}")
+
+    print(f"{'합계':<36} {'':>5} {totals[0]:>9.3f}s {totals[1]:>9.3f}s {totals[2]:>9.3f}s {totals[0] / totals[2]:>5.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_excel()
+    benchmark_pdf()
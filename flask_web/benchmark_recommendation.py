@@ -0,0 +1,85 @@
+import time
+import numpy as np
+from services.recommendation_service import ProductRecommender, product_recommender
+
+# ======================================================
+# [벤치마크] 선호도 설문 -> 상품 추천 응답 시간
+# 샘플: 요금표에서 만든 실제 카탈로그(상품 x 출발일)를 상품 복제로 CATALOG_ROWS 행까지 늘려 측정
+# 실행: python benchmark_recommendation.py
+# ======================================================
+CATALOG_ROWS = 100_000
+REPEAT = 200
+TARGET_MS = 10.0
+
+PROFILES = [
+    {"country": "일본", "nights": 3, "pax": 4, "budget": 1_000_000, "hotel_grade": 4, "tee_time": "오전",
+     "golf_location": "시내", "top3": ["tee_time", "budget", "hotel_grade"]},
+    {"country": "오키나와", "pax": 3, "budget": 1_500_000, "rounds": "36홀", "top3": ["rounds", "budget"],
+     "start_date": "2025-12-01", "end_date": "2026-02-28"},
+    {"country": "태국", "pax": 2, "budget": 1_200_000, "golf_location": "골프텔", "top3": ["golf_location"]},
+    {"pax": 4, "budget": 900_000, "hotel_grade": 5, "top3": ["hotel_grade", "budget", "tee_time"]},
+]
+
+
+def scaled_catalog(base, rows):
+    """ 실제 카탈로그 상품을 복제 (복제본마다 가격 +-20%, 등급 변경) -> rows 행 이상 """
+    copies = int(np.ceil(rows / len(base.row_day)))
+    rng = np.random.default_rng(0)
+    products, product_ids, days, prices = [], [], [], []
+    for copy in range(copies):
+        offset = len(products)
+        for product in base.products:
+            grade = product["grade"] and int(np.clip(product["grade"] + rng.integers(-1, 2), 1, 5))
+            products.append(dict(product, id=offset + product["id"], grade=grade,
+                                 product=f"{product['product']} #{copy}"))
+        product_ids.append(base.row_product + offset)
+        days.append(base.row_day)
+        prices.append(base.prices * rng.uniform(0.8, 1.2, size=(len(base.products), 1))[base.row_product])
+    return products, np.concatenate(product_ids), np.concatenate(days), np.concatenate(prices)
+
+
+def naive_recommend(recommender, profile, k=10):
+    """ 비교용: 행마다 파이썬으로 필터 + 점수 계산 후 전체 정렬 """
+    catalog = recommender.catalog
+    weights = recommender.weights(profile.get("top3"))
+    pax = profile.get("pax", 2)
+    scored = []
+    for i in range(len(catalog.row_day)):
+        product = catalog.products[catalog.row_product[i]]
+        if profile.get("country") not in (None, product["country"], product["destination"]): continue
+        if profile.get("nights") and product["nights"] != profile["nights"]: continue
+        price = catalog.prices[i, pax]
+        if np.isnan(price): continue
+        rows = np.array([i])
+        scores = recommender.score(catalog, profile, rows, np.array([price]))[0]
+        scored.append((-(scores @ weights) / weights.sum(), price, i))
+    return sorted(scored)[:k]
+
+
+def main():
+    recommender = ProductRecommender(pricer=None)
+    recommender.build(*scaled_catalog(product_recommender.ensure_built(), CATALOG_ROWS))
+
+    print(f"\n{'설문':<30}{'후보':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'순차(ms)':>12}")
+    worst = 0.0
+    for profile in PROFILES:
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            recommender.recommend(profile, k=10)
+            timings.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        naive_recommend(recommender, profile)
+        naive = (time.perf_counter() - start) * 1000
+
+        candidates = len(recommender._candidates(recommender.catalog, profile))
+        p50, p95 = np.percentile(timings, 50), np.percentile(timings, 95)
+        worst = max(worst, p95)
+        label = ",".join(f"{k}={v}" for k, v in profile.items() if k in ("country", "nights", "pax"))
+        print(f"{label:<30}{candidates:>8}{p50:>10.2f}{p95:>10.2f}{naive:>12.0f}")
+
+    print(f"\n{'✅' if worst < TARGET_MS else '❌'} 카탈로그 {len(recommender.catalog.row_day):,}행, 최악 p95 {worst:.2f}ms (목표 {TARGET_MS}ms)")
+
+
+if __name__ == "__main__":
+    main()
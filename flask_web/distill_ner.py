@@ -0,0 +1,385 @@
+import csv
+import glob
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from functools import partial
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.optim import AdamW
+from torch.utils.data import DataLoader, Dataset
+from transformers import AutoTokenizer, ElectraConfig, ElectraForTokenClassification
+from ner_dataset import _tokenizer_hash, load_or_build, LengthBucketSampler, collate_dynamic, IGNORE_LABEL
+
+# ======================================================
+# [NER 지식 증류] 파인튜닝된 KoELECTRA-base NER(교사)의 soft label로 2~4층 작은 학생 모델 학습 (CPU 서버용)
+# - 말뭉치: 라벨 없는 견적서/상품 파일 + 카톡 메시지 + 답변 CSV -> MAX_LEN 토큰 단위로 잘라 교사 logits를 한 번만 계산해 캐시
+# - 손실: 교사/학생 분포 KL(온도 TEMPERATURE) + train_data.json 정답 라벨 CE(HARD_LABEL_WEIGHT)
+# - 학생 임베딩 크기는 교사와 같게 두고 임베딩을 그대로 복사 (hidden이 같으면 교사 층도 간격을 두고 복사)
+# - 끝나면 엔티티 F1(정답 대비 교사/학생, 보류 말뭉치에서 교사 대비 학생)과 추론 속도 비교를 출력/저장
+# - 저장: models/koelectra_ner_student  -> 서버에서 NER_MODEL=koelectra_ner_student 로 선택
+# 실행: python distill_ner.py
+# ======================================================
+EPOCHS = int(os.environ.get('DISTILL_EPOCHS', 3))
+LEARNING_RATE = 1e-4
+BATCH_SIZE = 16
+MAX_LEN = 128
+SEED = 0
+# 학생 구조 (init_dummy_models.py 더미 설정처럼 층 수/hidden 크기만 정하면 나머지는 비례해서)
+STUDENT_LAYERS = int(os.environ.get('STUDENT_LAYERS', 4))
+STUDENT_HIDDEN = int(os.environ.get('STUDENT_HIDDEN', 256))
+TEMPERATURE = float(os.environ.get('DISTILL_TEMPERATURE', 2.0))
+HARD_LABEL_WEIGHT = float(os.environ.get('HARD_LABEL_WEIGHT', 0.5))
+HOLDOUT_RATIO = 0.1
+SPEED_REPEAT = 3
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_ROOT = os.path.join(BASE_DIR, '../ERP 필요한 데이터')
+MODEL_DIR = os.environ.get('MODEL_DIR', os.path.join(BASE_DIR, '../models'))
+TEACHER_PATH = os.environ.get('DISTILL_TEACHER', os.path.join(MODEL_DIR, 'koelectra_ner'))
+STUDENT_PATH = os.environ.get('DISTILL_STUDENT', os.path.join(MODEL_DIR, 'koelectra_ner_student'))
+LABELED_FILE = os.path.join(BASE_DIR, 'train_data.json')
+DISTILL_CACHE_DIR = os.environ.get('DISTILL_CACHE_DIR', os.path.join(BASE_DIR, '../data/distill_cache'))
+# 교사 logits 계산 방식이 바뀌면 올려서 캐시를 다시 만듦
+DISTILL_VERSION = "1"
+
+# 라벨 없는 말뭉치 (견적서/상품 파일은 파싱 서비스로 텍스트 추출)
+DOCUMENT_DIRS = ["1. 랜드사한테 받은 상품_완료", "7. 랜드사한테 받은 견적서_집컴", "8. 확정안된 견적서, 확정 인보이스 양식_집컴"]
+DOCUMENT_EXTENSIONS = ('xlsx', 'xls', 'pdf', 'docx', 'txt')
+CSV_DIRS = ["3. 고객의 요청사항 (카톡 내용)", "6. 랜드사한테 고객 요청 답변 내용_집에서추가"]
+MIN_TEXT_CHARS = 5
+
+
+# ---------------------------------------------------------
+# 말뭉치
+# ---------------------------------------------------------
+
+def collect_corpus():
+    """ 견적서/상품 문서 텍스트 + 카톡 메시지 + CSV 문장 (중복 제거, 순서 고정) """
+    from services.chat_service import chat_ingestion
+    from services.parsing_service import parsing_manager
+
+    texts = []
+    for folder in DOCUMENT_DIRS:
+        for path in sorted(glob.glob(os.path.join(DATA_ROOT, folder, '**', '*'), recursive=True)):
+            if path.split('.')[-1].lower() not in DOCUMENT_EXTENSIONS: continue
+            text = parsing_manager.parse_file(path)
+            if text and text != "지원하지 않는 파일 형식입니다.": texts.append(text)
+    for path in chat_ingestion.chat_files():
+        texts.extend(m["message"] for m in chat_ingestion.read_messages(path))
+    for folder in CSV_DIRS:
+        for path in sorted(glob.glob(os.path.join(DATA_ROOT, folder, '*.csv'))):
+            with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+                for row in csv.reader(f):
+                    texts.extend(cell for cell in row if len(cell) >= MIN_TEXT_CHARS and not cell.isdigit())
+    return list(dict.fromkeys(t.strip() for t in texts if t and len(t.strip()) >= MIN_TEXT_CHARS))
+
+
+def chunk_corpus(texts, tokenizer, max_len):
+    """ 문서 -> 특수 토큰 포함 max_len 이하 조각 (긴 문서는 겹침 없이 이어서 자름) """
+    body = max_len - 2
+    chunks = []
+    for ids in tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]:
+        for start in range(0, len(ids), body):
+            chunks.append(tokenizer.build_inputs_with_special_tokens(ids[start:start + body]))
+    return chunks
+
+
+def _teacher_hash(teacher_path):
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(teacher_path)):
+        stat = os.stat(os.path.join(teacher_path, name))
+        digest.update(f"{name}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def teacher_soft_labels(teacher, tokenizer, texts, device, cache_dir=DISTILL_CACHE_DIR):
+    """ 말뭉치 조각별 교사 logits (float16, 평탄화 + offsets) -> 캐시(.npy, mmap) / 교사나 말뭉치가 바뀌면 다시 계산 """
+    digest = hashlib.sha256(f"{DISTILL_VERSION}|{MAX_LEN}|{_tokenizer_hash(tokenizer)}|{_teacher_hash(TEACHER_PATH)}".encode('utf-8'))
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    path = os.path.join(cache_dir, digest.hexdigest()[:24])
+    names = ["input_ids", "logits", "offsets"]
+
+    if not all(os.path.exists(os.path.join(path, f"{name}.npy")) for name in names):
+        chunks = chunk_corpus(texts, tokenizer, MAX_LEN)
+        lengths = np.array([len(c) for c in chunks], dtype=np.int64)
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat_ids = np.fromiter((t for c in chunks for t in c), dtype=np.int32, count=int(offsets[-1]))
+        flat_logits = np.zeros((int(offsets[-1]), teacher.config.num_labels), dtype=np.float16)
+
+        start = time.perf_counter()
+        order = np.argsort(lengths, kind='stable')
+        with torch.no_grad():
+            for i in range(0, len(order), BATCH_SIZE):
+                batch = order[i:i + BATCH_SIZE]
+                inputs = tokenizer.pad({"input_ids": [chunks[j] for j in batch]}, return_tensors="pt").to(device)
+                logits = teacher(**inputs).logits.float().cpu().numpy()
+                for row, j in enumerate(batch):
+                    flat_logits[offsets[j]:offsets[j + 1]] = logits[row, :lengths[j]]
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, array in zip(names, [flat_ids, flat_logits, offsets]):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        print(f"  ✅ 교사 soft label: {len(chunks)}조각, {len(flat_ids)}토큰 ({time.perf_counter() - start:.1f}s) -> {path}")
+    else:
+        print(f"  ✅ 교사 soft label 캐시 사용: {path}")
+    return [np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in names]
+
+
+class SoftLabelDataset(Dataset):
+    """ 조각 i = (토큰 ids, 교사 logits) - 캐시 배열 슬라이스 """
+
+    def __init__(self, input_ids, logits, offsets, indices):
+        self.input_ids, self.logits, self.offsets = input_ids, logits, offsets
+        self.indices = np.asarray(indices)
+        self.lengths = (offsets[1:] - offsets[:-1])[self.indices]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        i = self.indices[index]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.input_ids[start:end], self.logits[start:end]
+
+
+def collate_soft(batch, pad_token_id=0):
+    max_len = max(len(ids) for ids, _ in batch)
+    num_labels = batch[0][1].shape[1]
+    input_ids = torch.full((len(batch), max_len), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(batch), max_len), dtype=torch.long)
+    teacher_logits = torch.zeros((len(batch), max_len, num_labels), dtype=torch.float32)
+    for row, (ids, logits) in enumerate(batch):
+        input_ids[row, :len(ids)] = torch.from_numpy(np.asarray(ids, dtype=np.int64))
+        teacher_logits[row, :len(ids)] = torch.from_numpy(np.asarray(logits, dtype=np.float32))
+        attention_mask[row, :len(ids)] = 1
+    return {"input_ids": input_ids, "attention_mask": attention_mask, "teacher_logits": teacher_logits}
+
+
+# ---------------------------------------------------------
+# 학생 모델
+# ---------------------------------------------------------
+
+def build_student(teacher):
+    """ 교사 설정에서 층 수/hidden만 줄인 학생, 임베딩(과 hidden이 같으면 층/분류기)은 교사 가중치로 시작 """
+    config = teacher.config
+    heads = max(1, STUDENT_HIDDEN // 64)
+    student_config = ElectraConfig(
+        vocab_size=config.vocab_size,
+        embedding_size=config.embedding_size,
+        hidden_size=STUDENT_HIDDEN,
+        num_hidden_layers=STUDENT_LAYERS,
+        num_attention_heads=heads,
+        intermediate_size=STUDENT_HIDDEN * 4,
+        max_position_embeddings=config.max_position_embeddings,
+        type_vocab_size=config.type_vocab_size,
+        num_labels=config.num_labels,
+        id2label=config.id2label,
+        label2id=config.label2id,
+    )
+    student = ElectraForTokenClassification(student_config)
+
+    teacher_state = teacher.state_dict()
+    copied = {name: tensor for name, tensor in teacher_state.items() if name.startswith("electra.embeddings.")}
+    if STUDENT_HIDDEN == config.hidden_size:
+        # 교사 층을 고르게 골라 복사 (12층 -> 4층이면 2, 5, 8, 11번째)
+        picked = np.linspace(0, config.num_hidden_layers - 1, STUDENT_LAYERS + 1)[1:].round().astype(int)
+        for new, old in enumerate(picked):
+            prefix = f"electra.encoder.layer.{old}."
+            copied.update({name.replace(prefix, f"electra.encoder.layer.{new}."): tensor
+                           for name, tensor in teacher_state.items() if name.startswith(prefix)})
+        copied.update({name: tensor for name, tensor in teacher_state.items() if name.startswith("classifier.")})
+        if "electra.embeddings_project.weight" in teacher_state:
+            copied.update({name: tensor for name, tensor in teacher_state.items() if name.startswith("electra.embeddings_project.")})
+    student.load_state_dict(copied, strict=False)
+    return student
+
+
+def distillation_loss(student_logits, teacher_logits, attention_mask):
+    """ 토큰별 KL(교사 || 학생) x T^2, 패딩 제외 평균 """
+    t = TEMPERATURE
+    log_student = F.log_softmax(student_logits / t, dim=-1)
+    teacher_probs = F.softmax(teacher_logits / t, dim=-1)
+    kl = (teacher_probs * (torch.log(teacher_probs + 1e-9) - log_student)).sum(-1)
+    mask = attention_mask.float()
+    return (kl * mask).sum() / mask.sum().clamp(min=1) * (t * t)
+
+
+# ---------------------------------------------------------
+# 평가
+# ---------------------------------------------------------
+
+def entity_set(label_ids, id2label, sequence_id=0):
+    """ BIO 라벨 번호열 -> {(문장, 종류, 시작, 끝)} (B- 없이 시작한 I-는 버림, ai_service 디코딩과 같은 규칙) """
+    entities, current = set(), None
+    for pos, label_id in enumerate(list(label_ids) + [0]):
+        label = id2label.get(int(label_id), "O")
+        if current and not (label.startswith("I-") and label[2:] == current[0]):
+            entities.add((sequence_id, current[0], current[1], pos))
+            current = None
+        if label.startswith("B-"): current = (label[2:], pos)
+    return entities
+
+
+def f1(predicted, reference):
+    if not predicted and not reference: return 1.0
+    tp = len(predicted & reference)
+    precision = tp / len(predicted) if predicted else 0.0
+    recall = tp / len(reference) if reference else 0.0
+    return 0.0 if tp == 0 else 2 * precision * recall / (precision + recall)
+
+
+def predict_labels(model, batches, device):
+    """ 배치별 (input_ids, attention_mask, 예측 라벨) """
+    outputs = []
+    with torch.no_grad():
+        for batch in batches:
+            logits = model(input_ids=batch["input_ids"].to(device), attention_mask=batch["attention_mask"].to(device)).logits
+            outputs.append(logits.argmax(-1).cpu().numpy())
+    return outputs
+
+
+def gold_f1(model, loader, device, id2label):
+    """ train_data.json 정답 대비 엔티티 F1 (단어 첫 토큰 기준) """
+    batches = list(loader)
+    predicted, reference = set(), set()
+    for b, (batch, labels) in enumerate(zip(batches, predict_labels(model, batches, device))):
+        gold = batch["labels"].numpy()
+        for row in range(len(gold)):
+            keep = gold[row] != IGNORE_LABEL
+            sequence_id = (b, row)
+            reference |= entity_set(gold[row][keep], id2label, sequence_id)
+            predicted |= entity_set(labels[row][keep], id2label, sequence_id)
+    return f1(predicted, reference)
+
+
+def agreement_f1(teacher_batches, student_batches, batches, id2label):
+    """ 보류 말뭉치에서 교사 예측을 정답으로 본 학생 엔티티 F1 (특수 토큰/패딩 제외) """
+    predicted, reference = set(), set()
+    for b, (batch, teacher_labels, student_labels) in enumerate(zip(batches, teacher_batches, student_batches)):
+        mask = batch["attention_mask"].numpy().astype(bool)
+        for row in range(len(mask)):
+            length = int(mask[row].sum())
+            sequence_id = (b, row)
+            reference |= entity_set(teacher_labels[row][1:length - 1], id2label, sequence_id)
+            predicted |= entity_set(student_labels[row][1:length - 1], id2label, sequence_id)
+    return f1(predicted, reference)
+
+
+def throughput(model, batches, device):
+    """ 보류 말뭉치 전체 추론 시간 (SPEED_REPEAT 회 중 최단) -> 초, 토큰/초 """
+    tokens = sum(int(batch["attention_mask"].sum()) for batch in batches)
+    best = float("inf")
+    for _ in range(SPEED_REPEAT):
+        start = time.perf_counter()
+        predict_labels(model, batches, device)
+        best = min(best, time.perf_counter() - start)
+    return best, tokens / best
+
+
+# ---------------------------------------------------------
+# 학습
+# ---------------------------------------------------------
+
+def distill():
+    print(f"🚀 NER 지식 증류 준비 중... (교사: {TEACHER_PATH}, 학생: {STUDENT_LAYERS}층 x {STUDENT_HIDDEN})")
+    torch.manual_seed(SEED)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    tokenizer = AutoTokenizer.from_pretrained(os.path.join(MODEL_DIR, 'tokenizer'))
+    teacher = ElectraForTokenClassification.from_pretrained(TEACHER_PATH).to(device)
+    teacher.eval()
+    id2label = {int(k): v for k, v in teacher.config.id2label.items()}
+    label_list = [id2label[i] for i in range(teacher.config.num_labels)]
+
+    texts = collect_corpus()
+    input_ids, logits, offsets = teacher_soft_labels(teacher, tokenizer, texts, device)
+    indices = list(range(len(offsets) - 1))
+    random.Random(SEED).shuffle(indices)
+    holdout_size = max(1, int(len(indices) * HOLDOUT_RATIO))
+    train_set = SoftLabelDataset(input_ids, logits, offsets, indices[holdout_size:])
+    holdout_set = SoftLabelDataset(input_ids, logits, offsets, indices[:holdout_size])
+    collate = partial(collate_soft, pad_token_id=tokenizer.pad_token_id)
+    soft_loader = DataLoader(train_set, batch_sampler=LengthBucketSampler(train_set.lengths, BATCH_SIZE, seed=SEED),
+                             collate_fn=collate)
+
+    labeled = load_or_build(LABELED_FILE, tokenizer, MAX_LEN, label_list)
+    hard_loader = DataLoader(labeled, batch_sampler=LengthBucketSampler(labeled.lengths, BATCH_SIZE, seed=SEED),
+                             collate_fn=partial(collate_dynamic, pad_token_id=tokenizer.pad_token_id))
+
+    student = build_student(teacher).to(device)
+    optimizer = AdamW(student.parameters(), lr=LEARNING_RATE)
+    rng = random.Random(SEED)
+    print(f"🔥 증류 시작! (Device: {device}, 말뭉치 {len(texts)}건 -> 학습 {len(train_set)}조각 / 보류 {len(holdout_set)}조각, "
+          f"정답 {len(labeled)}문장)")
+
+    student.train()
+    for epoch in range(EPOCHS):
+        # soft label 배치와 정답 배치를 섞어서 번갈아 학습
+        schedule = ["soft"] * len(soft_loader) + (["hard"] * len(hard_loader) if HARD_LABEL_WEIGHT > 0 else [])
+        rng.shuffle(schedule)
+        iterators = {"soft": iter(soft_loader), "hard": iter(hard_loader)}
+        totals = {"soft": 0.0, "hard": 0.0}
+        for task in schedule:
+            batch = {k: v.to(device) for k, v in next(iterators[task]).items()}
+            optimizer.zero_grad()
+            if task == "soft":
+                outputs = student(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"])
+                loss = distillation_loss(outputs.logits, batch["teacher_logits"], batch["attention_mask"])
+            else:
+                loss = student(**batch).loss * HARD_LABEL_WEIGHT
+            loss.backward()
+            optimizer.step()
+            totals[task] += loss.item()
+        print(f"  Epoch {epoch + 1}/{EPOCHS} - KL: {totals['soft'] / max(len(soft_loader), 1):.4f}, "
+              f"CE: {totals['hard'] / max(len(hard_loader), 1):.4f}")
+
+    student.eval()
+    report = evaluate(teacher, student, holdout_set, labeled, tokenizer, device, id2label)
+    student.save_pretrained(STUDENT_PATH)
+    with open(os.path.join(STUDENT_PATH, 'distill_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n🎉 증류 완료! 학생 모델이 '{STUDENT_PATH}'에 저장되었습니다. (서버: NER_MODEL={os.path.basename(STUDENT_PATH)})")
+
+
+def evaluate(teacher, student, holdout_set, labeled, tokenizer, device, id2label):
+    sampler = LengthBucketSampler(holdout_set.lengths, BATCH_SIZE, shuffle=False)
+    batches = list(DataLoader(holdout_set, batch_sampler=sampler, collate_fn=partial(collate_soft, pad_token_id=tokenizer.pad_token_id)))
+    gold_loader = DataLoader(labeled, batch_sampler=LengthBucketSampler(labeled.lengths, BATCH_SIZE, shuffle=False),
+                             collate_fn=partial(collate_dynamic, pad_token_id=tokenizer.pad_token_id))
+
+    teacher_f1, student_f1 = gold_f1(teacher, gold_loader, device, id2label), gold_f1(student, gold_loader, device, id2label)
+    agreement = agreement_f1(predict_labels(teacher, batches, device), predict_labels(student, batches, device), batches, id2label)
+    teacher_seconds, teacher_tps = throughput(teacher, batches, device)
+    student_seconds, student_tps = throughput(student, batches, device)
+    report = {
+        "student": {"layers": STUDENT_LAYERS, "hidden": STUDENT_HIDDEN,
+                    "parameters": sum(p.numel() for p in student.parameters())},
+        "teacher_parameters": sum(p.numel() for p in teacher.parameters()),
+        "gold_f1": {"teacher": round(teacher_f1, 4), "student": round(student_f1, 4),
+                    "delta": round(student_f1 - teacher_f1, 4)},
+        "holdout_agreement_f1": round(agreement, 4),
+        "tokens_per_second": {"teacher": round(teacher_tps), "student": round(student_tps)},
+        "speedup": round(teacher_seconds / student_seconds, 2),
+        "torch_threads": torch.get_num_threads(),
+    }
+    print(f"\n{'':<12}{'정답 F1':>10}{'토큰/초':>12}{'파라미터':>14}")
+    print(f"{'교사':<12}{teacher_f1:>10.4f}{teacher_tps:>12,.0f}{report['teacher_parameters']:>14,}")
+    print(f"{'학생':<12}{student_f1:>10.4f}{student_tps:>12,.0f}{report['student']['parameters']:>14,}")
+    print(f"F1 차이 {report['gold_f1']['delta']:+.4f}, 보류 말뭉치 교사 대비 학생 F1 {agreement:.4f}, 속도 {report['speedup']}배")
+    return report
+
+
+if __name__ == "__main__":
+    distill()
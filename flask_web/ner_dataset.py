@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+
+# ======================================================
+# [NER 학습 데이터] train_data.json -> 한 번만 토크나이즈해 디스크 캐시(.npy, mmap)로 저장
+# - 문장 길이가 제각각이라 평탄화(flat) 배열 + 문장별 시작 위치(offsets)로 저장 (패딩 없음)
+# - 캐시 키: 데이터 파일 해시 + 토크나이저 해시 + max_len + 라벨 목록 -> 하나라도 바뀌면 새로 만듦
+# - 학습 때는 길이가 비슷한 문장끼리 배치(LengthBucketSampler) + 배치 내 최장 길이까지만 패딩(collate_dynamic)
+# ======================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_CACHE_DIR = os.environ.get('DATASET_CACHE_DIR', os.path.join(BASE_DIR, '../data/ner_cache'))
+# 토크나이즈 로직이 바뀌면 올려서 캐시를 다시 만듦
+PREPROCESS_VERSION = "1"
+TOKENIZE_CHUNK = 1000
+# 버킷 하나 = 배치 BUCKET_BATCHES개 분량, 그 안에서 길이순으로 정렬해 배치를 나눔
+BUCKET_BATCHES = 50
+IGNORE_LABEL = -100
+
+
+def _tokenizer_hash(tokenizer):
+    """ 어휘/정규화 규칙까지 포함한 토크나이저 지문 (fast 토크나이저는 전체 직렬화, 아니면 vocab) """
+    digest = hashlib.sha256(type(tokenizer).__name__.encode('utf-8'))
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # truncation/padding은 호출할 때마다 바뀌는 실행 설정이라 제외
+        spec = json.loads(backend.to_str())
+        spec.pop("truncation", None)
+        spec.pop("padding", None)
+        digest.update(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    else:
+        digest.update(json.dumps(sorted(tokenizer.get_vocab().items()), ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cache_key(data_file, tokenizer, max_len, label_list):
+    digest = hashlib.sha256()
+    with open(data_file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    digest.update(_tokenizer_hash(tokenizer).encode('utf-8'))
+    digest.update(f"{PREPROCESS_VERSION}|{max_len}|{'|'.join(label_list)}".encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def tokenize_corpus(data, tokenizer, max_len, label2id):
+    """
+    [{"text", "labels"(단어별 BIO)}] -> (input_ids, label_ids, offsets, lengths)
+    - 단어 단위로 토크나이즈(is_split_into_words) 후 word_ids()로 라벨 정렬: 단어 첫 토큰에 라벨, 나머지/특수 토큰은 -100
+    - 라벨 수와 단어 수가 다르면 짧은 쪽까지만 사용, 모르는 라벨은 'O'
+    """
+    input_ids, label_ids, lengths = [], [], []
+    for start in range(0, len(data), TOKENIZE_CHUNK):
+        chunk = data[start:start + TOKENIZE_CHUNK]
+        words = []
+        for item in chunk:
+            split = item['text'].split()
+            words.append(split[:len(item['labels'])])
+        encodings = tokenizer(words, is_split_into_words=True, truncation=True, max_length=max_len)
+
+        for i, item in enumerate(chunk):
+            ids = encodings["input_ids"][i]
+            word_labels = [label2id.get(label, 0) for label in item['labels']]
+            labels, previous = [], None
+            for word_id in encodings.word_ids(i):
+                labels.append(IGNORE_LABEL if word_id is None or word_id == previous else word_labels[word_id])
+                previous = word_id
+            input_ids.append(ids)
+            label_ids.append(labels)
+            lengths.append(len(ids))
+
+    lengths = np.array(lengths, dtype=np.int32)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat_ids = np.fromiter((t for ids in input_ids for t in ids), dtype=np.int32, count=int(offsets[-1]))
+    flat_labels = np.fromiter((t for labels in label_ids for t in labels), dtype=np.int16, count=int(offsets[-1]))
+    return flat_ids, flat_labels, offsets, lengths
+
+
+def load_or_build(data_file, tokenizer, max_len, label_list, cache_dir=DATASET_CACHE_DIR):
+    """ 캐시가 있으면 mmap으로 열고, 없으면 토크나이즈해서 저장 -> PretokenizedNERDataset """
+    key = cache_key(data_file, tokenizer, max_len, label_list)
+    path = os.path.join(cache_dir, key)
+    names = ["input_ids", "label_ids", "offsets", "lengths"]
+
+    if not all(os.path.exists(os.path.join(path, f"{name}.npy")) for name in names):
+        with open(data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        arrays = tokenize_corpus(data, tokenizer, max_len, {label: i for i, label in enumerate(label_list)})
+        # 다른 프로세스와 겹쳐도 깨진 캐시가 남지 않도록 임시 폴더에 쓴 뒤 이름 변경
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, array in zip(names, arrays):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)  # 이미 다른 프로세스가 만든 경우
+        print(f"  ✅ 학습 데이터 토크나이즈: {len(arrays[3])}문장, {len(arrays[0])}토큰 -> {path}")
+    else:
+        print(f"  ✅ 학습 데이터 캐시 사용: {path}")
+
+    arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in names]
+    return PretokenizedNERDataset(*arrays)
+
+
+class PretokenizedNERDataset(Dataset):
+    """ 문장 i = input_ids[offsets[i]:offsets[i+1]] (mmap 배열 슬라이스, 패딩 없음) """
+
+    def __init__(self, input_ids, label_ids, offsets, lengths):
+        self.input_ids = input_ids
+        self.label_ids = label_ids
+        self.offsets = offsets
+        self.lengths = np.asarray(lengths)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.input_ids[start:end], self.label_ids[start:end]
+
+
+class LengthBucketSampler(Sampler):
+    """
+    길이가 비슷한 문장끼리 배치 (batch_sampler로 사용)
+    - 섞은 뒤 BUCKET_BATCHES 배치 분량씩 잘라 버킷 안에서 길이순 정렬 -> 배치로 나누고 배치 순서를 다시 섞음
+    - 패딩이 거의 없으면서도 에폭마다 배치 구성이 달라짐
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=True, seed=0):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+        indices = list(range(len(self.lengths)))
+        if self.shuffle: rng.shuffle(indices)
+
+        bucket_size = self.batch_size * BUCKET_BATCHES
+        batches = []
+        for start in range(0, len(indices), bucket_size):
+            bucket = sorted(indices[start:start + bucket_size], key=lambda i: self.lengths[i])
+            batches.extend(bucket[i:i + self.batch_size] for i in range(0, len(bucket), self.batch_size))
+        if self.shuffle: rng.shuffle(batches)
+        return iter(batches)
+
+
+def collate_dynamic(batch, pad_token_id=0):
+    """ 배치 내 최장 길이까지만 패딩 -> {"input_ids", "attention_mask", "labels"} """
+    max_len = max(len(ids) for ids, _ in batch)
+    input_ids = torch.full((len(batch), max_len), pad_token_id, dtype=torch.long)
+    labels = torch.full((len(batch), max_len), IGNORE_LABEL, dtype=torch.long)
+    attention_mask = torch.zeros((len(batch), max_len), dtype=torch.long)
+    for row, (ids, label_ids) in enumerate(batch):
+        input_ids[row, :len(ids)] = torch.from_numpy(np.asarray(ids, dtype=np.int64))
+        labels[row, :len(ids)] = torch.from_numpy(np.asarray(label_ids, dtype=np.int64))
+        attention_mask[row, :len(ids)] = 1
+    return {"input_ids": input_ids, "attention_mask": attention_mask, "labels": labels}
@@ -1,3 +1,4 @@
+import datetime
 from flask import Blueprint, jsonify, request
 from services.ai_service import ai_service
 
@@ -7,5 +8,30 @@ bp = Blueprint('finance', __name__, url_prefix='/api/finance')
 def forecast_price():
     data = request.json
     date_range = data.get('date_range', [])
-    result = ai_service.forecast_price(date_range)
+    history = data.get('history', [])
+    result = ai_service.forecast_price(date_range, history)
     return jsonify(result)
+
+@bp.route('/forecast/batch', methods=['POST'])
+def forecast_batch():
+    """
+    여러 상품 가격 곡선을 한 번에 예측
+    {"series": [{"key": {...}, "history": [...], "date_range": [...]}, ...], "start_date": "2025-01-01", "end_date": "2026-12-31"}
+    - date_range가 없는 시계열은 start_date ~ end_date 매일로 예측
+    """
+    data = request.json or {}
+    series = data.get('series')
+    if not isinstance(series, list) or not series or not all(isinstance(s, dict) for s in series):
+        return jsonify({"status": "error", "message": "series 목록이 비어 있습니다."}), 400
+
+    shared_range = []
+    if data.get('start_date') and data.get('end_date'):
+        try:
+            start = datetime.date.fromisoformat(data['start_date'])
+            end = datetime.date.fromisoformat(data['end_date'])
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "start_date, end_date는 YYYY-MM-DD 형식이어야 합니다."}), 400
+        shared_range = [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+    series = [dict(s, date_range=s.get('date_range') or shared_range) for s in series]
+    return jsonify({"status": "success", "results": ai_service.forecast_batch(series)})
@@ -0,0 +1,74 @@
+import os
+import uuid
+from flask import Blueprint, jsonify, request
+from services.ai_service import ai_service
+from services.job_service import job_queue, JOB_UPLOAD_DIR
+
+bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'pdf', 'docx', 'txt'}
+
+
+def run_quotation_job(payload, report_progress):
+    """ [작업 핸들러] 업로드된 견적서 파일 -> 스트리밍 파싱 + NER """
+    report_progress({"stage": "parsing", "chunks_done": 0})
+    result = ai_service.extract_quotation_info_streaming(
+        payload['file_path'],
+        progress_callback=lambda done: report_progress({"stage": "inference", "chunks_done": done})
+    )
+    if result.get("status") == "success":
+        result["file_name"] = payload['file_name']
+    report_progress({"stage": "done", "chunks_done": len(result.get("chunks", []))})
+    return result
+
+
+def remove_quotation_upload(payload):
+    """ 작업이 끝나면(성공/최종 실패) 업로드 원본 삭제 - 결과는 jobs.db에 남음 """
+    if os.path.exists(payload['file_path']): os.remove(payload['file_path'])
+
+
+job_queue.register('quotation', run_quotation_job, cleanup=remove_quotation_upload)
+
+
+@bp.route('/quotation', methods=['POST'])
+def submit_quotation():
+    file = request.files.get('file')
+    if file is None or not file.filename:
+        return jsonify({"status": "error", "message": "업로드된 파일이 없습니다."}), 400
+
+    ext = file.filename.rsplit('.', 1)[-1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        return jsonify({"status": "error", "message": "지원하지 않는 파일 형식입니다."}), 400
+
+    # 한글 파일명은 그대로 두고, 저장은 충돌 없는 임의 이름으로
+    if not os.path.exists(JOB_UPLOAD_DIR): os.makedirs(JOB_UPLOAD_DIR)
+    file_path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}.{ext}")
+    file.save(file_path)
+
+    job_id = job_queue.submit('quotation', {"file_path": file_path, "file_name": file.filename})
+    job_queue.start()
+    return jsonify({"status": "queued", "job_id": job_id}), 202
+
+
+@bp.route('/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None: return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    return jsonify(job)
+
+
+@bp.route('/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_queue.get(job_id, include_result=True)
+    if job is None: return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    if job["status"] == "failed":
+        # 재시도 한도까지 실패한 최종 상태 -> 202가 아니어야 폴링하는 쪽이 멈춤
+        return jsonify({"status": "failed", "message": job["error"], "error": job["error"], "attempts": job["attempts"]}), 500
+    if job["status"] != "done":
+        return jsonify({"status": job["status"], "progress": job["progress"], "error": job["error"]}), 202
+    return jsonify(job["result"])
+
+
+@bp.route('/stats', methods=['GET'])
+def job_stats():
+    return jsonify(job_queue.get_stats())
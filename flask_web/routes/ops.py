@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from services.ai_service import ai_service
+from services.chat_service import chat_ingestion
+from services.triage_service import sentiment_triage
 
 bp = Blueprint('ops', __name__, url_prefix='/api/ops')
 
@@ -9,3 +11,44 @@ def analyze_sentiment():
     text = data.get('text', '')
     result = ai_service.analyze_sentiment(text)
     return jsonify(result)
+
+@bp.route('/chats/ingest', methods=['POST'])
+def ingest_chats():
+    """ 카톡 대화 폴더에서 지난 수집 이후 새 메시지만 읽어 분류/요약/NER """
+    result = chat_ingestion.ingest()
+    return jsonify({"status": "success", **result})
+
+@bp.route('/sentiment/stream', methods=['POST'])
+def triage_messages():
+    """ 고객 메시지 여러 건 분류 + 불가 알림: {"messages": ["...", {"message": "...", "chat": ..., "user": ...}]} """
+    data = request.json or {}
+    messages = data.get('messages')
+    if not isinstance(messages, list) or not messages:
+        return jsonify({"status": "error", "message": "messages 목록이 비어 있습니다."}), 400
+    if any(not (m if isinstance(m, str) else isinstance(m, dict) and m.get('message')) for m in messages):
+        return jsonify({"status": "error", "message": "비어 있는 메시지가 있습니다."}), 400
+
+    results, alerts = sentiment_triage.triage(messages)
+    return jsonify({"status": "success", "results": results, "alerts": alerts})
+
+@bp.route('/alerts', methods=['GET'])
+def recent_alerts():
+    return jsonify({"alerts": list(sentiment_triage.alerts), "stats": sentiment_triage.get_stats()})
+
+@bp.route('/alerts/poll', methods=['POST'])
+def poll_chat_alerts():
+    """ 카톡 대화 폴더에서 새 고객 메시지만 분류 """
+    alerts = sentiment_triage.poll_chats()
+    return jsonify({"status": "success", "alerts": alerts})
+
+@bp.route('/analyze', methods=['POST'])
+def analyze_messages():
+    """ 메시지 여러 건 3중 분류 + 엔티티 추출을 함께: {"messages": ["...", ...]} (멀티태스크 모델이면 인코더 한 번) """
+    data = request.json or {}
+    messages = data.get('messages')
+    if not isinstance(messages, list) or not messages or not all(isinstance(m, str) and m for m in messages):
+        return jsonify({"status": "error", "message": "messages 목록이 비어 있습니다."}), 400
+
+    results = ai_service.analyze_messages_batch(messages)
+    return jsonify({"status": "success",
+                    "results": [{"sentiment": sentiment, "entities": entities} for sentiment, entities in results]})
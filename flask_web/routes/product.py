@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from services.ai_service import ai_service
+from services.price_table_service import price_tables
+from services.recommendation_service import product_recommender
+from services.master_service import master_catalog, MODELS
 
 bp = Blueprint('product', __name__, url_prefix='/api/product')
 
@@ -9,3 +12,76 @@ def analyze_product_text():
     text = data.get('text', '')
     result = ai_service.extract_entities(text)
     return jsonify(result)
+
+@bp.route('/prices', methods=['GET'])
+def lookup_prices():
+    """ [요금 조회] ?date=YYYY-MM-DD&destination=&grade=&nights=&pax=&product= -> 출발일 기준 상품별 1인 요금 """
+    args = request.args
+    date = args.get('date')
+    if not date:
+        return jsonify({"status": "error", "message": "date(YYYY-MM-DD)가 필요합니다."}), 400
+    try:
+        results = price_tables.lookup(date, destination=args.get('destination'), grade=args.get('grade', type=int),
+                                      nights=args.get('nights', type=int), pax=args.get('pax', type=int),
+                                      product=args.get('product'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"잘못된 날짜 형식입니다: {e}"}), 400
+    return jsonify({"status": "success", "date": date[:10], "prices": results})
+
+@bp.route('/prices/reload', methods=['POST'])
+def reload_prices():
+    """ 요금표 엑셀을 새로 받은 뒤 호출 (바뀐 통합문서만 다시 추출) """
+    price_tables.reload()
+    return jsonify({"status": "success", **price_tables.get_stats()})
+
+@bp.route('/recommend', methods=['POST'])
+def recommend_products():
+    """
+    [상품 추천] 선호도 설문 -> 상위 k개 상품/출발일
+    {"country": "일본", "nights": 3, "pax": 4, "budget": 1200000, "hotel_grade": 4, "golf_location": "시내",
+     "tee_time": "오전", "rounds": "36홀", "difficulty": "중", "top3": ["budget", "tee_time", "hotel_grade"], "k": 10}
+    """
+    data = request.json or {}
+    try:
+        results = product_recommender.recommend(data, k=int(data.get('k') or 10))
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"설문 값이 올바르지 않습니다: {e}"}), 400
+    return jsonify({"status": "success", "recommendations": results})
+
+@bp.route('/masters/<kind>', methods=['GET'])
+def search_masters(kind):
+    """ [마스터 조회] kind: hotel / golf, ?q=이름 -> 퍼지 후보 (q 없으면 전체 목록) """
+    if kind not in MODELS:
+        return jsonify({"status": "error", "message": "kind는 hotel 또는 golf 입니다."}), 400
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify({"status": "success", "records": master_catalog.records(kind)})
+    candidates = master_catalog.search(kind, query, limit=request.args.get('limit', 5, type=int))
+    return jsonify({"status": "success", "records": [dict(record, score=score) for record, score in candidates]})
+
+@bp.route('/masters/<kind>', methods=['POST'])
+def register_master(kind):
+    """ {"name_kr": "...", "name_en": "...", "name_local": "...", "aliases": [...], "location": "...", ...} """
+    if kind not in MODELS:
+        return jsonify({"status": "error", "message": "kind는 hotel 또는 golf 입니다."}), 400
+    data = request.json or {}
+    if not any(data.get(f) for f in ("name_kr", "name_en", "name_local")):
+        return jsonify({"status": "error", "message": "이름(name_kr/name_en/name_local)이 필요합니다."}), 400
+    existing = master_catalog.resolve(kind, data.get('name_kr') or data.get('name_en') or data.get('name_local'))
+    if existing and existing["match"] == "unverified":
+        # 견적서에서 자동 등록된 미확인 레코드면 직접 등록한 것으로 보고 확인 처리
+        return jsonify({"status": "success", "record": master_catalog.verify(kind, existing["record"]["id"])})
+    if existing and existing["match"] == "exact":
+        return jsonify({"status": "warning", "message": "이미 등록된 이름입니다.", "record": existing["record"]})
+    record = master_catalog.register(kind, **{k: v for k, v in data.items() if k not in ('kind', 'verified')})
+    return jsonify({"status": "success", "record": record})
+
+@bp.route('/masters/<kind>/<int:record_id>/verify', methods=['POST'])
+def verify_master(kind, record_id):
+    """ [마스터 확인] 견적서 추출에서 자동 등록된 미확인 레코드를 사용자가 확인 -> 정식 마스터 (사전 매칭에도 사용) """
+    if kind not in MODELS:
+        return jsonify({"status": "error", "message": "kind는 hotel 또는 golf 입니다."}), 400
+    record = master_catalog.verify(kind, record_id)
+    if record is None:
+        return jsonify({"status": "error", "message": "마스터 레코드를 찾을 수 없습니다."}), 404
+    return jsonify({"status": "success", "record": record})
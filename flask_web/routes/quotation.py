@@ -0,0 +1,33 @@
+from flask import Blueprint, jsonify, request
+from services.quotation_service import quotation_pricer
+
+bp = Blueprint('quotation', __name__, url_prefix='/api/quotation')
+
+def _price_options(data):
+    return {"nights": data.get('nights'), "grade": data.get('grade'), "destination": data.get('destination'),
+            "product": data.get('product'), "single_rooms": int(data.get('single_rooms') or 0)}
+
+@bp.route('/price', methods=['POST'])
+def quote_price():
+    """ {"date": "2025-11-01", "pax": 4, "nights": 3, "grade": 3, "destination": "오키나와", "single_rooms": 0} """
+    data = request.json or {}
+    if not data.get('date') or not data.get('pax'):
+        return jsonify({"status": "error", "message": "date, pax가 필요합니다."}), 400
+    try:
+        options = quotation_pricer.quote(data['date'], data['pax'], **_price_options(data))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "success", "options": options})
+
+@bp.route('/price/range', methods=['POST'])
+def quote_price_range():
+    """ 대체 출발일 비교: {"start_date", "end_date", "pax", ... , "top": 3} -> 날짜별 최저가 상품 """
+    data = request.json or {}
+    if not data.get('start_date') or not data.get('end_date') or not data.get('pax'):
+        return jsonify({"status": "error", "message": "start_date, end_date, pax가 필요합니다."}), 400
+    try:
+        result = quotation_pricer.quote_range(data['start_date'], data['end_date'], data['pax'],
+                                              top=int(data.get('top') or 3), **_price_options(data))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "success", **result})
@@ -9,3 +9,21 @@ def summarize_request():
     text = data.get('text', '')
     result = ai_service.summarize_request(text)
     return jsonify(result)
+
+@bp.route('/summarize/batch', methods=['POST'])
+def summarize_batch():
+    """ 여러 대화를 한 번에 요약: {"texts": [...], "max_new_tokens": 64, "num_beams": 4} """
+    data = request.json or {}
+    texts = data.get('texts')
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"status": "error", "message": "texts 목록이 비어 있습니다."}), 400
+
+    try:
+        max_new_tokens = int(data['max_new_tokens']) if data.get('max_new_tokens') else None
+        num_beams = int(data['num_beams']) if data.get('num_beams') else None
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "max_new_tokens, num_beams는 숫자여야 합니다."}), 400
+
+    results = ai_service.summarize_batch([str(text) if text else "" for text in texts],
+                                         max_new_tokens=max_new_tokens, num_beams=num_beams)
+    return jsonify({"status": "success", "results": results})
@@ -0,0 +1,33 @@
+from flask import Blueprint, jsonify
+from services.cache_service import result_cache
+from services.ai_service import ai_service
+from services.gazetteer_service import gazetteer
+from services.model_loader import process_memory
+
+bp = Blueprint('system', __name__, url_prefix='/api/system')
+
+@bp.route('/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.get_stats())
+
+@bp.route('/cache/clear', methods=['POST'])
+def clear_cache():
+    result_cache.clear()
+    return jsonify({"status": "success"})
+
+@bp.route('/models', methods=['GET'])
+def model_stats():
+    return jsonify(ai_service.models.get_stats())
+
+@bp.route('/memory', methods=['GET'])
+def memory_stats():
+    # 이 워커 프로세스의 메모리 (pss: 매핑된 가중치처럼 워커끼리 공유하는 페이지는 나눠서 계산)
+    return jsonify(process_memory())
+
+@bp.route('/ner', methods=['GET'])
+def ner_stats():
+    # 규칙만으로 끝난 문서 수, 모델에 넘긴 글자 비율
+    stats = dict(ai_service.ner_stats)
+    stats["model_char_ratio"] = round(stats["model_chars"] / stats["total_chars"], 4) if stats["total_chars"] else 0.0
+    stats["gazetteer"] = gazetteer.get_stats()
+    return jsonify(stats)
@@ -1,7 +1,19 @@
+import hashlib
 import os
+import queue
+import threading
+import numpy as np
 import torch
-from transformers import AutoTokenizer, ElectraForTokenClassification
+import torch.nn as nn
 from services.parsing_service import parsing_manager
+from services.batching_service import MicroBatcher
+from services.cache_service import result_cache
+from services.model_registry import ModelRegistry
+from services.model_loader import load_pretrained
+from services.ner_backends import load_ner_model, NER_BACKEND
+from services.master_service import master_catalog, MASTER_AUTO_REGISTER
+from services.rule_service import rule_extractor
+from services.gazetteer_service import gazetteer
 
 LABEL_LIST = [
     "O",
@@ -12,6 +24,58 @@ LABEL_LIST = [
     "B-REFUND", "I-REFUND", "B-DATE", "I-DATE", "B-CITY", "I-CITY", "B-NOTE", "I-NOTE"
 ]
 ID2LABEL = {i: label for i, label in enumerate(LABEL_LIST)}
+# BIO 디코딩용 라벨 표: 라벨 번호 -> 엔티티 종류 번호(O는 -1) / B- 여부
+ENTITY_TYPES = list(dict.fromkeys(label[2:] for label in LABEL_LIST if label != "O"))
+LABEL_TYPE_IDS = np.array([ENTITY_TYPES.index(label[2:]) if label != "O" else -1 for label in LABEL_LIST])
+LABEL_IS_BEGIN = np.array([label.startswith("B-") for label in LABEL_LIST])
+
+# [M2] 랜드사 답변 3중 분류 (3중분류.csv의 label 번호 순서)
+SENTIMENT_LABELS = ["불가", "확정", "보류"]
+
+# [M4] 가격 예측 입력/출력 길이 (과거 30일 -> 다음 1일)
+FORECAST_TIME_STEPS = 30
+FORECAST_HORIZON = 1
+# 여러 시계열을 한 번에 굴릴 때 한 forward에 넣는 최대 시계열 수
+FORECAST_BATCH_SIZE = int(os.environ.get('FORECAST_BATCH_SIZE', 4096))
+
+# [M3] 요약 생성 설정
+SUMMARY_NUM_BEAMS = int(os.environ.get('SUMMARY_NUM_BEAMS', 4))
+SUMMARY_MAX_NEW_TOKENS = int(os.environ.get('SUMMARY_MAX_NEW_TOKENS', 64))
+SUMMARY_BATCH_SIZE = int(os.environ.get('SUMMARY_BATCH_SIZE', 8))
+
+# NER 추론 설정 (배치 크기는 CPU 서버 사양에 맞게 환경변수로 조절)
+NER_MAX_LENGTH = 512
+NER_BATCH_SIZE = int(os.environ.get('NER_BATCH_SIZE', 16))
+# 긴 문서는 NER_MAX_LENGTH 단위 윈도우로 나눠 추론 (NER_WINDOW_STRIDE = 윈도우 간 겹치는 토큰 수)
+NER_SLIDING_WINDOW = os.environ.get('NER_SLIDING_WINDOW', '1') == '1'
+NER_WINDOW_STRIDE = int(os.environ.get('NER_WINDOW_STRIDE', 128))
+# /api/product/analyze 동시 요청 묶음 설정 (최대 대기 ms / 최대 묶음 개수)
+NER_MICRO_BATCH_WAIT_MS = float(os.environ.get('NER_MICRO_BATCH_WAIT_MS', 10))
+NER_MICRO_BATCH_SIZE = int(os.environ.get('NER_MICRO_BATCH_SIZE', NER_BATCH_SIZE))
+# 형식이 정해진 필드(편명/시간/날짜/금액/등급/항공사/도시)는 규칙으로 먼저 태깅하고, 모델은 규칙으로 다 설명되지 않는 줄에만 (0이면 항상 전체 모델)
+NER_RULES = os.environ.get('NER_RULES', '1') == '1'
+# 호텔/골프장/도시 이름은 마스터 사전(Aho-Corasick)으로 먼저 찾음 (모델이 서브워드 경계에서 이름을 쪼개는 문제 방지)
+NER_GAZETTEER = os.environ.get('NER_GAZETTEER', '1') == '1'
+# 서빙할 NER 모델 폴더 (MODEL_DIR 기준): koelectra_ner(기본) / koelectra_ner_student(distill_ner.py로 만든 증류 학생 모델)
+NER_MODEL = os.environ.get('NER_MODEL', 'koelectra_ner')
+# 디코딩 결과 형식이 바뀌면 올려서 예전 캐시를 무효화
+NER_DECODER_VERSION = "6"
+
+
+class SimpleNBeats(nn.Module):
+    """ [M4] N-BEATS 스타일 가격 예측 모델 (nbeats_forecast.pth 가중치 구조와 동일) """
+
+    def __init__(self, input_dim=FORECAST_TIME_STEPS, output_dim=FORECAST_HORIZON, hidden_dim=64):
+        super(SimpleNBeats, self).__init__()
+        self.fc1 = nn.Linear(input_dim, hidden_dim)
+        self.fc2 = nn.Linear(hidden_dim, hidden_dim)
+        self.fc3 = nn.Linear(hidden_dim, output_dim)
+        self.relu = nn.ReLU()
+
+    def forward(self, x):
+        out = self.relu(self.fc1(x))
+        out = self.relu(self.fc2(out))
+        return self.fc3(out)
 
 
 class AIService:
@@ -28,37 +92,253 @@ class AIService:
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.model_dir = os.environ.get('MODEL_DIR', os.path.join(self.base_dir, '../models'))
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.models = {}
-        self.tokenizer = None
+        # 모델은 여기서 로드하지 않음: 처음 쓰는 순간 레지스트리가 로드 (웹 워커 기동 시간 단축)
+        self.models = ModelRegistry()
+        self.ner_stats = {"documents": 0, "model_skipped": 0, "total_chars": 0, "model_chars": 0}
+        self.ner_stats_lock = threading.Lock()
+        self.ner_batcher = MicroBatcher(self._extract_spans_batch, max_batch_size=NER_MICRO_BATCH_SIZE,
+                                        max_wait_ms=NER_MICRO_BATCH_WAIT_MS, name="ner-micro-batcher")
         self.load_resources()
         self._initialized = True
 
-    def load_resources(self):
-        print(f"🚀 AI 서비스 로딩 (Device: {self.device})")
-        try:
-            tok_path = os.path.join(self.model_dir, 'tokenizer')
-            if os.path.exists(tok_path):
-                self.tokenizer = AutoTokenizer.from_pretrained(tok_path)
-            else:
-                self.tokenizer = AutoTokenizer.from_pretrained("monologg/koelectra-base-v3-discriminator")
+    @property
+    def tokenizer(self):
+        return self.models['tokenizer']
 
+    def load_resources(self):
+        """ 모델 로더 등록 (실제 로드는 models[이름] 으로 처음 접근할 때) """
+        print(f"🚀 AI 서비스 준비 (Device: {self.device}, NER: {NER_MODEL}/{NER_BACKEND}, 모델은 첫 요청 시 로드)")
+        tok_path = os.path.join(self.model_dir, 'tokenizer')
+        m1_path = os.path.join(self.model_dir, NER_MODEL)
+        if not os.path.exists(m1_path):
+            print(f"  ⚠️ NER 모델 폴더 없음: {NER_MODEL} - koelectra_ner 사용")
             m1_path = os.path.join(self.model_dir, 'koelectra_ner')
-            if os.path.exists(m1_path):
-                self.models['ner'] = ElectraForTokenClassification.from_pretrained(m1_path).to(self.device)
-                self.models['ner'].eval()
-                print("  ✅ [M1] 고도화된 NER 모델 로드 완료")
-            else:
-                print(f"  ⚠️ 모델 없음: {m1_path}")
-        except Exception as e:
-            print(f"❌ 로딩 에러: {e}")
+        m2_path = os.path.join(self.model_dir, 'koelectra_sentiment')
+        m3_path = os.path.join(self.model_dir, 'kobart_summary')
+        m4_path = os.path.join(self.model_dir, 'nbeats_forecast.pth')
+        m5_path = os.path.join(self.model_dir, 'koelectra_multitask')
+
+        self.models.register('tokenizer', lambda: self._load_tokenizer(tok_path), pinned=True)
+        self.models.register('ner', lambda: load_ner_model(m1_path, self.device, NER_BACKEND), m1_path)
+        self.models.register('sentiment', lambda: self._load_hf_model('ElectraForSequenceClassification', m2_path), m2_path)
+        self.models.register('summarizer', lambda: self._load_hf_model('BartForConditionalGeneration', m3_path), m3_path)
+        self.models.register('summarizer_tokenizer', lambda: self._load_summarizer_tokenizer(m3_path), m3_path)
+        self.models.register('forecaster', lambda: self._load_forecaster(m4_path), m4_path)
+        self.models.register('multitask', lambda: self._load_multitask(m5_path), m5_path)
+
+        for name in ['ner', 'sentiment', 'summarizer', 'forecaster']:
+            if name not in self.models: print(f"  ⚠️ 모델 없음: {name}")
+
+    def _load_tokenizer(self, tok_path):
+        from transformers import AutoTokenizer
+        if os.path.exists(tok_path):
+            return AutoTokenizer.from_pretrained(tok_path)
+        return AutoTokenizer.from_pretrained("monologg/koelectra-base-v3-discriminator")
+
+    def _load_summarizer_tokenizer(self, model_path):
+        # KoBART 전용 토크나이저가 모델 폴더에 같이 저장돼 있으면 그것을, 없으면 공용 토크나이저 사용
+        from transformers import AutoTokenizer
+        if os.path.exists(os.path.join(model_path, 'tokenizer_config.json')):
+            return AutoTokenizer.from_pretrained(model_path)
+        return self.tokenizer
+
+    def _load_hf_model(self, class_name, model_path):
+        import transformers
+        return load_pretrained(getattr(transformers, class_name), model_path, self.device)
+
+    def _load_multitask(self, model_path):
+        from services.multitask_model import ElectraForMultiTask
+        return load_pretrained(ElectraForMultiTask, model_path, self.device)
+
+    def _load_forecaster(self, model_path):
+        model = SimpleNBeats().to(self.device)
+        model.load_state_dict(torch.load(model_path, map_location=self.device))
+        model.eval()
+        return model
+
+    def _ner_cache_key(self, file_path, mode="doc"):
+        if 'ner' not in self.models or not os.path.exists(file_path): return None
+        return (f"ner:{mode}:{self.models.version('ner')}:{NER_BACKEND}:{NER_SLIDING_WINDOW}:{NER_RULES}:{NER_GAZETTEER}:{NER_DECODER_VERSION}:"
+                f"{result_cache.file_hash(file_path)}")
 
     def extract_quotation_info(self, file_path):
-        raw_text = parsing_manager.parse_file(file_path)
-        if not raw_text: return {"status": "error", "message": "텍스트 추출 실패"}
-        if 'ner' not in self.models: return {"status": "warning", "raw_text": raw_text[:200]}
+        # 같은 파일 + 같은 모델이면 캐시된 태그 재사용
+        cache_key = self._ner_cache_key(file_path)
+        extracted_tags = result_cache.get(cache_key) if cache_key else None
+
+        if extracted_tags is None:
+            parse_status = {}
+            raw_text = parsing_manager.parse_file(file_path, parse_status)
+            if not raw_text: return {"status": "error", "message": "텍스트 추출 실패"}
+            if 'ner' not in self.models: return {"status": "warning", "raw_text": raw_text[:200]}
+
+            # AI 추론 (일부 페이지가 빠진 결과는 캐시하지 않음)
+            extracted_tags = self._run_ner_inference(raw_text)
+            if parse_status["complete"]: result_cache.set(cache_key, extracted_tags)
+        return self._build_quotation_result(file_path, extracted_tags)
+
+    def extract_quotation_info_streaming(self, file_path, progress_callback=None):
+        """
+        [스트리밍 처리] 파싱 스레드가 페이지/시트 조각을 만드는 동안, 먼저 나온 조각부터 NER 추론
+        - 파싱(I/O)과 추론(CPU)을 겹쳐서 큰 파일의 전체 처리 시간을 줄임
+        - 결과 구조는 extract_quotation_info와 동일 + 조각별 위치/태그 목록(chunks)
+        - progress_callback(처리한 조각 수): 배치 하나가 끝날 때마다 호출
+        """
+        if 'ner' not in self.models: return self.extract_quotation_info(file_path)
+
+        cache_key = self._ner_cache_key(file_path, mode="stream")
+        cached = result_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            result = self._build_quotation_result(file_path, cached["tags"])
+            result["chunks"] = cached["chunks"]
+            return result
+
+        chunk_queue = queue.Queue()
+        # 파싱 스레드가 끝나면서 채움 (시간 초과/에러로 건너뛴 페이지가 있으면 complete=False)
+        parse_status = {"complete": False}
+
+        def produce():
+            try:
+                for chunk in parsing_manager.iter_chunks(file_path, parse_status):
+                    chunk_queue.put(chunk)
+            finally:
+                chunk_queue.put(None)  # 종료 표시
+
+        threading.Thread(target=produce, name="chunk-producer", daemon=True).start()
+
+        merged_tags, chunk_results = {}, []
+        finished = False
+        while not finished:
+            # 첫 조각은 기다리고, 그동안 쌓인 조각은 같은 배치로 묶음
+            batch = [chunk_queue.get()]
+            while len(batch) < NER_BATCH_SIZE and batch[-1] is not None:
+                try:
+                    batch.append(chunk_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+            if not batch: continue
+
+            for chunk, tags in zip(batch, self._run_ner_inference_batch([c["text"] for c in batch])):
+                chunk_results.append({"location": chunk["location"], "tags": tags})
+                for tag, values in tags.items():
+                    merged_tags.setdefault(tag, []).extend(values)
+            if progress_callback: progress_callback(len(chunk_results))
+
+        if not chunk_results: return {"status": "error", "message": "텍스트 추출 실패"}
+
+        # 일부 페이지가 빠진 결과는 캐시하지 않음 (다음 요청에서 다시 파싱)
+        if parse_status["complete"]:
+            result_cache.set(cache_key, {"tags": merged_tags, "chunks": chunk_results})
+        result = self._build_quotation_result(file_path, merged_tags)
+        result["chunks"] = chunk_results
+        return result
+
+    def extract_entities(self, text):
+        """
+        [텍스트 분석] 붙여넣은 상품/카톡 텍스트에서 엔티티 추출
+        - 동시에 들어온 요청은 ner_batcher가 모아서 한 번의 배치 forward로 처리
+        - entities: 원문 위치(start/end)와 신뢰도(score)가 붙은 엔티티 목록 (화면에서 원문 하이라이트용)
+        """
+        if not text: return {"status": "error", "message": "텍스트가 비어 있습니다."}
+        if 'ner' not in self.models: return {"status": "warning", "raw_text": text[:200]}
+
+        spans = self.ner_batcher.submit(text)
+        extracted_tags = self._spans_to_tags(spans)
+        return {
+            "status": "success",
+            "data": self._map_to_form(extracted_tags),
+            "raw_data": extracted_tags,
+            "entities": spans
+        }
+
+    def extract_entities_batch(self, texts):
+        """ [텍스트 분석 배치] 여러 메시지를 한 번에 추론, 각 항목은 extract_entities 결과와 같은 구조 """
+        if 'ner' not in self.models: return [{"status": "warning", "raw_text": (text or "")[:200]} for text in texts]
+
+        results = [{"status": "error", "message": "텍스트가 비어 있습니다."} if not text else None for text in texts]
+        valid = [i for i, text in enumerate(texts) if text]
+        if not valid: return results
+        for i, spans in zip(valid, self._extract_spans_batch([texts[i] for i in valid])):
+            extracted_tags = self._spans_to_tags(spans)
+            results[i] = {
+                "status": "success",
+                "data": self._map_to_form(extracted_tags),
+                "raw_data": extracted_tags,
+                "entities": spans
+            }
+        return results
+
+    def analyze_messages_batch(self, texts):
+        """
+        [M1+M2 함께] 메시지마다 (3중 분류 결과, 엔티티 추출 결과) - 각각 analyze_sentiment_batch / extract_entities_batch와 같은 구조
+        - 멀티태스크 모델(koelectra_multitask)이 있으면 인코더 한 번으로 두 헤드를 같이 계산
+        - 모델 NER 스팬은 문서 전체 기준(분류 때문에 어차피 전체를 인코딩), 규칙/사전 스팬이 있으면 그쪽 우선
+        - 멀티태스크 모델이 없으면 분류 모델과 NER 모델을 각각 실행
+        """
+        if 'multitask' not in self.models:
+            return list(zip(self.analyze_sentiment_batch(texts), self.extract_entities_batch(texts)))
+
+        empty = {"status": "error", "message": "텍스트가 비어 있습니다."}
+        results = [(empty, empty) if not text else None for text in texts]
+        valid = [i for i, text in enumerate(texts) if text]
+        if not valid: return results
+
+        valid_texts = [texts[i] for i in valid]
+        model = self.models['multitask']
+        model_spans, sentiment_logits = self._run_token_model(valid_texts, model)
+        labels = getattr(model.config, "sentiment_labels", None) or self._sentiment_labels(sentiment_logits.shape[1])
+        probs = np.exp(sentiment_logits - sentiment_logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        for i, text, spans, row in zip(valid, valid_texts, model_spans, probs):
+            fixed = gazetteer.find(text) if NER_GAZETTEER else []
+            if NER_RULES: fixed = rule_extractor.resolve_overlaps(fixed + rule_extractor.extract(text))
+            spans = rule_extractor.merge(fixed, [dict(span, source="model") for span in spans])
+            extracted_tags = self._spans_to_tags(spans)
+            best = int(np.argmax(row))
+            results[i] = (
+                {"status": "success", "label": labels[best], "score": round(float(row[best]), 4),
+                 "scores": {label: round(float(p), 4) for label, p in zip(labels, row)}},
+                {"status": "success", "data": self._map_to_form(extracted_tags), "raw_data": extracted_tags,
+                 "entities": spans}
+            )
+        return results
+
+    def extract_quotation_info_batch(self, file_paths):
+        """
+        [배치 처리] 여러 견적서를 한 번에 파싱 후, 길이가 비슷한 문서끼리 묶어 NER 추론
+        - 반환값은 file_paths 순서 그대로, 각 항목은 extract_quotation_info 결과와 동일한 구조
+        """
+        results = [None] * len(file_paths)
+        texts, text_index, cache_keys = [], [], {}
+
+        for i, file_path in enumerate(file_paths):
+            cache_key = self._ner_cache_key(file_path)
+            cached_tags = result_cache.get(cache_key) if cache_key else None
+            if cached_tags is not None:
+                results[i] = self._build_quotation_result(file_path, cached_tags)
+                continue
+
+            raw_text = parsing_manager.parse_file(file_path)
+            if not raw_text:
+                results[i] = {"status": "error", "message": "텍스트 추출 실패"}
+            elif 'ner' not in self.models:
+                results[i] = {"status": "warning", "raw_text": raw_text[:200]}
+            else:
+                texts.append(raw_text)
+                text_index.append(i)
+                cache_keys[i] = cache_key
+
+        if texts:
+            for i, extracted_tags in zip(text_index, self._run_ner_inference_batch(texts)):
+                result_cache.set(cache_keys[i], extracted_tags)
+                results[i] = self._build_quotation_result(file_paths[i], extracted_tags)
+        return results
 
-        # AI 추론
-        extracted_tags = self._run_ner_inference(raw_text)
+    def _build_quotation_result(self, file_path, extracted_tags):
         # 폼 매핑
         form_data = self._map_to_form(extracted_tags)
 
@@ -69,38 +349,331 @@ class AIService:
             "raw_data": extracted_tags
         }
 
-    def _run_ner_inference(self, text):
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512).to(self.device)
-        with torch.no_grad():
-            outputs = self.models['ner'](**inputs)
-            predictions = torch.argmax(outputs.logits, dim=2)
-
-        tokens = self.tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
-        preds = predictions[0].cpu().numpy()
-
-        results = {}
-        current_entity = None
-        current_word = ""
-
-        for token, pred_idx in zip(tokens, preds):
-            if token in ["[CLS]", "[SEP]", "[PAD]"]: continue
-            label = ID2LABEL.get(pred_idx, 'O')
-            clean_token = token.replace("##", "")
-
-            if label.startswith("B-"):
-                if current_entity: results.setdefault(current_entity, []).append(current_word)
-                current_entity = label.split("-")[1]
-                current_word = clean_token
-            elif label.startswith("I-") and current_entity == label.split("-")[1]:
-                current_word += clean_token
+    def _run_ner_inference(self, text, stride=None):
+        return self._run_ner_inference_batch([text], stride=stride)[0]
+
+    def _run_ner_inference_batch(self, texts, batch_size=None, stride=None):
+        """ 문서별 {태그: [문자열, ...]} (폼 매핑/캐시용) """
+        return [self._spans_to_tags(spans) for spans in self._extract_spans_batch(texts, batch_size, stride)]
+
+    def _extract_spans_batch(self, texts, batch_size=None, stride=None):
+        """
+        [규칙 + 사전 + 모델] 규칙/사전 스팬을 먼저 잡고, 모델은 그걸로 다 설명되지 않는 구간(rule_extractor.model_segments)에만 배치로 실행
+        - 카톡 한두 줄처럼 편명/시간/날짜/금액뿐인 텍스트는 모델 호출 없이 끝남
+        - 호텔/골프장/도시 이름은 마스터 사전에서 찾은 것이 우선 (source="gazetteer", master_id 포함)
+        - 겹치면 규칙/사전 스팬 우선, 모델 스팬 위치는 원문 기준으로 되돌림
+        """
+        fixed = [[] for _ in texts]
+        if NER_GAZETTEER:
+            fixed = [gazetteer.find(text) for text in texts]
+        if not NER_RULES:
+            model_spans = self._run_ner_spans_batch(texts, batch_size, stride)
+            return [rule_extractor.merge(f, spans) for f, spans in zip(fixed, model_spans)]
+
+        fixed = [rule_extractor.resolve_overlaps(f + rule_extractor.extract(text)) for f, text in zip(fixed, texts)]
+        model = [[] for _ in texts]
+        segments = [(doc, start, end) for doc, text in enumerate(texts)
+                    for start, end in rule_extractor.model_segments(text, fixed[doc])]
+        if segments:
+            model_spans = self._run_ner_spans_batch([texts[doc][start:end] for doc, start, end in segments], batch_size, stride)
+            for (doc, start, _), spans in zip(segments, model_spans):
+                model[doc].extend(dict(span, start=span["start"] + start, end=span["end"] + start, source="model")
+                                  for span in spans)
+
+        with self.ner_stats_lock:
+            self.ner_stats["documents"] += len(texts)
+            self.ner_stats["model_skipped"] += len(texts) - len({doc for doc, _, _ in segments})
+            self.ner_stats["total_chars"] += sum(len(text) for text in texts)
+            self.ner_stats["model_chars"] += sum(end - start for _, start, end in segments)
+        return [rule_extractor.merge(f, spans) for f, spans in zip(fixed, model)]
+
+    def _run_ner_spans_batch(self, texts, batch_size=None, stride=None):
+        return self._run_token_model(texts, self.models['ner'], batch_size, stride)[0]
+
+    def _run_token_model(self, texts, model, batch_size=None, stride=None):
+        """
+        [배치 추론] 문서를 슬라이딩 윈도우로 자름 -> 길이순 정렬 -> batch_size 단위로 묶어 배치 내 최장 길이까지만 패딩
+        - 512 토큰을 넘는 문서도 뒷부분(가격/환불규정 등)이 잘리지 않음
+        - 겹치는 구간의 logits는 평균내어 합친 뒤, 문서 전체 토큰열에서 엔티티 스팬을 복원
+        - 모델 출력에 sentiment_logits가 있으면(멀티태스크) 윈도우 평균을 문서별로 함께 반환, 없으면 None
+        """
+        batch_size = batch_size or NER_BATCH_SIZE
+        stride = NER_WINDOW_STRIDE if stride is None else stride
+        window_size = min(NER_MAX_LENGTH, model.config.max_position_embeddings) - 2  # [CLS], [SEP] 자리
+        max_windows = None if NER_SLIDING_WINDOW else 1
+
+        encodings = self.tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        doc_ids = encodings["input_ids"]
+
+        # (문서 번호, 문서 내 시작 위치, 윈도우 토큰)
+        windows = []
+        for doc_idx, ids in enumerate(doc_ids):
+            for offset, window in self._split_windows(ids, window_size, stride, max_windows):
+                windows.append((doc_idx, offset, window))
+
+        merged = [np.zeros((len(ids), model.config.num_labels), dtype=np.float32) for ids in doc_ids]
+        counts = [np.zeros(len(ids), dtype=np.float32) for ids in doc_ids]
+        sequence_logits, window_counts = None, np.zeros(len(doc_ids), dtype=np.float32)
+
+        order = sorted(range(len(windows)), key=lambda i: len(windows[i][2]))
+        for start in range(0, len(order), batch_size):
+            chunk = [windows[i] for i in order[start:start + batch_size]]
+            features = {"input_ids": [self.tokenizer.build_inputs_with_special_tokens(w) for _, _, w in chunk]}
+            # 양자화/ONNX 백엔드는 CPU에서 돌기 때문에 입력은 모델 쪽 device로 보냄
+            inputs = self.tokenizer.pad(features, return_tensors="pt").to(model.device)
+
+            with torch.no_grad():
+                outputs = model(**inputs)
+                logits = outputs.logits.float().cpu().numpy()
+                sentiment = getattr(outputs, "sentiment_logits", None)
+                if sentiment is not None: sentiment = sentiment.float().cpu().numpy()
+
+            for row, (doc_idx, offset, window) in enumerate(chunk):
+                end = offset + len(window)
+                merged[doc_idx][offset:end] += logits[row, 1:1 + len(window)]
+                counts[doc_idx][offset:end] += 1
+                if sentiment is not None:
+                    if sequence_logits is None:
+                        sequence_logits = np.zeros((len(doc_ids), sentiment.shape[1]), dtype=np.float32)
+                    sequence_logits[doc_idx] += sentiment[row]
+                    window_counts[doc_idx] += 1
+
+        results = []
+        for text, offsets, doc_logits, doc_counts in zip(texts, encodings["offset_mapping"], merged, counts):
+            # 윈도우가 덮은 구간은 항상 문서 앞부분 (NER_SLIDING_WINDOW=0 이면 첫 윈도우만)
+            covered = int(np.count_nonzero(doc_counts))
+            logits = doc_logits[:covered] / doc_counts[:covered, None]
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            results.append(self._decode_spans(text, np.asarray(offsets[:covered]).reshape(-1, 2), probs))
+        if sequence_logits is not None: sequence_logits /= np.maximum(window_counts, 1)[:, None]
+        return results, sequence_logits
+
+    def _split_windows(self, ids, window_size, stride, max_windows=None):
+        """ 토큰열을 stride 만큼 겹치는 (시작 위치, 윈도우) 목록으로 분할 """
+        # 겹침은 윈도우의 절반까지만 (작은 모델에서 이동 폭이 1토큰까지 줄어드는 것 방지)
+        stride = min(max(stride, 0), window_size // 2)
+        step = window_size - stride
+        windows = [(0, ids[:window_size])]
+        start = 0
+        while start + window_size < len(ids):
+            if max_windows and len(windows) >= max_windows: break
+            start += step
+            windows.append((start, ids[start:start + window_size]))
+        return windows
+
+    def _decode_spans(self, text, offsets, probs):
+        """
+        [BIO 디코딩] 토큰별 라벨 확률 -> 엔티티 스팬 [{tag, text, start, end, score}, ...]
+        - B-로 시작해 같은 종류의 I-가 이어지는 구간이 하나의 엔티티 (앞에 B- 없이 나온 I-는 버림)
+        - 구간 경계는 NumPy로 한 번에 계산, 파이썬 반복은 엔티티 개수만큼만
+        - 문자열은 offset_mapping으로 원문에서 그대로 잘라냄 (## 조각 이어붙이기 없이 띄어쓰기까지 원문 그대로)
+        - score: 엔티티를 이루는 토큰들의 예측 확률 평균
+        """
+        if len(probs) == 0: return []
+        label_ids = probs.argmax(axis=1)
+        confidence = probs.max(axis=1)
+        label_ids[label_ids >= len(LABEL_LIST)] = 0  # 라벨 표에 없는 번호는 O로 취급
+        types = LABEL_TYPE_IDS[label_ids]
+        is_begin = LABEL_IS_BEGIN[label_ids]
+
+        # 구간 경계: O / B- / 앞 토큰과 엔티티 종류가 다름 (앞 토큰이 O인 경우 포함)
+        prev_types = np.concatenate(([-1], types[:-1]))
+        breaks = np.flatnonzero((types < 0) | is_begin | (types != prev_types))
+        starts = np.flatnonzero(is_begin)
+        ends = np.append(breaks, len(types))[np.searchsorted(breaks, starts, side='right')]
+
+        cumulative = np.concatenate(([0.0], np.cumsum(confidence, dtype=np.float64)))
+        scores = (cumulative[ends] - cumulative[starts]) / (ends - starts)
+        char_starts, char_ends = offsets[starts, 0], offsets[ends - 1, 1]
+
+        return [{"tag": ENTITY_TYPES[types[s]], "text": text[cs:ce], "start": int(cs), "end": int(ce),
+                 "score": round(float(score), 4)}
+                for s, cs, ce, score in zip(starts, char_starts, char_ends, scores)]
+
+    def _spans_to_tags(self, spans):
+        """ 엔티티 스팬 목록 -> {태그: [문자열, ...]} (규칙/사전으로 찾은 값이 모델 값보다 앞에 -> 폼 매핑에서 먼저 사용) """
+        tags = {}
+        for span in sorted(spans, key=lambda s: s.get("source") == "model"):
+            tags.setdefault(span["tag"], []).append(span["text"])
+        return tags
+
+    # ---------------------------------------------------------
+    # [M2] 답변 분류 / [M3] 요약 / [M4] 가격 예측
+    # ---------------------------------------------------------
+
+    def analyze_sentiment(self, text):
+        """ [M2] 랜드사 답변/고객 메시지 3중 분류 (불가/확정/보류) """
+        if not text: return {"status": "error", "message": "텍스트가 비어 있습니다."}
+        if 'sentiment' not in self.models: return {"status": "warning", "message": "분류 모델이 없습니다."}
+        return self.analyze_sentiment_batch([text])[0]
+
+    def analyze_sentiment_batch(self, texts, batch_size=None, max_length=None):
+        """
+        [M2 배치 분류] 여러 메시지를 길이순으로 묶어 분류, 결과는 texts 순서 그대로
+        - max_length: 입력 토큰 상한 (짧은 채팅 메시지는 작게 잡으면 더 빠름)
+        """
+        if 'sentiment' not in self.models:
+            return [{"status": "warning", "message": "분류 모델이 없습니다."} for _ in texts]
+        batch_size = batch_size or NER_BATCH_SIZE
+        model = self.models['sentiment']
+        max_length = min(max_length or NER_MAX_LENGTH, model.config.max_position_embeddings)
+
+        results = [{"status": "error", "message": "텍스트가 비어 있습니다."} if not text else None for text in texts]
+        valid = [i for i, text in enumerate(texts) if text]
+        if not valid: return results
+        input_ids = self.tokenizer([texts[i] for i in valid], truncation=True, max_length=max_length,
+                                   verbose=False)["input_ids"]
+        order = sorted(range(len(valid)), key=lambda j: len(input_ids[j]))
+
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            inputs = self.tokenizer.pad({"input_ids": [input_ids[j] for j in chunk]}, return_tensors="pt").to(model.device)
+            with torch.no_grad():
+                probs = torch.softmax(model(**inputs).logits.float(), dim=-1).cpu().numpy()
+
+            labels = self._sentiment_labels(probs.shape[1])
+            for j, row in zip(chunk, probs):
+                best = int(np.argmax(row))
+                results[valid[j]] = {
+                    "status": "success",
+                    "label": labels[best],
+                    "score": round(float(row[best]), 4),
+                    "scores": {label: round(float(p), 4) for label, p in zip(labels, row)}
+                }
+        return results
+
+    def _sentiment_labels(self, num_labels):
+        if num_labels == len(SENTIMENT_LABELS): return SENTIMENT_LABELS
+        return [f"LABEL_{i}" for i in range(num_labels)]
+
+    def summarize_request(self, text):
+        """ [M3] 고객 카톡 요청사항 요약 (KoBART) """
+        if not text: return {"status": "error", "message": "텍스트가 비어 있습니다."}
+        if 'summarizer' not in self.models: return {"status": "warning", "message": "요약 모델이 없습니다."}
+        return self.summarize_batch([text])[0]
+
+    def summarize_batch(self, texts, max_new_tokens=None, num_beams=None, batch_size=None):
+        """
+        [M3 배치 요약] 여러 대화를 입력 길이순으로 묶어 배치 generate()로 요약
+        - 결과는 texts 순서 그대로, 각 항목은 summarize_request 결과와 같은 구조
+        - 공백을 정리한 텍스트 + 모델 버전 + 생성 설정이 같으면 캐시된 요약 재사용 (같은 대화가 여러 번 있어도 한 번만 생성)
+        - num_beams=1 이면 greedy 생성 (가장 빠름)
+        """
+        max_new_tokens = max_new_tokens or SUMMARY_MAX_NEW_TOKENS
+        num_beams = num_beams or SUMMARY_NUM_BEAMS
+        batch_size = batch_size or SUMMARY_BATCH_SIZE
+        if 'summarizer' not in self.models:
+            return [{"status": "warning", "message": "요약 모델이 없습니다."} for _ in texts]
+
+        results = [None] * len(texts)
+        pending = {}  # 캐시 키 -> (정규화 텍스트, 결과를 채울 위치들)
+        for i, text in enumerate(texts):
+            normalized = " ".join((text or "").split())
+            if not normalized:
+                results[i] = {"status": "error", "message": "텍스트가 비어 있습니다."}
+                continue
+            cache_key = self._summary_cache_key(normalized, max_new_tokens, num_beams)
+            summary = result_cache.get(cache_key)
+            if summary is not None:
+                results[i] = {"status": "success", "summary": summary}
             else:
-                if current_entity:
-                    results.setdefault(current_entity, []).append(current_word)
-                    current_entity = None
-                    current_word = ""
-        if current_entity: results.setdefault(current_entity, []).append(current_word)
+                pending.setdefault(cache_key, (normalized, []))[1].append(i)
+
+        if pending:
+            keys = list(pending)
+            summaries = self._generate_summaries([pending[key][0] for key in keys], max_new_tokens, num_beams, batch_size)
+            for key, summary in zip(keys, summaries):
+                result_cache.set(key, summary)
+                for i in pending[key][1]:
+                    results[i] = {"status": "success", "summary": summary}
+        return results
+
+    def _summary_cache_key(self, normalized_text, max_new_tokens, num_beams):
+        text_hash = hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()
+        return f"summary:{self.models.version('summarizer')}:{max_new_tokens}:{num_beams}:{text_hash}"
+
+    def _generate_summaries(self, texts, max_new_tokens, num_beams, batch_size):
+        model = self.models['summarizer']
+        tokenizer = self.models['summarizer_tokenizer']
+        max_length = min(NER_MAX_LENGTH, model.config.max_position_embeddings)
+        input_ids = tokenizer(texts, truncation=True, max_length=max_length, verbose=False)["input_ids"]
+
+        # 길이가 비슷한 대화끼리 묶어 패딩 낭비를 줄임
+        order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+        options = {"num_beams": num_beams, "max_new_tokens": max_new_tokens}
+        if num_beams > 1: options["early_stopping"] = True
+
+        summaries = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            inputs = tokenizer.pad({"input_ids": [input_ids[i] for i in chunk]}, return_tensors="pt").to(self.device)
+            with torch.no_grad():
+                summary_ids = model.generate(inputs["input_ids"], attention_mask=inputs["attention_mask"], **options)
+            for i, summary in zip(chunk, tokenizer.batch_decode(summary_ids, skip_special_tokens=True)):
+                summaries[i] = summary
+        return summaries
+
+    def forecast_price(self, date_range, history=None):
+        """
+        [M4] 가격 예측: 최근 가격 이력(history)으로 date_range 날짜마다 다음 값을 한 걸음씩 예측
+        - 이력이 30일보다 짧으면 가장 오래된 값으로 앞을 채움
+        """
+        if 'forecaster' not in self.models: return {"status": "warning", "message": "예측 모델이 없습니다."}
+        if not history: return {"status": "error", "message": "가격 이력(history)이 필요합니다."}
+
+        result = self.forecast_batch([{"history": history, "date_range": date_range}])[0]
+        result.pop("key", None)
+        return result
+
+    def forecast_batch(self, series):
+        """
+        [M4 배치 예측] 여러 시계열(목적지/호텔 등급/시즌별 가격 이력)을 한 텐서로 쌓아 한꺼번에 예측
+        - series: [{"key": 식별값, "history": [가격, ...], "date_range": [날짜, ...]}, ...]
+        - 모든 시계열을 (N, 30) 텐서로 만든 뒤, 가장 긴 date_range 만큼 한 걸음씩 굴림 (걸음마다 forward 한 번)
+        - 결과는 series 순서 그대로, 각 항목은 forecast_price 결과 + key
+        """
+        if 'forecaster' not in self.models:
+            return [{"status": "warning", "message": "예측 모델이 없습니다.", "key": s.get("key")} for s in series]
+
+        results = [None] * len(series)
+        valid, windows = [], []
+        for i, item in enumerate(series):
+            history = item.get("history") or []
+            if not history:
+                results[i] = {"status": "error", "message": "가격 이력(history)이 필요합니다.", "key": item.get("key")}
+                continue
+            window = [float(v) for v in history[-FORECAST_TIME_STEPS:]]
+            windows.append([window[0]] * (FORECAST_TIME_STEPS - len(window)) + window)
+            valid.append(i)
+        if not valid: return results
+
+        horizons = np.array([len(series[i].get("date_range") or []) for i in valid])
+        prices = self._roll_forecast(np.array(windows, dtype=np.float32), int(horizons.max()))
+
+        for row, i in enumerate(valid):
+            dates = series[i].get("date_range") or []
+            forecast = [{"date": date, "price": round(float(price), 2)} for date, price in zip(dates, prices[row])]
+            results[i] = {"status": "success", "forecast": forecast, "key": series[i].get("key")}
         return results
 
+    def _roll_forecast(self, windows, horizon):
+        """ (N, 30) 이력 -> (N, horizon) 예측, 예측값을 입력 끝에 붙여 다음 걸음 입력으로 사용 """
+        model = self.models['forecaster']
+        output = np.zeros((len(windows), horizon), dtype=np.float32)
+        if horizon == 0: return output
+
+        with torch.no_grad():
+            for start in range(0, len(windows), FORECAST_BATCH_SIZE):
+                # 이력 30칸 + 예측 horizon칸 버퍼를 미리 잡아두고, 매 걸음 마지막 30칸만 잘라서 입력
+                buffer = torch.zeros(min(FORECAST_BATCH_SIZE, len(windows) - start), FORECAST_TIME_STEPS + horizon,
+                                     dtype=torch.float32, device=self.device)
+                buffer[:, :FORECAST_TIME_STEPS] = torch.from_numpy(windows[start:start + len(buffer)])
+                for step in range(horizon):
+                    buffer[:, FORECAST_TIME_STEPS + step] = model(buffer[:, step:step + FORECAST_TIME_STEPS])[:, 0]
+                output[start:start + len(buffer)] = buffer[:, FORECAST_TIME_STEPS:].cpu().numpy()
+        return output
+
     def _map_to_form(self, tags):
         """ [매핑 엔진] 추출된 태그를 ERP 폼 구조에 정확히 배치 """
         form = {
@@ -134,6 +707,7 @@ class AIService:
         # 2. 골프장
         if tags.get("GOLF_NAME"): form["golf_courses"][0]["name_kr"] = tags["GOLF_NAME"][0]
         if tags.get("GOLF_OP"): form["golf_courses"][0]["operation_info"] = ", ".join(tags["GOLF_OP"])
+        self._link_masters(form)
 
         # 3. 항공
         if tags.get("FLIGHT_NAME"): form["flight_info"]["airline"] = tags["FLIGHT_NAME"][0]
@@ -153,5 +727,32 @@ class AIService:
 
         return form
 
+    def _link_masters(self, form):
+        """
+        [마스터 연결] 추출한 호텔/골프장 이름 -> 마스터 레코드 ID
+        - 문서에 없는 정보(등급/위치 등)는 확인된 별칭과 정확히 일치할 때만 마스터 값으로 채움 (퍼지 매칭은 다른 호텔일 수 있음)
+        """
+        targets = [("hotel", form["hotels"][0], ["name_en", "location", "grade"]),
+                   ("golf", form["golf_courses"][0], ["name_local", "location", "operation_info"])]
+        for kind, entry, fill_fields in targets:
+            if not entry["name_kr"]: continue
+            try:
+                match = master_catalog.resolve(kind, entry["name_kr"], create=MASTER_AUTO_REGISTER,
+                                               **{f: entry.get(f, "") for f in fill_fields})
+            except Exception as e:
+                print(f"❌ 마스터 연결 실패 ({entry['name_kr']}): {e}")
+                continue
+            if match is None: continue
+            record = match["record"]
+            entry["master_id"] = record["id"]
+            entry["master_match"] = match["match"]
+            entry["master_verified"] = record["verified"]
+            if match["match"] != "exact": continue
+            for field in fill_fields:
+                if not entry.get(field) and record.get(field): entry[field] = record[field]
+
+
+ai_manager = AIService()
 
-ai_manager = AIService()
\ No newline at end of file
+# routes/*.py 에서는 ai_service 이름으로 import
+ai_service = ai_manager
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    [마이크로 배치] 여러 요청 스레드에서 들어온 입력을 모아 batch_fn 한 번으로 처리
+    - 첫 입력이 들어온 뒤 최대 max_wait_ms 동안, 최대 max_batch_size 개까지 모음
+    - batch_fn(입력 리스트) -> 같은 순서의 결과 리스트, 각 호출자는 자기 결과만 받음
+    - 모델 forward는 전용 워커 스레드 하나에서만 실행되므로 요청끼리 CPU를 두고 경쟁하지 않음
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=10, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.stats = {"batches": 0, "items": 0}
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, item, timeout=None):
+        """ 입력 하나를 넣고 결과가 나올 때까지 대기 (batch_fn에서 난 예외는 그대로 전달) """
+        return self.submit_async(item).result(timeout=timeout)
+
+    def submit_async(self, item):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_worker(self):
+        # 워커는 첫 요청 때 띄움 (gunicorn fork 이후 각 프로세스에서 생성되도록)
+        if self._worker is not None and self._worker.is_alive(): return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        # 대기 시간은 끝났어도 이미 쌓여 있는 요청은 같이 처리
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    def _process(self, batch):
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch: return
+
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            print(f"❌ 배치 처리 에러 ({self.name}): {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시 설정
+# - RESULT_CACHE_SIZE: 메모리(LRU) 티어 최대 항목 수
+# - RESULT_CACHE_DB: 디스크(SQLite) 티어 파일 경로 (비워두면 디스크 티어 사용 안 함)
+# - RESULT_CACHE_DISK_MB: 디스크 티어 최대 용량, 넘으면 오래 안 쓴 항목부터 삭제
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+RESULT_CACHE_DB = os.environ.get('RESULT_CACHE_DB', '')
+RESULT_CACHE_DISK_MB = float(os.environ.get('RESULT_CACHE_DISK_MB', 512))
+
+
+class ResultCache:
+    """
+    [결과 캐시] 파일 내용 해시 기반 2단 캐시 (메모리 LRU -> SQLite)
+    - 값은 JSON으로 직렬화 가능한 것(파싱 텍스트, NER 태그 dict 등)만 저장
+    - 같은 파일을 다시 올리면 파싱/추론 없이 바로 결과 반환
+    """
+
+    def __init__(self, max_items=RESULT_CACHE_SIZE, db_path=RESULT_CACHE_DB, max_disk_mb=RESULT_CACHE_DISK_MB):
+        self.max_items = max_items
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+        self._memory = OrderedDict()
+        self._hash_memo = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        try:
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            if not os.path.exists(db_dir): os.makedirs(db_dir)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_accessed ON result_cache (accessed)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"❌ 캐시 DB 초기화 실패 ({db_path}): {e}")
+            self._db = None
+
+    # ---------------------------------------------------------
+    # 키 생성
+    # ---------------------------------------------------------
+
+    def file_hash(self, file_path):
+        """ 파일 내용 sha256 (경로+수정시각+크기가 같으면 이전 해시 재사용) """
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._hash_memo.get(memo_key)
+        if cached: return cached
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        file_hash = digest.hexdigest()
+
+        if len(self._hash_memo) >= self.max_items * 4: self._hash_memo.clear()
+        self._hash_memo[memo_key] = file_hash
+        return file_hash
+
+    # ---------------------------------------------------------
+    # 조회 / 저장
+    # ---------------------------------------------------------
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(self._memory[key])
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM result_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._db.execute("UPDATE result_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0])
+                    self.stats["disk_hits"] += 1
+                    return json.loads(row[0])
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, payload)
+            self.stats["sets"] += 1
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO result_cache (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                                 (key, payload, len(payload.encode('utf-8')), time.time()))
+                self._evict_disk()
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM result_cache")
+                self._db.commit()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+            stats["memory_items"] = len(self._memory)
+            stats["disk_enabled"] = self._db is not None
+            if self._db is not None:
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_cache").fetchone()
+                stats["disk_items"] = count
+                stats["disk_bytes"] = size
+            return stats
+
+    def _remember(self, key, payload):
+        # 메모리 티어는 직렬화된 문자열로 보관 (호출자가 결과를 수정해도 캐시가 오염되지 않음)
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM result_cache").fetchone()[0]
+        if total <= self.max_disk_bytes: return
+
+        rows = self._db.execute("SELECT key, size FROM result_cache ORDER BY accessed").fetchall()
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes: break
+            stale_keys.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM result_cache WHERE key = ?", stale_keys)
+        self.stats["evictions"] += len(stale_keys)
+
+
+result_cache = ResultCache()
@@ -0,0 +1,242 @@
+import csv
+import glob
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+
+# 카톡 대화 수집 설정
+# - CHAT_DIR: 카톡 내보내기 CSV(DATE,USER,MESSAGE) 폴더, 대화방 하나당 파일 하나 (매번 전체가 다시 내보내짐)
+# - CHAT_DB: 대화방별 워터마크(어디까지 처리했는지) 저장 SQLite 파일
+# - AGENCY_USER: 우리 쪽(여행사) 발신자 이름, 이 이름이 아닌 메시지가 고객 메시지
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAT_DIR = os.environ.get('CHAT_DIR', os.path.join(BASE_DIR, '../../ERP 필요한 데이터/3. 고객의 요청사항 (카톡 내용)/원본'))
+CHAT_FILE_PATTERN = '캐리골프투어_*.csv'
+CHAT_DB = os.environ.get('CHAT_DB', os.path.join(BASE_DIR, '../data/chat_ingest.db'))
+AGENCY_USER = os.environ.get('AGENCY_USER', '캐리골프투어')
+# 이어 읽기 전에 "지난번 끝부분이 그대로인지" 확인하는 바이트 수
+TAIL_CHECK_BYTES = 4096
+
+
+def message_hash(date, user, message):
+    return hashlib.sha256(f"{date}\x1f{user}\x1f{message}".encode('utf-8')).hexdigest()[:16]
+
+
+class ChatIngestionService:
+    """
+    [카톡 수집] 대화방 CSV를 워터마크 기준으로 새 메시지만 읽어 분류/요약/NER로 넘김
+    - 워터마크: 마지막 메시지 DATE + 메시지 해시, 그리고 파일에서 읽은 위치(바이트)와 그 직전 바이트 해시
+    - 앞부분이 그대로인 재내보내기: 지난 위치부터 끝까지만 읽음 (비용 = 새 메시지 양)
+    - 앞부분이 바뀐 경우(편집/잘림): 전체를 읽고 워터마크 메시지 이후만 새 메시지로 취급
+    - 워터마크는 분석이 끝난 뒤에 저장 (중간에 실패하면 다음 수집 때 다시 처리, at-least-once)
+    """
+
+    def __init__(self, chat_dir=CHAT_DIR, db_path=CHAT_DB):
+        self.chat_dir = chat_dir
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized: return
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
+        if not os.path.exists(db_dir): os.makedirs(db_dir)
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_watermarks (
+                    chat TEXT PRIMARY KEY, file_offset INTEGER NOT NULL, tail_hash TEXT NOT NULL,
+                    last_date TEXT, last_hash TEXT, messages INTEGER NOT NULL, updated_at REAL NOT NULL
+                )""")
+            conn.commit()
+        finally:
+            conn.close()
+        self._initialized = True
+
+    # ---------------------------------------------------------
+    # 워터마크
+    # ---------------------------------------------------------
+
+    def get_watermark(self, chat):
+        self._init_db()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM chat_watermarks WHERE chat = ?", (chat,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def save_watermark(self, chat, watermark):
+        self._init_db()
+        conn = self._connect()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO chat_watermarks
+                (chat, file_offset, tail_hash, last_date, last_hash, messages, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                         (chat, watermark["file_offset"], watermark["tail_hash"], watermark["last_date"],
+                          watermark["last_hash"], watermark["messages"], time.time()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def reset(self, chat=None):
+        """ 워터마크 삭제 (chat=None 이면 전체) -> 다음 수집 때 처음부터 다시 처리 """
+        self._init_db()
+        conn = self._connect()
+        try:
+            if chat: conn.execute("DELETE FROM chat_watermarks WHERE chat = ?", (chat,))
+            else: conn.execute("DELETE FROM chat_watermarks")
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------------------------------------------------------
+    # 읽기
+    # ---------------------------------------------------------
+
+    def chat_id(self, file_path):
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    def read_messages(self, file_path):
+        """ 파일 전체 메시지 [{date, user, message, hash}, ...] (워터마크와 무관) """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return self._parse(data, header=True)
+
+    def read_new_messages(self, file_path):
+        """
+        워터마크 이후 메시지와, 처리 후 저장할 새 워터마크를 반환 (워터마크는 여기서 저장하지 않음)
+        -> (messages, watermark, mode)  mode: full(처음) / tail(이어 읽기) / rescan(앞부분 변경으로 전체 재확인)
+        """
+        chat = self.chat_id(file_path)
+        previous = self.get_watermark(chat)
+        size = os.path.getsize(file_path)
+
+        with open(file_path, 'rb') as f:
+            if previous and self._tail_unchanged(f, previous, size):
+                f.seek(previous["file_offset"])
+                messages = self._parse(f.read(), header=False)
+                mode = "tail"
+            else:
+                f.seek(0)
+                messages = self._parse(f.read(), header=True)
+                mode = "full"
+                if previous:
+                    messages = self._after_watermark(messages, previous)
+                    mode = "rescan"
+            f.seek(max(0, size - TAIL_CHECK_BYTES))
+            tail = f.read()
+
+        last = messages[-1] if messages else None
+        watermark = {
+            "file_offset": size,
+            "tail_hash": hashlib.sha256(tail).hexdigest(),
+            "last_date": last["date"] if last else (previous or {}).get("last_date"),
+            "last_hash": last["hash"] if last else (previous or {}).get("last_hash"),
+            "messages": (previous["messages"] if previous else 0) + len(messages),
+        }
+        return messages, watermark, mode
+
+    def partial_watermark(self, messages, watermark, count):
+        """
+        read_new_messages 결과 중 앞의 count개만 처리했을 때 저장할 워터마크 (하나도 처리 못 했으면 None = 저장하지 않음)
+        - 메시지별 파일 위치는 모르므로 tail_hash를 비워서 다음 읽기를 전체 재확인(rescan)으로 -> 마지막 처리 메시지 다음부터
+        """
+        if count >= len(messages): return watermark
+        if count <= 0: return None
+        last = messages[count - 1]
+        return dict(watermark, file_offset=0, tail_hash="", last_date=last["date"], last_hash=last["hash"],
+                    messages=watermark["messages"] - len(messages) + count)
+
+    def _tail_unchanged(self, f, previous, size):
+        offset = previous["file_offset"]
+        if size < offset: return False
+        f.seek(max(0, offset - TAIL_CHECK_BYTES))
+        return hashlib.sha256(f.read(offset - max(0, offset - TAIL_CHECK_BYTES))).hexdigest() == previous["tail_hash"]
+
+    def _after_watermark(self, messages, previous):
+        # 워터마크 메시지를 뒤에서부터 찾고, 못 찾으면 마지막 DATE 이후 메시지만
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i]["hash"] == previous["last_hash"]:
+                return messages[i + 1:]
+        last_date = previous["last_date"] or ""
+        return [m for m in messages if m["date"] > last_date]
+
+    def _parse(self, data, header):
+        text = data.decode('utf-8-sig' if header else 'utf-8', errors='replace')
+        rows = csv.reader(io.StringIO(text, newline=''))
+        if header: next(rows, None)
+
+        messages = []
+        for row in rows:
+            if len(row) < 3 or not row[2].strip(): continue
+            date, user, message = row[0], row[1], row[2].strip()
+            messages.append({"date": date, "user": user, "message": message, "hash": message_hash(date, user, message)})
+        return messages
+
+    # ---------------------------------------------------------
+    # 수집 + 분석
+    # ---------------------------------------------------------
+
+    def chat_files(self):
+        return sorted(glob.glob(os.path.join(self.chat_dir, CHAT_FILE_PATTERN)))
+
+    def ingest(self, file_paths=None, analyze=True):
+        """
+        대화방 파일들의 새 메시지를 모아 한 번에 분석
+        - 고객 메시지: 한 건씩 3중 분류(불가/확정/보류) + NER
+        - 대화방별 새 대화 구간(양쪽 메시지 모두): 요약
+        - 반환: {"chats": [{chat, mode, new_messages, summary, messages: [...]}], "stats": {...}}
+        """
+        from services.ai_service import ai_service
+
+        with self._lock:
+            start = time.perf_counter()
+            file_paths = file_paths if file_paths is not None else self.chat_files()
+            pending = []
+            for file_path in file_paths:
+                try:
+                    messages, watermark, mode = self.read_new_messages(file_path)
+                except (OSError, csv.Error) as e:
+                    print(f"❌ 대화 파일 읽기 실패 ({os.path.basename(file_path)}): {e}")
+                    continue
+                pending.append({"chat": self.chat_id(file_path), "mode": mode, "messages": messages, "watermark": watermark})
+
+            new_chats = [p for p in pending if p["messages"]]
+            if analyze and new_chats:
+                self._analyze(ai_service, new_chats)
+
+            for p in pending:
+                self.save_watermark(p["chat"], p["watermark"])
+
+            new_count = sum(len(p["messages"]) for p in pending)
+            stats = {"files": len(pending), "chats_with_new": len(new_chats), "new_messages": new_count,
+                     "tail_reads": sum(p["mode"] == "tail" for p in pending),
+                     "seconds": round(time.perf_counter() - start, 3)}
+            print(f"  ✅ 카톡 수집: 파일 {stats['files']}개, 새 메시지 {new_count}건 ({stats['seconds']}s)")
+
+        chats = [{"chat": p["chat"], "mode": p["mode"], "new_messages": len(p["messages"]),
+                  "summary": p.get("summary"), "messages": p["messages"]} for p in new_chats]
+        return {"chats": chats, "stats": stats}
+
+    def _analyze(self, ai_service, chats):
+        customer = [m for chat in chats for m in chat["messages"] if m["user"] != AGENCY_USER]
+        texts = [m["message"] for m in customer]
+        for message, (sentiment, entities) in zip(customer, ai_service.analyze_messages_batch(texts)):
+            message["sentiment"] = sentiment
+            message["entities"] = entities.get("entities", [])
+
+        conversations = ["\n".join(f"{m['user']}: {m['message']}" for m in chat["messages"]) for chat in chats]
+        for chat, summary in zip(chats, ai_service.summarize_batch(conversations)):
+            chat["summary"] = summary.get("summary")
+
+
+chat_ingestion = ChatIngestionService()
@@ -0,0 +1,219 @@
+import os
+import threading
+import unicodedata
+from collections import deque
+from services.master_service import master_catalog, normalize_name, GENERIC_WORDS, KINDS, NON_WORD_PATTERN
+from services.rule_service import CITIES
+
+# 호텔/골프장/도시 사전 매칭 설정
+# - GAZETTEER_MIN_LEN: 이 길이(정규화 후 글자 수)보다 짧은 이름은 사전에서 제외 (한 글자 오등록 별칭이 문서 전체에 걸리지 않도록)
+# - GAZETTEER_MERGE_SIZE: 새로 추가된 이름은 작은 보조 오토마톤으로만 다시 만들고, 이 개수(또는 본 사전의 10%)를 넘으면 본 사전에 합쳐 전체 재구성
+GAZETTEER_MIN_LEN = int(os.environ.get('GAZETTEER_MIN_LEN', 2))
+GAZETTEER_MERGE_SIZE = int(os.environ.get('GAZETTEER_MERGE_SIZE', 256))
+
+KIND_TAGS = {"hotel": "HOTEL_NAME", "golf": "GOLF_NAME", "city": "CITY"}
+# 같은 이름이 여러 종류에 있을 때 기본 우선순위 (뒤에 붙은 일반 명사로 종류를 알 수 있으면 그쪽)
+KIND_PRIORITY = ("hotel", "golf", "city")
+GENERIC_NORMALIZED = {NON_WORD_PATTERN.sub("", word) for word in GENERIC_WORDS}
+# 이름 바로 뒤의 일반 명사 (긴 것부터) -> 매칭 범위에 포함하고 종류 판단에 사용
+TRAILING_GENERICS = sorted(GENERIC_NORMALIZED, key=len, reverse=True)
+GOLF_HINTS = ("골프", "golf", "cc", "gc", "club", "클럽")
+
+
+def _suffix_kind(word):
+    return "golf" if any(hint in word for hint in GOLF_HINTS) else "hotel"
+
+
+class _Automaton:
+    """
+    Aho-Corasick 오토마톤 (문자 단위 trie + 실패 링크)
+    - out[node] = 이 노드에서 끝나는 패턴 번호, dict_link[node] = 실패 링크를 따라가서 처음 만나는 패턴 노드
+      -> 한 위치에서 끝나는 패턴 전부(abcde에서 cde와 de 둘 다)를 출력 노드만 골라 따라가며 찾음
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.lengths = [len(p) for p in self.patterns]
+        goto, out = [{}], [-1]
+        for idx, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(-1)
+                node = nxt
+            out[node] = idx
+
+        # BFS로 실패 링크: 얕은 노드부터 채우므로 fail 대상의 dict_link는 항상 먼저 확정됨
+        fail, dict_link = [0] * len(goto), [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                dict_link[child] = fail[child] if out[fail[child]] >= 0 else dict_link[fail[child]]
+                queue.append(child)
+        self.goto, self.fail, self.out, self.dict_link = goto, fail, out, dict_link
+
+    def scan(self, stream, matches):
+        """ 한 번 훑으면서 모든 매칭을 matches에 (시작, 끝, 패턴) 으로 추가 (O(len(stream) + 매칭 수)) """
+        goto, fail, out, dict_link = self.goto, self.fail, self.out, self.dict_link
+        lengths, patterns = self.lengths, self.patterns
+        node = 0
+        for i, ch in enumerate(stream):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if out[node] >= 0 else dict_link[node]
+            while hit:
+                idx = out[hit]
+                matches.append((i + 1 - lengths[idx], i + 1, patterns[idx]))
+                hit = dict_link[hit]
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+class Gazetteer:
+    """
+    [사전 매칭] 호텔/골프장 마스터의 확인된 별칭 + 도시 목록 -> Aho-Corasick 오토마톤, 문서 한 번 훑어서 수천 개 이름을 동시에 찾음
+    - 문서는 마스터와 같은 규칙(NFKC, 소문자, 공백/기호 제거)으로 정규화한 문자열에서 매칭 -> 띄어쓰기/표기 변형 흡수
+      ("하얏트 리젠시" = "하얏트리젠시", "Hyatt Regency"), 매칭 위치는 원문 위치로 되돌림
+    - 이름 바로 뒤 일반 명사(호텔/리조트/골프장/CC ...)는 범위에 포함, 같은 이름이 호텔/골프장 둘 다면 이 명사로 구분
+    - 영문 이름은 앞뒤가 영숫자면 제외 (Lotte ≠ Charlotte), 한글은 조사가 붙으므로 경계 검사 안 함
+    - 증분 갱신: 마스터에 새 별칭이 생기면 보조 오토마톤만 다시 만들고, 쌓이면 본 사전에 합쳐 한 번에 재구성
+    """
+
+    def __init__(self, catalog=master_catalog, cities=CITIES):
+        self.catalog = catalog
+        self.cities = cities
+        self.stats = {"scans": 0, "chars": 0, "matches": 0, "full_builds": 0, "incremental_builds": 0}
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._seen = dict.fromkeys(KINDS, 0)
+        self._main = None
+        self._pending = None
+        self._pending_names = []
+        self._char_cache = {}
+
+    # ---------------------------------------------------------
+    # 사전 구성 / 증분 갱신
+    # ---------------------------------------------------------
+
+    def _add_entry(self, normalized, kind, record_id):
+        """ 새 패턴이면 True (같은 이름에 다른 종류가 추가되는 것은 오토마톤 변경 없음) """
+        if len(normalized) < GAZETTEER_MIN_LEN or normalized in GENERIC_NORMALIZED or normalized.isdigit(): return False
+        kinds = self._entries.get(normalized)
+        if kinds is None:
+            self._entries[normalized] = {kind: record_id}
+            return True
+        kinds.setdefault(kind, record_id)
+        return False
+
+    def sync(self):
+        """ 마스터에 새로 확인된 별칭을 반영 (변경 없으면 개수 비교만, 미확인 자동 등록분은 마스터가 걸러서 줌) """
+        new = [(kind, self.catalog.aliases_since(kind, self._seen[kind])) for kind in KINDS]
+        if self._main is not None and not any(items for _, items in new): return
+        with self._lock:
+            first_build = self._main is None
+            if first_build:
+                for city in self.cities:
+                    self._add_entry(normalize_name(city), "city", None)
+            added = []
+            for kind, items in new:
+                # 다른 스레드가 먼저 반영했으면 건너뜀
+                items = self.catalog.aliases_since(kind, self._seen[kind])
+                self._seen[kind] += len(items)
+                added.extend(normalized for normalized, record_id in items if self._add_entry(normalized, kind, record_id))
+
+            if first_build or len(self._pending_names) + len(added) > max(GAZETTEER_MERGE_SIZE, len(self._main) // 10):
+                self._main = _Automaton(self._entries)
+                self._pending, self._pending_names = None, []
+                self.stats["full_builds"] += 1
+            elif added:
+                self._pending_names = self._pending_names + added
+                self._pending = _Automaton(self._pending_names)
+                self.stats["incremental_builds"] += 1
+
+    # ---------------------------------------------------------
+    # 매칭
+    # ---------------------------------------------------------
+
+    def _normalize_stream(self, text):
+        """ 원문 -> (정규화 문자열, 정규화 글자별 원문 위치) - normalize_name과 같은 규칙, 글자별 결과는 캐시 """
+        cache = self._char_cache
+        chars, index = [], []
+        for i, ch in enumerate(text):
+            norm = cache.get(ch)
+            if norm is None:
+                norm = NON_WORD_PATTERN.sub("", unicodedata.normalize('NFKC', ch).lower())
+                cache[ch] = norm
+            for c in norm:
+                chars.append(c)
+                index.append(i)
+        return "".join(chars), index
+
+    def find(self, text):
+        """
+        사전 스팬 [{tag, text, start, end, score=1.0, source="gazetteer", kind, master_id}]
+        - 겹치는 매칭은 긴 것 우선, 길이가 같으면 왼쪽 우선 (영문 경계에 걸린 매칭은 미리 제외해서 다른 후보를 막지 않음)
+        """
+        if not text: return []
+        self.sync()
+        main, pending = self._main, self._pending
+        stream, index = self._normalize_stream(text)
+        matches = []
+        main.scan(stream, matches)
+        if pending is not None: pending.scan(stream, matches)
+
+        taken = bytearray(len(stream))
+        chosen = []
+        for start, end, pattern in sorted(matches, key=lambda m: (m[0] - m[1], m[0])):
+            if any(taken[start:end]) or not self._ascii_boundary(text, index[start], index[end - 1] + 1): continue
+            taken[start:end] = b"\x01" * (end - start)
+            chosen.append((start, end, pattern))
+
+        spans = []
+        for start, end, pattern in sorted(chosen):
+            suffix = None
+            for word in TRAILING_GENERICS:
+                if stream.startswith(word, end) and not any(taken[end:end + len(word)]):
+                    suffix, end = word, end + len(word)
+                    break
+            orig_start, orig_end = index[start], index[end - 1] + 1
+            kind, record_id = self._pick_kind(self._entries[pattern], suffix)
+            spans.append({"tag": KIND_TAGS[kind], "text": text[orig_start:orig_end], "start": orig_start, "end": orig_end,
+                          "score": 1.0, "source": "gazetteer", "kind": kind, "master_id": record_id})
+
+        self.stats["scans"] += 1
+        self.stats["chars"] += len(text)
+        self.stats["matches"] += len(spans)
+        return spans
+
+    def _ascii_boundary(self, text, start, end):
+        before = text[start - 1] if start > 0 else ""
+        after = text[end] if end < len(text) else ""
+        if text[start].isascii() and before.isascii() and before.isalnum(): return False
+        if text[end - 1].isascii() and after.isascii() and after.isalnum(): return False
+        return True
+
+    def _pick_kind(self, kinds, suffix):
+        if suffix is not None:
+            hinted = _suffix_kind(suffix)
+            if hinted in kinds: return hinted, kinds[hinted]
+        for kind in KIND_PRIORITY:
+            if kind in kinds: return kind, kinds[kind]
+
+    def get_stats(self):
+        self.sync()
+        return dict(self.stats, patterns=len(self._entries), main_patterns=len(self._main),
+                    pending_patterns=len(self._pending_names))
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# 작업 큐 설정
+# - JOB_DB: 작업 상태를 저장하는 SQLite 파일 (재시작해도 대기/진행 중 작업이 남아 있음)
+# - JOB_WORKERS: 프로세스당 작업 스레드 수 (0이면 이 프로세스에서는 작업을 처리하지 않음)
+# - JOB_LEASE_SECONDS: 실행 중 작업의 점유 시간. 진행 보고 없이 지나면 다른 워커가 다시 가져감 (at-least-once)
+# - JOB_MAX_ATTEMPTS: 최대 시도 횟수, 넘으면 failed 처리
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_DB = os.environ.get('JOB_DB', os.path.join(BASE_DIR, '../data/jobs.db'))
+JOB_UPLOAD_DIR = os.environ.get('JOB_UPLOAD_DIR', os.path.join(BASE_DIR, '../data/uploads'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 600))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 1.0))
+
+
+class LeaseLost(Exception):
+    """ 점유 시간이 지나 다른 워커가 작업을 다시 가져감 - 이 워커는 결과를 쓰지 않고 손을 뗌 """
+
+
+class JobQueue:
+    """
+    [작업 큐] SQLite 기반 영속 작업 큐 + 스레드 워커 풀
+    - submit(kind, payload) -> job_id, 워커가 register()로 등록된 핸들러를 실행
+    - 핸들러: handler(payload, report_progress) -> JSON 직렬화 가능한 결과
+    - cleanup(payload): 작업이 끝나면(done / 최종 failed) 한 번 호출 (업로드 파일 삭제 등), 재시도 대기 중에는 호출 안 함
+    - 상태: queued -> running -> done / failed (실패 시 JOB_MAX_ATTEMPTS 까지 재시도)
+    - 여러 프로세스(gunicorn 워커)가 같은 DB를 써도 BEGIN IMMEDIATE 로 한 작업은 한 워커만 가져감
+    - 가져갈 때마다 새 점유 토큰(lease_token): 진행 보고/완료 기록은 토큰이 맞을 때만
+      -> 점유 시간이 지나 다른 워커가 다시 가져간 작업은 예전 워커가 결과를 덮어쓰거나 업로드 파일을 지우지 않음
+    """
+
+    def __init__(self, db_path=JOB_DB, workers=JOB_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self._handlers = {}
+        self._cleanups = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized: return
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
+        if not os.path.exists(db_dir): os.makedirs(db_dir)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL,
+                    status TEXT NOT NULL, progress TEXT, result TEXT, error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0, lease_until REAL, lease_token TEXT,
+                    created_at REAL NOT NULL, updated_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            # 예전 DB에는 점유 토큰 컬럼이 없음
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "lease_token" not in columns: conn.execute("ALTER TABLE jobs ADD COLUMN lease_token TEXT")
+        finally:
+            conn.close()
+        self._initialized = True
+
+    # ---------------------------------------------------------
+    # 등록 / 제출 / 조회
+    # ---------------------------------------------------------
+
+    def register(self, kind, handler, cleanup=None):
+        self._handlers[kind] = handler
+        if cleanup is not None: self._cleanups[kind] = cleanup
+
+    def submit(self, kind, payload):
+        self._init_db()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("INSERT INTO jobs (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                         (job_id, kind, json.dumps(payload, ensure_ascii=False), now, now))
+        finally:
+            conn.close()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id, include_result=False):
+        self._init_db()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None: return None
+
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": json.loads(row["progress"]) if row["progress"] else None,
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    def get_stats(self):
+        self._init_db()
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return {status: count for status, count in rows}
+
+    # ---------------------------------------------------------
+    # 워커
+    # ---------------------------------------------------------
+
+    def start(self):
+        """ 워커 스레드 시작 (이미 떠 있으면 무시) - 재시작 시 남아 있던 작업부터 이어서 처리 """
+        with self._lock:
+            if self._threads or self.workers <= 0: return
+            self._init_db()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            print(f"  ✅ 작업 큐 워커 {self.workers}개 시작 ({self.db_path})")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"❌ 작업 가져오기 실패: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(JOB_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+            try:
+                self._execute(job)
+            except sqlite3.Error as e:
+                # 상태 기록 실패: 점유 시간이 지나면 다른 워커가 다시 가져감
+                print(f"❌ 작업 상태 저장 실패 ({job['kind']} {job['id']}): {e}")
+
+    def _claim(self):
+        """ 대기 중이거나 점유 시간이 지난 작업 하나를 원자적으로 가져옴 """
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("""
+                    SELECT id, kind, payload, attempts FROM jobs
+                    WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+                    ORDER BY created_at LIMIT 1""", (now,)).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                if row["attempts"] >= JOB_MAX_ATTEMPTS:
+                    # 점유 시간이 지난 채로 재시도 한도에 도달 (워커가 계속 죽는 작업)
+                    conn.execute("UPDATE jobs SET status = 'failed', error = ?, lease_token = NULL, updated_at = ? WHERE id = ?",
+                                 ("재시도 횟수 초과", now, row["id"]))
+                    conn.execute("COMMIT")
+                    self._cleanup(row["kind"], json.loads(row["payload"]))
+                    continue
+
+                token = uuid.uuid4().hex
+                conn.execute("""
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, lease_token = ?, updated_at = ?
+                    WHERE id = ?""", (now + JOB_LEASE_SECONDS, token, now, row["id"]))
+                conn.execute("COMMIT")
+                return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"]),
+                        "attempts": row["attempts"] + 1, "token": token}
+        except Exception:
+            if conn.in_transaction: conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _execute(self, job):
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self._finish(job, "failed", error=f"등록되지 않은 작업 종류: {job['kind']}")
+            return
+
+        def report_progress(progress):
+            # 진행 보고 = 점유 시간 연장 (살아 있는 작업을 다른 워커가 가져가지 않도록)
+            # 다른 워커가 이미 가져간 작업이면 LeaseLost로 핸들러를 멈춤
+            now = time.time()
+            conn = self._connect()
+            try:
+                updated = conn.execute("UPDATE jobs SET progress = ?, lease_until = ?, updated_at = ? WHERE id = ? AND lease_token = ?",
+                                       (json.dumps(progress, ensure_ascii=False), now + JOB_LEASE_SECONDS, now,
+                                        job["id"], job["token"])).rowcount
+            finally:
+                conn.close()
+            if not updated: raise LeaseLost(job["id"])
+
+        try:
+            result = handler(job["payload"], report_progress)
+        except LeaseLost:
+            print(f"⚠️ 작업 점유 만료 - 다른 워커가 처리 중 ({job['kind']} {job['id']})")
+            return
+        except Exception as e:
+            print(f"❌ 작업 실패 ({job['kind']} {job['id']}, {job['attempts']}회차): {e}")
+            status = "failed" if job["attempts"] >= JOB_MAX_ATTEMPTS else "queued"
+            self._finish(job, status, error=str(e))
+            return
+        self._finish(job, "done", result=result)
+
+    def _finish(self, job, status, result=None, error=None):
+        """ 점유 토큰이 맞을 때만 기록, 다른 워커가 가져간 작업이면 결과도 정리도 그 워커에 맡김 """
+        conn = self._connect()
+        try:
+            updated = conn.execute("""
+                UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, lease_token = NULL, updated_at = ?
+                WHERE id = ? AND lease_token = ?""",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job["id"], job["token"])).rowcount
+        finally:
+            conn.close()
+        if not updated:
+            print(f"⚠️ 작업 점유 만료 - 결과 기록 안 함 ({job['kind']} {job['id']})")
+            return
+        if status == "queued": self._wakeup.set()
+        else: self._cleanup(job["kind"], job["payload"])
+
+    def _cleanup(self, kind, payload):
+        cleanup = self._cleanups.get(kind)
+        if cleanup is None: return
+        try:
+            cleanup(payload)
+        except Exception as e:
+            print(f"⚠️ 작업 정리 실패 ({kind}): {e}")
+
+
+job_queue = JobQueue()
@@ -0,0 +1,339 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from sqlalchemy import Boolean, Float, Integer, String, UniqueConstraint, create_engine, inspect, select, text, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+# 호텔/골프장 마스터 설정
+# - MASTER_DB: 마스터 SQLite 파일
+# - MASTER_MATCH_THRESHOLD: 퍼지 매칭 최소 유사도 (트라이그램 Dice 계수, 0~1)
+# - MASTER_AUTO_REGISTER: 견적서에서 처음 보는 이름이면 마스터에 '미확인'으로 새로 등록 (1) / 매칭만 (0, 기본)
+#   NER 오태깅 조각("텔", "캐디피 불포함" ...)도 그대로 등록되므로 기본은 끔, 확인(verify)된 레코드만 정식 마스터
+# - MASTER_CACHE_SIZE: 이름 -> 매칭 결과 LRU 크기 (자주 나오는 호텔/골프장은 DB/색인 조회 없이 반환)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MASTER_DB = os.environ.get('MASTER_DB', os.path.join(BASE_DIR, '../data/master.db'))
+MASTER_MATCH_THRESHOLD = float(os.environ.get('MASTER_MATCH_THRESHOLD', 0.6))
+MASTER_AUTO_REGISTER = os.environ.get('MASTER_AUTO_REGISTER', '0') == '1'
+MASTER_CACHE_SIZE = int(os.environ.get('MASTER_CACHE_SIZE', 4096))
+
+KINDS = ("hotel", "golf")
+# 정규화 때 떼어내는 일반 명사 (단어 전체 또는 한글 단어 끝)
+GENERIC_WORDS = ["호텔", "hotel", "리조트", "resort", "골프클럽", "골프장", "골프코스", "컨트리클럽", "골프앤리조트",
+                 "golfclub", "golfcourse", "countryclub", "golf", "club", "cc", "gc"]
+GENERIC_SUFFIXES = sorted([w for w in GENERIC_WORDS if not w.isascii()], key=len, reverse=True)
+NON_WORD_PATTERN = re.compile(r'[^\w]+')
+MULTI_WORD_GENERICS = [("golf club", "golfclub"), ("golf course", "golfcourse"), ("country club", "countryclub"),
+                       ("골프 클럽", "골프클럽"), ("컨트리 클럽", "컨트리클럽")]
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Hotel(Base):
+    __tablename__ = "hotels"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name_kr: Mapped[str] = mapped_column(String(200), default="")
+    name_en: Mapped[str] = mapped_column(String(200), default="")
+    name_local: Mapped[str] = mapped_column(String(200), default="")
+    location: Mapped[str] = mapped_column(String(200), default="")
+    grade: Mapped[str] = mapped_column(String(50), default="")
+    verified: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[float] = mapped_column(Float, default=time.time)
+
+
+class GolfCourse(Base):
+    __tablename__ = "golf_courses"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name_kr: Mapped[str] = mapped_column(String(200), default="")
+    name_en: Mapped[str] = mapped_column(String(200), default="")
+    name_local: Mapped[str] = mapped_column(String(200), default="")
+    location: Mapped[str] = mapped_column(String(200), default="")
+    operation_info: Mapped[str] = mapped_column(String(500), default="")
+    verified: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[float] = mapped_column(Float, default=time.time)
+
+
+class MasterAlias(Base):
+    """ 한글/영문/현지어 표기와 견적서에서 나온 변형 표기 -> 마스터 레코드 """
+    __tablename__ = "master_aliases"
+    __table_args__ = (UniqueConstraint("kind", "normalized"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(10), index=True)
+    record_id: Mapped[int] = mapped_column(Integer, index=True)
+    alias: Mapped[str] = mapped_column(String(200))
+    normalized: Mapped[str] = mapped_column(String(200))
+    verified: Mapped[bool] = mapped_column(Boolean, default=True)
+
+
+MODELS = {"hotel": Hotel, "golf": GolfCourse}
+
+
+def normalize_name(name):
+    """ 표기 정규화: NFKC + 소문자 + 기호/공백 제거 + 일반 명사(호텔, 골프장, CC ...) 제거 """
+    text = unicodedata.normalize('NFKC', name or "").lower()
+    for phrase, joined in MULTI_WORD_GENERICS:
+        text = text.replace(phrase, joined)
+    words = []
+    for word in NON_WORD_PATTERN.split(text):
+        if not word or word in GENERIC_WORDS: continue
+        for suffix in GENERIC_SUFFIXES:
+            if word.endswith(suffix) and len(word) > len(suffix):
+                word = word[:-len(suffix)]
+                break
+        words.append(word)
+    normalized = "".join(words)
+    # 일반 명사만 있는 이름("리조트")은 그대로 사용
+    return normalized or NON_WORD_PATTERN.sub("", text)
+
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MasterCatalog:
+    """
+    [호텔/골프장 마스터] 견적서마다 새로 만들던 호텔/골프장 정보를 한 번 등록하고 재사용
+    - SQLite(SQLAlchemy): hotels, golf_courses, master_aliases (표기별 정규화 이름 -> 레코드)
+    - 매칭: 캐시(LRU) -> 정규화 이름 정확 일치(dict) -> 트라이그램 역색인 퍼지 매칭(Dice >= MASTER_MATCH_THRESHOLD)
+    - 색인은 처음 쓸 때 별칭 테이블 전체를 메모리로 올려 만들고, 등록/별칭 추가 시 함께 갱신
+    - 견적서 추출에서 자동으로 생긴 레코드/별칭은 verified=False, 사용자가 확인(verify)해야 정식 마스터가 됨
+      미확인 별칭은 정확 일치/퍼지 색인에 넣지 않고 _pending(정규화 이름 -> 레코드)에만 -> 같은 이름 재등장 시 중복 등록만 막음
+    - 매칭(resolve)은 DB에 쓰지 않음 (퍼지로 찾은 표기도 저장 안 함), 쓰는 것은 create=True 일 때 새 레코드 등록뿐
+    """
+
+    def __init__(self, db_path=MASTER_DB):
+        self.db_path = db_path
+        self.stats = {"cache_hits": 0, "exact": 0, "unverified": 0, "fuzzy": 0, "created": 0, "misses": 0}
+        self._engine = None
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._loaded = False
+
+    # ---------------------------------------------------------
+    # 적재 / 색인
+    # ---------------------------------------------------------
+
+    def _ensure_loaded(self):
+        if self._loaded: return
+        with self._lock:
+            if self._loaded: return
+            db_dir = os.path.dirname(os.path.abspath(self.db_path))
+            if not os.path.exists(db_dir): os.makedirs(db_dir)
+            self._engine = create_engine(f"sqlite:///{self.db_path}")
+            Base.metadata.create_all(self._engine)
+            self._migrate()
+
+            self._exact = {kind: {} for kind in KINDS}
+            self._grams = {kind: {} for kind in KINDS}
+            self._aliases = {kind: [] for kind in KINDS}
+            self._verified_aliases = {kind: [] for kind in KINDS}
+            self._pending = {kind: {} for kind in KINDS}
+            self._records = {kind: {} for kind in KINDS}
+            with Session(self._engine) as session:
+                for alias in session.scalars(select(MasterAlias)):
+                    self._index_alias(alias.kind, alias.normalized, alias.record_id, alias.verified)
+                for kind, model in MODELS.items():
+                    for record in session.scalars(select(model)):
+                        self._records[kind][record.id] = self._to_dict(kind, record)
+            self._loaded = True
+            print(f"  ✅ 호텔/골프장 마스터: 호텔 {len(self._records['hotel'])}개, 골프장 {len(self._records['golf'])}개")
+
+    def _migrate(self):
+        """ verified 컬럼이 없던 DB: 컬럼 추가, 기존 행은 자동 등록분과 구분할 수 없으므로 미확인으로 둠 """
+        inspector = inspect(self._engine)
+        with self._engine.begin() as conn:
+            for model in (*MODELS.values(), MasterAlias):
+                columns = {c["name"] for c in inspector.get_columns(model.__tablename__)}
+                if "verified" not in columns:
+                    conn.execute(text(f"ALTER TABLE {model.__tablename__} ADD COLUMN verified BOOLEAN NOT NULL DEFAULT 0"))
+                    print(f"  ⚠️ {model.__tablename__}: verified 컬럼 추가 (기존 행은 미확인)")
+
+    def _index_alias(self, kind, normalized, record_id, verified):
+        """ 확인된 별칭만 정확 일치/트라이그램 색인에, 미확인 별칭은 _pending에만 """
+        if normalized in self._exact[kind]: return
+        if not verified:
+            self._pending[kind].setdefault(normalized, record_id)
+            return
+        self._pending[kind].pop(normalized, None)
+        self._exact[kind][normalized] = record_id
+        self._verified_aliases[kind].append((normalized, record_id))
+        alias_idx = len(self._aliases[kind])
+        grams = trigrams(normalized)
+        self._aliases[kind].append((normalized, record_id, len(grams)))
+        for gram in grams:
+            self._grams[kind].setdefault(gram, []).append(alias_idx)
+
+    def _to_dict(self, kind, record):
+        fields = [c.name for c in MODELS[kind].__table__.columns if c.name != "created_at"]
+        return dict({name: getattr(record, name) for name in fields}, kind=kind)
+
+    # ---------------------------------------------------------
+    # 등록
+    # ---------------------------------------------------------
+
+    def register(self, kind, name_kr="", name_en="", name_local="", aliases=(), verified=True, **fields):
+        """
+        새 마스터 레코드 + 모든 표기를 별칭으로 등록 -> 레코드 dict (이미 있는 표기는 기존 레코드에 남음)
+        - verified=False: 견적서 추출에서 자동 등록 (확인 전까지 미확인)
+        """
+        self._ensure_loaded()
+        model = MODELS[kind]
+        fields = {k: v for k, v in fields.items() if k in model.__table__.columns and k != "verified" and v}
+        with self._lock, Session(self._engine) as session:
+            record = model(name_kr=name_kr or "", name_en=name_en or "", name_local=name_local or "",
+                           verified=verified, **fields)
+            session.add(record)
+            session.flush()
+            new_aliases = self._add_aliases(session, kind, record.id, [name_kr, name_en, name_local, *aliases],
+                                            verified)
+            session.commit()
+            self._records[kind][record.id] = self._to_dict(kind, record)
+            for normalized in new_aliases:
+                self._index_alias(kind, normalized, record.id, verified)
+            return self._records[kind][record.id]
+
+    def add_alias(self, kind, record_id, alias, verified=True):
+        self._ensure_loaded()
+        with self._lock, Session(self._engine) as session:
+            added = self._add_aliases(session, kind, record_id, [alias], verified)
+            session.commit()
+            for normalized in added:
+                self._index_alias(kind, normalized, record_id, verified)
+
+    def _add_aliases(self, session, kind, record_id, names, verified):
+        added = []
+        for name in names:
+            normalized = normalize_name(name)
+            if not normalized or normalized in self._exact[kind] or normalized in self._pending[kind] or normalized in added:
+                continue
+            session.add(MasterAlias(kind=kind, record_id=record_id, alias=name, normalized=normalized, verified=verified))
+            added.append(normalized)
+        return added
+
+    # ---------------------------------------------------------
+    # 매칭
+    # ---------------------------------------------------------
+
+    def search(self, kind, name, limit=5):
+        """ 퍼지 후보 [(레코드 dict, 유사도), ...] (유사도 높은 순, 레코드당 한 번, 확인된 별칭만) """
+        self._ensure_loaded()
+        normalized = normalize_name(name)
+        if not normalized: return []
+        record_id = self._exact[kind].get(normalized)
+        if record_id is not None:
+            return [(self._records[kind][record_id], 1.0)]
+
+        query = trigrams(normalized)
+        shared = {}
+        grams = self._grams[kind]
+        for gram in query:
+            for alias_idx in grams.get(gram, ()):
+                shared[alias_idx] = shared.get(alias_idx, 0) + 1
+
+        best = {}
+        aliases = self._aliases[kind]
+        for alias_idx, count in shared.items():
+            _, record_id, size = aliases[alias_idx]
+            score = 2.0 * count / (len(query) + size)
+            if score > best.get(record_id, 0.0): best[record_id] = score
+        ranked = sorted(best.items(), key=lambda item: -item[1])[:limit]
+        return [(self._records[kind][record_id], round(score, 4)) for record_id, score in ranked]
+
+    def resolve(self, kind, name, create=False, **fields):
+        """
+        견적서에서 나온 이름 -> {"record": 마스터 레코드 dict, "match": exact/unverified/fuzzy/created, "score"} 또는 None
+        - exact: 확인된 별칭과 정확 일치, unverified: 자동 등록된 미확인 레코드의 이름과 정확 일치, fuzzy: 확인된 별칭과 유사
+        - create=True: 못 찾으면 name_kr=name 으로 미확인 레코드 새로 등록 (fields: location, grade 등 함께 저장)
+        """
+        if not name or kind not in MODELS: return None
+        key = (kind, name)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached
+
+        # 같은 새 이름이 동시에 들어와도 한 번만 등록되도록 매칭~등록을 잠금 안에서
+        with self._lock:
+            candidates = self.search(kind, name, limit=1)
+            pending_id = self._pending[kind].get(normalize_name(name))
+            result = None
+            if candidates and candidates[0][1] == 1.0:
+                result = {"record": candidates[0][0], "match": "exact", "score": 1.0}
+                self.stats["exact"] += 1
+            elif pending_id is not None:
+                result = {"record": self._records[kind][pending_id], "match": "unverified", "score": 1.0}
+                self.stats["unverified"] += 1
+            elif candidates and candidates[0][1] >= MASTER_MATCH_THRESHOLD:
+                record, score = candidates[0]
+                result = {"record": record, "match": "fuzzy", "score": score}
+                self.stats["fuzzy"] += 1
+            elif create:
+                record = self.register(kind, name_kr=name, verified=False, **fields)
+                result = {"record": record, "match": "created", "score": 1.0}
+                self.stats["created"] += 1
+            else:
+                self.stats["misses"] += 1
+
+            if result is not None:
+                # 새로 등록한 레코드도 다음 조회부터는 미확인 레코드와 일치한 것
+                self._cache[key] = dict(result, match="unverified") if result["match"] == "created" else result
+                while len(self._cache) > MASTER_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return result
+
+    def verify(self, kind, record_id):
+        """ [사용자 확인] 레코드와 그 별칭 전체를 확인됨으로 -> 레코드 dict (없으면 None) """
+        self._ensure_loaded()
+        if record_id not in self._records[kind]: return None
+        with self._lock, Session(self._engine) as session:
+            newly_verified = session.scalars(select(MasterAlias.normalized).where(
+                MasterAlias.kind == kind, MasterAlias.record_id == record_id, MasterAlias.verified.is_(False))).all()
+            session.execute(update(MODELS[kind]).where(MODELS[kind].id == record_id).values(verified=True))
+            session.execute(update(MasterAlias).where(MasterAlias.kind == kind, MasterAlias.record_id == record_id)
+                            .values(verified=True))
+            session.commit()
+            # 미확인 별칭을 정확 일치/퍼지 색인으로 옮김 (사전 매칭에는 aliases_since로 전달)
+            for normalized in newly_verified:
+                self._index_alias(kind, normalized, record_id, True)
+            record = dict(self._records[kind][record_id], verified=True)
+            self._records[kind][record_id] = record
+            # 캐시된 매칭 결과도 확인된 레코드로 (미확인 레코드와 일치했던 이름은 이제 정확 일치)
+            for key, cached in self._cache.items():
+                if key[0] == kind and cached["record"]["id"] == record_id:
+                    match = "exact" if cached["match"] == "unverified" else cached["match"]
+                    self._cache[key] = dict(cached, record=record, match=match)
+            return record
+
+    def get(self, kind, record_id):
+        self._ensure_loaded()
+        return self._records[kind].get(record_id)
+
+    def records(self, kind):
+        self._ensure_loaded()
+        return list(self._records[kind].values())
+
+    def aliases_since(self, kind, start=0):
+        """
+        start번째 이후로 확인된 별칭 [(정규화 이름, 레코드 ID), ...] (목록은 추가만 되므로 개수로 증분 동기화)
+        - 추출에서 자동으로 생긴 미확인 별칭은 제외 (사전 매칭이 오태깅을 다시 퍼뜨리지 않도록), 확인되는 순간 뒤에 추가됨
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._verified_aliases[kind][start:]
+
+    def get_stats(self):
+        self._ensure_loaded()
+        return dict(self.stats, hotels=len(self._records["hotel"]), golf_courses=len(self._records["golf"]),
+                    unverified_records={kind: sum(not r["verified"] for r in self._records[kind].values()) for kind in KINDS},
+                    aliases={kind: len(self._aliases[kind]) for kind in KINDS},
+                    pending_aliases={kind: len(self._pending[kind]) for kind in KINDS})
+
+
+master_catalog = MasterCatalog()
@@ -0,0 +1,147 @@
+import json
+import os
+import resource
+import struct
+import threading
+from contextlib import contextmanager
+import torch
+import torch.nn as nn
+
+# 모델 가중치 로드 방식
+# - MODEL_MMAP=1: model.safetensors를 메모리 매핑해서 파라미터가 파일 페이지를 그대로 가리키게 함
+#   -> 같은 서버의 gunicorn 워커들이 OS 페이지 캐시의 같은 물리 메모리를 공유 (워커 수만큼 복사본이 생기지 않음)
+#   -> 역직렬화/복사가 없어서 로드가 거의 즉시 끝남 (실제 읽기는 처음 쓰는 페이지부터)
+# - MODEL_MMAP=0: 기존 from_pretrained (transformers 버전에 따라 프로세스마다 가중치 전체를 자기 메모리로 복사)
+# GPU로 올리는 모델과 int8/ONNX 백엔드는 어차피 새 텐서를 만들므로 매핑 효과 없음
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '1') == '1'
+SAFETENSORS_FILE = 'model.safetensors'
+LEGACY_WEIGHTS_FILE = 'pytorch_model.bin'
+
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+
+def mmap_safetensors(path):
+    """
+    safetensors 파일 -> {이름: 텐서}, 텐서는 파일 매핑(MAP_PRIVATE) 위의 뷰
+    - 헤더(JSON)만 읽고 데이터는 복사하지 않음, 쓰기가 일어나면 그 페이지만 프로세스 전용으로 복사됨
+    - dtype 크기에 맞게 정렬되지 않은 텐서만 예외적으로 복사
+    """
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    data_start = 8 + header_size
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+
+    tensors = {}
+    for name, info in header.items():
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        itemsize = torch.empty((), dtype=dtype).element_size()
+        offset = data_start + begin
+        if offset % itemsize == 0:
+            tensors[name] = torch.empty(0, dtype=dtype).set_(storage, offset // itemsize, info["shape"])
+        elif end > begin:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                raw = bytearray(f.read(end - begin))
+            tensors[name] = torch.frombuffer(raw, dtype=dtype).reshape(info["shape"])
+        else:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+    return tensors
+
+
+# 모델 생성 중 파라미터를 meta로 보내는 register_parameter 교체는 프로세스 전역이라
+# - 교체/복구는 _META_LOCK 아래에서 사용 중인 로드 수로 한 번만 (겹친 로드가 교체된 함수를 원본으로 저장하지 않도록)
+# - meta 배치는 로드 중인 스레드에서만 (_meta_state.active), 같은 시간에 다른 스레드가 만드는 모듈은 그대로
+_REGISTER_PARAMETER = nn.Module.register_parameter
+_META_LOCK = threading.Lock()
+_meta_state = threading.local()
+_meta_users = 0
+
+
+def _register_parameter_on_meta(module, name, param):
+    _REGISTER_PARAMETER(module, name, param)
+    if param is not None and getattr(_meta_state, "active", False):
+        module._parameters[name] = nn.Parameter(module._parameters[name].to("meta"), requires_grad=param.requires_grad)
+
+
+@contextmanager
+def _meta_parameters():
+    """ 이 스레드에서 모듈 생성 중 파라미터만 meta 장치로 (랜덤 초기화/메모리 할당 생략), 버퍼(position_ids 등)는 그대로 생성 """
+    global _meta_users
+    with _META_LOCK:
+        if _meta_users == 0: nn.Module.register_parameter = _register_parameter_on_meta
+        _meta_users += 1
+    _meta_state.active = True
+    try:
+        yield
+    finally:
+        _meta_state.active = False
+        with _META_LOCK:
+            _meta_users -= 1
+            if _meta_users == 0: nn.Module.register_parameter = _REGISTER_PARAMETER
+
+
+def convert_to_safetensors(model, model_path):
+    """ 예전 형식(pytorch_model.bin)만 있는 모델 폴더에 model.safetensors 생성 (다음 워커부터 매핑 로드) """
+    from safetensors.torch import save_model
+    save_model(model, os.path.join(model_path, SAFETENSORS_FILE), metadata={"format": "pt"})
+    print(f"  ✅ safetensors 변환 완료: {model_path}")
+
+
+def load_pretrained(model_class, model_path, device=None):
+    """
+    [모델 로드] HF 모델 폴더 -> 모델 (eval 모드)
+    - MODEL_MMAP=1 이고 CPU이면 model.safetensors 매핑 로드: 설정으로 빈 모델을 만든 뒤 매핑된 텐서를 그대로 끼워 넣음
+    - 매핑으로 채우지 못한 파라미터가 있거나(헤드 추가 등) 파일이 없으면 from_pretrained로 대체
+    - pytorch_model.bin만 있으면 한 번 로드 후 safetensors로 변환해 둠
+    """
+    weights_path = os.path.join(model_path, SAFETENSORS_FILE)
+    on_cpu = device is None or torch.device(device).type == 'cpu'
+    if MODEL_MMAP and on_cpu and os.path.exists(weights_path):
+        from transformers.modeling_utils import no_init_weights
+        config = model_class.config_class.from_pretrained(model_path)
+        with _meta_parameters(), no_init_weights():
+            model = model_class(config)
+        model.load_state_dict(mmap_safetensors(weights_path), strict=False, assign=True)
+        model.tie_weights()
+        if not any(p.is_meta for p in model.parameters()):
+            model.eval()
+            return model
+        print(f"  ⚠️ 매핑 로드 불가 (가중치 파일에 없는 파라미터) - from_pretrained 사용: {model_path}")
+
+    model = model_class.from_pretrained(model_path)
+    if MODEL_MMAP and not os.path.exists(weights_path) and os.path.exists(os.path.join(model_path, LEGACY_WEIGHTS_FILE)):
+        try:
+            convert_to_safetensors(model, model_path)
+        except Exception as e:
+            print(f"  ⚠️ safetensors 변환 실패 ({model_path}): {e}")
+    if device is not None: model = model.to(device)
+    model.eval()
+    return model
+
+
+def process_memory():
+    """
+    현재 프로세스 메모리 (MB): rss, pss(공유 페이지를 공유 프로세스 수로 나눈 실제 부담), shared(다른 프로세스와 공유 중), private
+    - 리눅스 /proc/self/smaps_rollup 기준, 없으면 최대 RSS만
+    """
+    try:
+        values = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[2] == 'kB': values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+        return {
+            "pid": os.getpid(),
+            "rss_mb": round(values.get("Rss", 0), 1),
+            "pss_mb": round(values.get("Pss", 0), 1),
+            "shared_mb": round(values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0), 1),
+            "private_mb": round(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1),
+        }
+    except OSError:
+        return {"pid": os.getpid(), "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
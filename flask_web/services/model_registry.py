@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+import time
+
+# 모델 메모리 관리 설정
+# - MODEL_IDLE_SECONDS: 이 시간 동안 안 쓴 모델은 메모리에서 내림 (0이면 내리지 않음)
+# - MODEL_MEMORY_MB: 올라간 모델 가중치 합계 상한, 넘으면 가장 오래 안 쓴 모델부터 내림 (0이면 제한 없음)
+MODEL_IDLE_SECONDS = float(os.environ.get('MODEL_IDLE_SECONDS', 1800))
+MODEL_MEMORY_MB = float(os.environ.get('MODEL_MEMORY_MB', 0))
+
+
+class ModelRegistry:
+    """
+    [모델 레지스트리] 모델을 처음 쓰는 시점에 로드하고, 유휴 시간/메모리 상한에 따라 내림
+    - register(name, loader, path): loader() -> 모델 객체, path는 존재 여부 확인 및 버전 계산용
+    - 'ner' in registry  : 모델 파일이 있어 로드 가능한지 (로드는 하지 않음)
+    - registry['ner']    : 필요하면 로드 후 반환 (모델별 잠금으로 동시 요청이 와도 한 번만 로드)
+    """
+
+    def __init__(self, idle_seconds=MODEL_IDLE_SECONDS, memory_mb=MODEL_MEMORY_MB):
+        self.idle_seconds = idle_seconds
+        self.memory_budget = int(memory_mb * 1024 * 1024)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def register(self, name, loader, path=None, pinned=False):
+        """ pinned=True 인 항목(토크나이저 등)은 유휴/메모리 기준으로 내리지 않음 """
+        self._entries[name] = {
+            "loader": loader, "path": path, "pinned": pinned,
+            "model": None, "lock": threading.Lock(), "last_used": 0.0, "size_bytes": 0,
+            "version": None, "load_seconds": None, "loads": 0, "evictions": 0,
+        }
+
+    def __contains__(self, name):
+        entry = self._entries.get(name)
+        if entry is None: return False
+        return entry["path"] is None or os.path.exists(entry["path"])
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name):
+        entry = self._entries[name]
+        entry["last_used"] = time.monotonic()
+        model = entry["model"]
+        if model is not None: return model
+
+        with entry["lock"]:
+            if entry["model"] is None:
+                self._load(name, entry)
+            model = entry["model"]
+        self._ensure_reaper()
+        self._enforce_budget(keep=name)
+        return model
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry["model"] is not None
+
+    def version(self, name):
+        """ 캐시 키용 모델 버전: MODEL_VERSION 환경변수 또는 모델 파일(이름/크기/수정시각) 해시 """
+        entry = self._entries[name]
+        if entry["version"] is None:
+            entry["version"] = os.environ.get('MODEL_VERSION') or self._path_version(entry["path"])
+        return entry["version"]
+
+    def evict(self, name):
+        entry = self._entries[name]
+        with entry["lock"]:
+            if entry["model"] is None: return
+            # 추론 중인 스레드가 들고 있는 참조는 그대로 유효, 레지스트리에서만 놓음
+            entry["model"] = None
+            entry["size_bytes"] = 0
+            entry["evictions"] += 1
+        print(f"  💤 [{name}] 모델 언로드")
+
+    def get_stats(self):
+        stats = {}
+        for name, entry in self._entries.items():
+            stats[name] = {
+                "available": name in self,
+                "loaded": entry["model"] is not None,
+                "pinned": entry["pinned"],
+                "loads": entry["loads"],
+                "evictions": entry["evictions"],
+                "load_seconds": entry["load_seconds"],
+                "size_mb": round(entry["size_bytes"] / 1024 / 1024, 2),
+                "idle_seconds": round(time.monotonic() - entry["last_used"], 1) if entry["model"] is not None else None,
+            }
+        return stats
+
+    # ---------------------------------------------------------
+    # 내부 로직
+    # ---------------------------------------------------------
+
+    def _load(self, name, entry):
+        start = time.perf_counter()
+        model = entry["loader"]()
+        entry["load_seconds"] = round(time.perf_counter() - start, 3)
+        entry["size_bytes"] = self._model_size(model)
+        entry["loads"] += 1
+        entry["model"] = model
+        print(f"  ✅ [{name}] 모델 로드 완료 ({entry['load_seconds']}s, {entry['size_bytes'] / 1024 / 1024:.1f}MB)")
+
+    def _model_size(self, model):
+        # torch 모듈이면 파라미터 + 버퍼 바이트 합 (토크나이저 등은 0으로 취급)
+        if not hasattr(model, 'parameters'): return 0
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    def _path_version(self, path):
+        if not path or not os.path.exists(path): return "none"
+        digest = hashlib.sha256()
+        names = sorted(os.listdir(path)) if os.path.isdir(path) else [os.path.basename(path)]
+        base = path if os.path.isdir(path) else os.path.dirname(path)
+        for file_name in names:
+            stat = os.stat(os.path.join(base, file_name))
+            digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _enforce_budget(self, keep):
+        if self.memory_budget <= 0: return
+        loaded = [(entry["last_used"], name) for name, entry in self._entries.items()
+                  if entry["model"] is not None and not entry["pinned"] and name != keep]
+        total = sum(entry["size_bytes"] for entry in self._entries.values() if entry["model"] is not None)
+        for _, name in sorted(loaded):
+            if total <= self.memory_budget: break
+            total -= self._entries[name]["size_bytes"]
+            self.evict(name)
+
+    def _ensure_reaper(self):
+        if self.idle_seconds <= 0 or self._reaper is not None: return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_idle, name="model-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap_idle(self):
+        interval = max(1.0, min(60.0, self.idle_seconds / 4))
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            for name, entry in self._entries.items():
+                if entry["model"] is not None and not entry["pinned"] and now - entry["last_used"] > self.idle_seconds:
+                    self.evict(name)
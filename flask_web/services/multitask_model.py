@@ -0,0 +1,61 @@
+import copy
+from dataclasses import dataclass
+from typing import Optional
+import torch
+import torch.nn as nn
+from transformers import ElectraModel, ElectraPreTrainedModel
+from transformers.models.electra.modeling_electra import ElectraClassificationHead
+from transformers.utils import ModelOutput
+
+# [M1+M2] 3중 분류 라벨 수 기본값 (config.num_sentiment_labels 가 없을 때)
+DEFAULT_SENTIMENT_LABELS = 3
+
+
+@dataclass
+class MultiTaskOutput(ModelOutput):
+    loss: Optional[torch.FloatTensor] = None
+    logits: Optional[torch.FloatTensor] = None
+    sentiment_logits: Optional[torch.FloatTensor] = None
+
+
+class ElectraForMultiTask(ElectraPreTrainedModel):
+    """
+    [M1+M2 멀티태스크] KoELECTRA 인코더 하나 + 토큰 분류(NER) 헤드 + 문장 분류(3중 분류) 헤드
+    - 인코더는 한 번만 돌리고 두 헤드를 같은 hidden state에 적용 -> 태깅과 분류가 둘 다 필요한 메시지의 인코더 연산이 절반
+    - logits: NER 토큰 logits (ElectraForTokenClassification과 같은 이름/모양 -> 기존 NER 디코딩 코드 그대로 사용)
+    - sentiment_logits: [CLS] 위치 문장 분류 logits
+    - NER 헤드 파라미터 이름(classifier)이 ElectraForTokenClassification과 같아서 기존 koelectra_ner 폴더로 초기화 가능
+    - 학습: labels(토큰 라벨, -100 무시) / sentiment_labels 중 있는 것만 손실에 포함 (과제별 배치를 번갈아 넣어도 됨)
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.num_labels = config.num_labels
+        self.num_sentiment_labels = getattr(config, "num_sentiment_labels", DEFAULT_SENTIMENT_LABELS)
+        self.sentiment_loss_weight = getattr(config, "sentiment_loss_weight", 1.0)
+
+        self.electra = ElectraModel(config)
+        classifier_dropout = (
+            config.classifier_dropout if config.classifier_dropout is not None else config.hidden_dropout_prob
+        )
+        self.dropout = nn.Dropout(classifier_dropout)
+        self.classifier = nn.Linear(config.hidden_size, config.num_labels)
+
+        head_config = copy.copy(config)
+        head_config.num_labels = self.num_sentiment_labels
+        self.sentiment_head = ElectraClassificationHead(head_config)
+        self.post_init()
+
+    def forward(self, input_ids=None, attention_mask=None, token_type_ids=None, labels=None, sentiment_labels=None):
+        hidden = self.electra(input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)[0]
+        logits = self.classifier(self.dropout(hidden))
+        sentiment_logits = self.sentiment_head(hidden)
+
+        loss = None
+        loss_fn = nn.CrossEntropyLoss()
+        if labels is not None:
+            loss = loss_fn(logits.view(-1, self.num_labels), labels.view(-1))
+        if sentiment_labels is not None:
+            sentiment_loss = loss_fn(sentiment_logits, sentiment_labels.view(-1)) * self.sentiment_loss_weight
+            loss = sentiment_loss if loss is None else loss + sentiment_loss
+        return MultiTaskOutput(loss=loss, logits=logits, sentiment_logits=sentiment_logits)
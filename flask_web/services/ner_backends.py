@@ -0,0 +1,73 @@
+import os
+from types import SimpleNamespace
+import numpy as np
+import torch
+import torch.nn as nn
+from services.model_loader import load_pretrained
+
+# NER 추론 백엔드 선택 (CPU 서버용)
+# - torch: 기본 fp32 모델
+# - int8 : torch 동적 양자화 (Linear 가중치 int8)
+# - onnx : ONNX로 내보낸 모델을 onnxruntime으로 실행 (onnxruntime 미설치 시 torch로 대체)
+NER_BACKEND = os.environ.get('NER_BACKEND', 'torch').lower()
+NER_BACKENDS = ['torch', 'int8', 'onnx']
+ONNX_THREADS = int(os.environ.get('ONNX_THREADS', 0))
+ONNX_FILE_NAME = 'model.onnx'
+
+
+class OnnxTokenClassifier:
+    """
+    onnxruntime 세션을 ElectraForTokenClassification 처럼 쓸 수 있게 감싼 래퍼
+    - model(**inputs).logits, model.config, model.device 를 그대로 지원 (AIService 코드 변경 없음)
+    """
+
+    def __init__(self, onnx_path, config):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if ONNX_THREADS: options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.config = config
+        self.device = torch.device('cpu')
+
+    def __call__(self, **inputs):
+        feed = {name: tensor.cpu().numpy().astype(np.int64) for name, tensor in inputs.items() if name in self.input_names}
+        logits = self.session.run(['logits'], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+
+def load_ner_model(model_path, device, backend=NER_BACKEND):
+    """ 선택한 백엔드로 NER 모델 로드 (반환 객체는 모두 model(**inputs).logits 형태로 호출 가능) """
+    from transformers import ElectraForTokenClassification
+    model = load_pretrained(ElectraForTokenClassification, model_path)
+
+    if backend == 'int8':
+        # 동적 양자화는 CPU 전용
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+    if backend == 'onnx':
+        try:
+            return OnnxTokenClassifier(export_onnx(model, model_path), model.config)
+        except ImportError:
+            print("  ⚠️ onnxruntime 미설치 - torch 백엔드로 대체")
+
+    return model.to(device)
+
+
+def export_onnx(model, model_path):
+    """ 모델 폴더에 model.onnx 생성 (가중치 파일보다 오래된 경우에만 다시 내보냄) """
+    onnx_path = os.path.join(model_path, ONNX_FILE_NAME)
+    weight_mtime = max(os.path.getmtime(os.path.join(model_path, name)) for name in os.listdir(model_path)
+                       if name != ONNX_FILE_NAME)
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= weight_mtime:
+        return onnx_path
+
+    dummy = torch.ones(1, 8, dtype=torch.long)
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in ['input_ids', 'attention_mask', 'logits']}
+    torch.onnx.export(model.cpu(), (dummy, dummy), onnx_path, input_names=['input_ids', 'attention_mask'],
+                      output_names=['logits'], dynamic_axes=dynamic_axes, opset_version=14, dynamo=False)
+    print(f"  ✅ ONNX 내보내기 완료: {onnx_path}")
+    return onnx_path
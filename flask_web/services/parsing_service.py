@@ -1,36 +1,193 @@
+import datetime
+import math
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
+import openpyxl
 import pandas as pd
 import pdfplumber
 import docx  # python-docx
+from services.cache_service import result_cache
+
+# 파서 로직이 바뀌면 올려서 기존 캐시를 무효화
+PARSER_VERSION = "3"
+
+# 엑셀 스트리밍 모드: openpyxl read-only로 행 단위 처리 (DataFrame 전체를 만들지 않음)
+# EXCEL_STREAMING=1 이면 항상, 아니면 EXCEL_STREAMING_MB 보다 큰 파일만 스트리밍
+EXCEL_STREAMING = os.environ.get('EXCEL_STREAMING', '0') == '1'
+EXCEL_STREAMING_MB = float(os.environ.get('EXCEL_STREAMING_MB', 20))
+# DataFrame -> 텍스트 변환: 셀 수가 이 값 이상인 시트만 열 단위로 변환 (숫자/날짜 열은 배열 연산)
+# 작은 시트는 열마다 드는 고정 비용이 더 커서 셀 단위가 빠름 (샘플 요금표 기준 약 5천 셀에서 역전)
+EXCEL_VECTORIZE_MIN_CELLS = int(os.environ.get('EXCEL_VECTORIZE_MIN_CELLS', 5000))
+
+# PDF 병렬 추출: PDF_PARALLEL_MIN_PAGES 페이지 이상이면 프로세스 풀로 페이지 묶음을 나눠 처리
+# PDF_PAGE_TIMEOUT(초) x 묶음 페이지 수 안에 끝나지 않는 묶음은 빈 텍스트로 건너뜀
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 8))
+PDF_PAGES_PER_TASK = int(os.environ.get('PDF_PAGES_PER_TASK', 2))
+PDF_PAGE_TIMEOUT = float(os.environ.get('PDF_PAGE_TIMEOUT', 20))
+
+# iter_chunks 조각 크기 (엑셀은 행 수, TXT/Word 문단은 글자 수 기준)
+STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', 100))
+STREAM_CHUNK_CHARS = int(os.environ.get('STREAM_CHUNK_CHARS', 2000))
+
+
+def _extract_pdf_page(page):
+    """ PDF 한 페이지 -> 본문 텍스트 + 표(' | ' 구분) 문자열 """
+    parts = []
+    text = page.extract_text()
+    if text: parts.append(text + "\n")
+
+    for table in page.extract_tables():
+        for row in table:
+            clean_row = [str(cell) if cell else "" for cell in row]
+            parts.append(" | ".join(clean_row) + "\n")
+    return "".join(parts)
+
+
+def _extract_pdf_pages(file_path, page_numbers):
+    """ [프로세스 풀 작업] 지정한 페이지들만 추출 (pickle 가능하도록 모듈 함수로 둠) """
+    with pdfplumber.open(file_path) as pdf:
+        return [_extract_pdf_page(pdf.pages[i]) for i in page_numbers]
+
+
+
+def _cell_text(value):
+    """
+    엑셀 셀 값 -> 문자열 (DataFrame 경로와 openpyxl 스트리밍 경로가 같은 텍스트를 만들도록 공통 사용)
+    - 빈 값(None/NaN/NaT) -> "", 정수인 실수(pandas가 빈 칸 있는 숫자 열을 float로 읽음) -> 정수 표기
+    - 날짜는 시각이 00:00이면 날짜만, 시각은 초가 0이면 분까지
+    """
+    if value is None or value is pd.NaT: return ""
+    if isinstance(value, float):
+        if math.isnan(value): return ""
+        return str(int(value)) if value.is_integer() else str(value)
+    if isinstance(value, datetime.datetime):
+        if not (value.hour or value.minute or value.second): return value.strftime('%Y-%m-%d')
+        return value.strftime('%Y-%m-%d %H:%M' if not value.second else '%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.time):
+        return value.strftime('%H:%M' if not value.second else '%H:%M:%S')
+    return str(value).strip()
+
+
+def _float_column_text(values):
+    """ float 배열 -> _cell_text와 같은 표기의 object 배열 (NaN -> "", 정수인 값 -> 정수 표기) """
+    text = np.full(len(values), "", dtype=object)
+    present = ~np.isnan(values)
+    integral = present & (values == np.floor(values))
+    small = integral & (np.abs(values) < 2 ** 63)
+    text[small] = values[small].astype(np.int64).astype(str)
+    big = integral & ~small
+    if big.any(): text[big] = [str(int(v)) for v in values[big].tolist()]
+    rest = present & ~integral
+    text[rest] = values[rest].astype(str)
+    return text
+
+
+def _datetime_column_text(values):
+    """ datetime64 배열 -> _cell_text와 같은 표기의 object 배열 (00:00이면 날짜만, 초가 0이면 분까지) """
+    values = values.astype("datetime64[s]")
+    text = np.full(len(values), "", dtype=object)
+    present = ~np.isnat(values)
+    seconds = (values - values.astype("datetime64[D]")).astype(np.int64)
+    for unit, selected in (("D", present & (seconds == 0)),
+                           ("m", present & (seconds != 0) & (seconds % 60 == 0)),
+                           ("s", present & (seconds % 60 != 0))):
+        if selected.any(): text[selected] = np.char.replace(np.datetime_as_string(values[selected], unit=unit), "T", " ")
+    return text
+
+
+def _column_text(column):
+    """ DataFrame 열 하나 -> 셀 문자열 object 배열 (숫자/날짜 열은 배열 연산, 문자열만 있는 열은 strip만, 섞인 열은 셀마다 _cell_text) """
+    kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else "O"
+    if kind == "f": return _float_column_text(column.to_numpy())
+    if kind == "M": return _datetime_column_text(column.to_numpy())
+    if kind in "iub": return column.to_numpy().astype(str).astype(object)
+    values = column.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=True) == "string":
+        return np.array([v.strip() if isinstance(v, str) else "" for v in values.tolist()], dtype=object)
+    return np.array([_cell_text(v) for v in values.tolist()], dtype=object)
 
 
 class ParsingService:
-    def parse_file(self, file_path):
+    def __init__(self):
+        self._pdf_executor = None
+        self._pdf_lock = threading.Lock()
+        # 요청 스레드별 상태 (일부 페이지를 건너뛴 결과는 캐시하지 않기 위함)
+        self._local = threading.local()
+
+    def parse_file(self, file_path, status=None):
         """
         [진입점] 파일 경로를 받아서 확장자에 맞는 파서로 텍스트 추출
+        - status(dict): status["complete"] = 건너뛴 페이지/파싱 에러 없이 다 읽었는지 (iter_chunks와 같음)
         """
+        if status is None: status = {}
+        status["complete"] = False
         if not os.path.exists(file_path):
             return ""
 
         # 확장자 소문자로 추출
         ext = file_path.split('.')[-1].lower()
 
+        # 같은 내용의 파일은 다시 파싱하지 않음
+        cache_key = f"parse:{PARSER_VERSION}:{ext}:{result_cache.file_hash(file_path)}"
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            status["complete"] = True
+            return cached
+
+        self._local.complete = True
         try:
             if ext in ['xlsx', 'xls']:
-                return self._parse_excel(file_path)
+                text = self._parse_excel(file_path)
             elif ext == 'pdf':
-                return self._parse_pdf(file_path)
+                text = self._parse_pdf(file_path)
             elif ext == 'docx':
-                return self._parse_word(file_path)
+                text = self._parse_word(file_path)
             # [추가됨] 텍스트 파일 (.txt) 처리
             elif ext == 'txt':
-                return self._parse_txt(file_path)
+                text = self._parse_txt(file_path)
             else:
                 return "지원하지 않는 파일 형식입니다."
         except Exception as e:
             print(f"❌ 파일 파싱 실패 ({file_path}): {e}")
             return ""
 
+        status["complete"] = self._local.complete
+        if text and self._local.complete: result_cache.set(cache_key, text)
+        return text
+
+    def iter_chunks(self, file_path, status=None):
+        """
+        [스트리밍 진입점] 문서 전체를 기다리지 않고 페이지/시트/문단 단위 조각을 추출되는 즉시 yield
+        - 조각 형식: {"text": "...", "location": {"page": 3}} / {"sheet": "요금표", "row": 1}
+                     / {"paragraph": 12} / {"table": 2} / {"line": 40}
+        - status(dict): 끝까지 읽은 뒤 status["complete"] = 건너뛴 페이지/파싱 에러 없이 다 읽었는지
+          (호출한 쪽이 결과를 캐시해도 되는지 판단, parse_file의 완전성 검사와 같은 기준)
+        """
+        if status is None: status = {}
+        status["complete"] = False
+        if not os.path.exists(file_path):
+            return
+
+        ext = file_path.split('.')[-1].lower()
+        self._local.complete = True
+        try:
+            if ext in ['xlsx', 'xls']:
+                yield from self._iter_excel_chunks(file_path)
+            elif ext == 'pdf':
+                yield from self._iter_pdf_chunks(file_path)
+            elif ext == 'docx':
+                yield from self._iter_word_chunks(file_path)
+            elif ext == 'txt':
+                yield from self._iter_txt_chunks(file_path)
+        except Exception as e:
+            print(f"❌ 파일 스트리밍 파싱 실패 ({file_path}): {e}")
+            return
+        status["complete"] = self._local.complete
+
     # ---------------------------------------------------------
     # 각 파일별 상세 로직
     # ---------------------------------------------------------
@@ -54,29 +211,28 @@ class ParsingService:
                 print(f"❌ 텍스트 인코딩 에러: {e}")
                 return ""
 
-    def _parse_excel(self, file_path):
+    def _parse_excel(self, file_path, streaming=None):
         """
-        [업그레이드됨] 엑셀 파싱: NaN 제거 및 ' | ' 구분자로 구조 보존
+        [업그레이드됨] 엑셀 파싱: 모든 시트를 '[시트] 시트명' 표시와 함께 ' | ' 구분자로 구조 보존
+        - 기본: pandas로 시트별 DataFrame을 읽어서 변환 (큰 시트는 열 단위, EXCEL_VECTORIZE_MIN_CELLS)
+        - streaming=True: openpyxl read-only 모드로 행을 하나씩 읽음 (대용량 통합문서용)
         """
+        if streaming is None:
+            streaming = EXCEL_STREAMING or os.path.getsize(file_path) > EXCEL_STREAMING_MB * 1024 * 1024
+
         try:
-            # 1. 헤더 없이 읽기
-            df = pd.read_excel(file_path, header=None, engine='openpyxl')
+            if streaming:
+                return "\n".join(self._iter_excel_lines(file_path))
 
-            # 2. NaN(빈 값)을 빈 문자열 ""로 치환
-            df = df.fillna("")
+            # 1. 헤더 없이 모든 시트 읽기 ({시트명: DataFrame})
+            sheets = pd.read_excel(file_path, header=None, sheet_name=None, engine='openpyxl')
 
             cleaned_text_lines = []
-
-            # 3. 행 단위로 순회
-            for index, row in df.iterrows():
-                # 빈칸이 아닌 셀만 리스트로 모음
-                valid_cells = [str(item).strip() for item in row if str(item).strip()]
-
-                # 유의미한 데이터가 있는 행만 처리
-                if valid_cells:
-                    # 셀 사이를 " | "로 구분 (AI 힌트용)
-                    row_text = " | ".join(valid_cells)
-                    cleaned_text_lines.append(row_text)
+            for sheet_name, df in sheets.items():
+                rows = self._frame_to_lines(df)
+                if rows:
+                    cleaned_text_lines.append(f"[시트] {sheet_name}")
+                    cleaned_text_lines.extend(rows)
 
             return "\n".join(cleaned_text_lines)
 
@@ -84,25 +240,113 @@ class ParsingService:
             print(f"❌ 엑셀 파싱 에러: {e}")
             return ""
 
-    def _parse_pdf(self, file_path):
-        """ PDF 파싱: 텍스트 및 표 추출 """
-        full_text = ""
+    def _frame_to_lines(self, df, vectorize=None):
+        """
+        DataFrame -> 행별 ' | ' 문자열 리스트 (빈 셀/빈 행 제외, 행 순서 유지, 셀 표기는 스트리밍 모드와 같음)
+        - vectorize=None 이면 셀 수가 EXCEL_VECTORIZE_MIN_CELLS 이상일 때만 열 단위 변환
+        """
+        if df.empty: return []
+        if vectorize is None: vectorize = df.size >= EXCEL_VECTORIZE_MIN_CELLS
+
+        # 2. 셀 문자열 변환: 큰 시트는 열 단위, 작은 시트는 object 배열에서 셀 단위 (iterrows의 행마다 Series 생성 비용 없음)
+        if vectorize:
+            rows = np.column_stack([_column_text(df.iloc[:, j]) for j in range(df.shape[1])]).tolist()
+        else:
+            rows = (map(_cell_text, row) for row in df.to_numpy(dtype=object))
+
+        # 3. 빈 셀 제외, 유의미한 셀이 있는 행만 " | "로 연결 (AI 힌트용)
+        lines = []
+        for row in rows:
+            valid_cells = [text for text in row if text]
+            if valid_cells:
+                lines.append(" | ".join(valid_cells))
+        return lines
+
+    def _iter_excel_lines(self, file_path):
+        """ openpyxl read-only 스트리밍: 시트 표시 및 유의미한 행을 한 줄씩 생성 """
+        current_sheet = None
+        for sheet_name, _, line in self._iter_excel_rows(file_path):
+            if sheet_name != current_sheet:
+                yield f"[시트] {sheet_name}"
+                current_sheet = sheet_name
+            yield line
+
+    def _iter_excel_rows(self, file_path):
+        """ (시트명, 행 번호(1부터), ' | ' 연결 문자열)을 유의미한 행마다 생성 """
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                for row_number, row in enumerate(ws.iter_rows(values_only=True), start=1):
+                    valid_cells = [text for text in map(_cell_text, row) if text]
+                    if valid_cells:
+                        yield ws.title, row_number, " | ".join(valid_cells)
+        finally:
+            wb.close()
+
+    def _parse_pdf(self, file_path, parallel=None):
+        """
+        PDF 파싱: 텍스트 및 표 추출
+        - 페이지가 많으면 프로세스 풀에서 페이지 묶음 단위로 병렬 추출 (페이지 순서 유지)
+        """
         try:
             with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text: full_text += text + "\n"
-
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            clean_row = [str(cell) if cell else "" for cell in row]
-                            full_text += " | ".join(clean_row) + "\n"
-            return full_text
+                page_count = len(pdf.pages)
+                if parallel is None:
+                    parallel = PDF_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+                if not parallel:
+                    return "".join(_extract_pdf_page(page) for page in pdf.pages)
+
+            return "".join(self._parse_pdf_parallel(file_path, page_count))
         except Exception as e:
             print(f"❌ PDF 파싱 에러: {e}")
             return ""
 
+    def _parse_pdf_parallel(self, file_path, page_count):
+        """ 페이지 묶음을 프로세스 풀에 나눠 맡기고, 페이지 순서대로 텍스트 리스트 반환 """
+        return list(self._iter_pdf_pages_parallel(file_path, page_count))
+
+    def _iter_pdf_pages_parallel(self, file_path, page_count):
+        """ 모든 페이지 묶음을 한꺼번에 제출한 뒤, 앞 페이지부터 끝나는 대로 페이지 텍스트를 yield """
+        chunks = [list(range(start, min(start + PDF_PAGES_PER_TASK, page_count)))
+                  for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+        executor = self._get_pdf_executor()
+        futures = [executor.submit(_extract_pdf_pages, file_path, pages) for pages in chunks]
+
+        stalled = False
+        try:
+            for pages, future in zip(chunks, futures):
+                try:
+                    page_texts = future.result(timeout=PDF_PAGE_TIMEOUT * len(pages))
+                except FutureTimeoutError:
+                    print(f"⚠️ PDF 페이지 시간 초과 ({pages[0] + 1}~{pages[-1] + 1}p, {file_path}) - 건너뜀")
+                    page_texts = [""] * len(pages)
+                    self._local.complete = False
+                    stalled = True
+                except Exception as e:
+                    print(f"❌ PDF 페이지 추출 에러 ({pages[0] + 1}~{pages[-1] + 1}p): {e}")
+                    page_texts = [""] * len(pages)
+                    self._local.complete = False
+                yield from page_texts
+        finally:
+            # 멈춘 페이지를 붙잡고 있는 워커는 풀째로 정리 (다음 요청 때 새로 생성)
+            if stalled: self._reset_pdf_executor()
+
+    def _get_pdf_executor(self):
+        with self._pdf_lock:
+            if self._pdf_executor is None:
+                # torch 스레드가 떠 있는 프로세스에서 fork하면 교착될 수 있어 spawn 사용
+                self._pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+            return self._pdf_executor
+
+    def _reset_pdf_executor(self):
+        with self._pdf_lock:
+            executor, self._pdf_executor = self._pdf_executor, None
+        if executor is None: return
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+
     def _parse_word(self, file_path):
         """ Word 파싱: 문단 및 표 추출 """
         try:
@@ -125,6 +369,69 @@ class ParsingService:
             return ""
 
 
+    # ---------------------------------------------------------
+    # 스트리밍(조각 단위) 추출
+    # ---------------------------------------------------------
+
+    def _iter_txt_chunks(self, file_path):
+        """ TXT: STREAM_CHUNK_CHARS 글자 안팎으로 줄을 묶어서 yield """
+        lines = self._parse_txt(file_path).splitlines()
+        yield from self._group_lines(((i, line) for i, line in enumerate(lines, start=1) if line.strip()), "line")
+
+    def _iter_excel_chunks(self, file_path):
+        """ 엑셀: 시트별로 STREAM_CHUNK_ROWS 행씩 묶어서 yield (read-only 스트리밍) """
+        sheet_name, start_row, rows = None, None, []
+        for name, row_number, line in self._iter_excel_rows(file_path):
+            if rows and (name != sheet_name or len(rows) >= STREAM_CHUNK_ROWS):
+                yield {"text": "\n".join(rows), "location": {"sheet": sheet_name, "row": start_row}}
+                rows = []
+            if not rows:
+                sheet_name, start_row = name, row_number
+            rows.append(line)
+        if rows:
+            yield {"text": "\n".join(rows), "location": {"sheet": sheet_name, "row": start_row}}
+
+    def _iter_pdf_chunks(self, file_path):
+        """ PDF: 페이지 단위로 yield (페이지가 많으면 프로세스 풀 결과를 순서대로 받음) """
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+            if PDF_WORKERS <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+                for page_number, page in enumerate(pdf.pages, start=1):
+                    text = _extract_pdf_page(page)
+                    if text: yield {"text": text, "location": {"page": page_number}}
+                return
+
+        for page_number, text in enumerate(self._iter_pdf_pages_parallel(file_path, page_count), start=1):
+            if text: yield {"text": text, "location": {"page": page_number}}
+
+    def _iter_word_chunks(self, file_path):
+        """ Word: 문단을 STREAM_CHUNK_CHARS 글자 안팎으로 묶고, 표는 표 하나씩 yield """
+        doc = docx.Document(file_path)
+        paragraphs = ((i, para.text.strip()) for i, para in enumerate(doc.paragraphs, start=1) if para.text.strip())
+        yield from self._group_lines(paragraphs, "paragraph")
+
+        for table_number, table in enumerate(doc.tables, start=1):
+            rows = []
+            for row in table.rows:
+                row_data = [cell.text.strip().replace('\n', ' ') for cell in row.cells]
+                if any(row_data):
+                    rows.append(" | ".join(row_data))
+            if rows:
+                yield {"text": "\n".join(rows), "location": {"table": table_number}}
+
+    def _group_lines(self, numbered_lines, location_key):
+        """ (번호, 줄) 목록을 STREAM_CHUNK_CHARS 글자 단위 조각으로 묶음 (조각 위치 = 첫 줄 번호) """
+        start, lines, size = None, [], 0
+        for number, line in numbered_lines:
+            if lines and size + len(line) > STREAM_CHUNK_CHARS:
+                yield {"text": "\n".join(lines), "location": {location_key: start}}
+                lines, size = [], 0
+            if not lines: start = number
+            lines.append(line)
+            size += len(line) + 1
+        if lines:
+            yield {"text": "\n".join(lines), "location": {location_key: start}}
+
 # ========================================================
 # [여기가 핵심] 클래스를 밖에서 바로 쓸 수 있게 객체로 만들어둠
 # ========================================================
@@ -0,0 +1,367 @@
+import datetime
+import glob
+import json
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from services.cache_service import result_cache
+
+# 랜드사 요금표 설정
+# - PRICE_TABLE_DIR: 요금표 엑셀 폴더 (하위 폴더 포함)
+# - PRICE_STORE_DIR: 추출한 표를 통합문서별 .npz로 저장하는 폴더 (파일 내용이 같으면 다시 추출하지 않음)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PRICE_TABLE_DIR = os.environ.get('PRICE_TABLE_DIR', os.path.join(BASE_DIR, '../../ERP 필요한 데이터/1. 랜드사한테 받은 상품_완료/가격표'))
+PRICE_STORE_DIR = os.environ.get('PRICE_STORE_DIR', os.path.join(BASE_DIR, '../data/price_tables'))
+# 추출 로직이 바뀌면 올려서 저장된 표를 다시 만듦
+PRICE_TABLE_VERSION = "1"
+# - QUOTE_FX_RATES: 통화별 원화 환산율 (JSON), 통화가 다른 상품끼리 비교/정렬/합계할 때 사용
+QUOTE_FX_RATES = json.loads(os.environ.get('QUOTE_FX_RATES', '{"KRW": 1, "JPY": 9.3, "USD": 1390}'))
+
+DESTINATIONS = ["오키나와", "미야코지마", "치앙마이", "나트랑", "다낭", "호이안", "세부", "보홀", "클락", "바기오",
+                "방콕", "파타야", "후쿠오카", "시즈오카", "가고시마", "미야자키", "제주"]
+# 시트에 통화 표시가 없을 때 목적지 기본 통화 (오키나와 지상비는 엔화 입금가)
+DESTINATION_CURRENCY = {"오키나와": "JPY"}
+CURRENCY_MARKERS = [("엔화", "JPY"), ("원화", "KRW"), ("달러", "USD"), ("USD", "USD")]
+
+RATE_PRICE = 0    # 1인 요금
+RATE_SINGLE = 1   # 싱글차지 (1인 추가 요금)
+# 그룹 키 = 그룹 번호 * GROUP_STRIDE + 날짜(일) -> 정렬된 정수 배열 하나로 모든 그룹의 구간을 검색
+GROUP_STRIDE = 1 << 20
+EPOCH = datetime.date(1970, 1, 1)
+
+HEADER_TEXT = "출발일"
+PAX_PATTERN = re.compile(r'(\d+)\s*(?:명|인)')
+NIGHTS_PATTERN = re.compile(r'(\d+)\s*(?:N\s*\d+\s*D|박)', re.IGNORECASE)
+GRADE_PATTERN = re.compile(r'(\d)\s*성')
+YEAR_PATTERN = re.compile(r'(20\d\d)')
+MONTH_DAY_PATTERN = re.compile(r'^(\d{1,2})\s*월\s*(\d{1,2})\s*일$')
+DOTTED_DATE_PATTERN = re.compile(r'^(20\d\d)[.\-/]\s*(\d{1,2})[.\-/]\s*(\d{1,2})')
+
+
+def _day_number(date):
+    return (date - EPOCH).days
+
+
+def _day_to_iso(day):
+    return (EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+class PriceTableSnapshot:
+    """
+    적재된 요금표 한 벌 (상품 목록 + 열 배열 + 그룹 키 + 상품 속성 배열) - 만든 뒤에는 바꾸지 않음
+    - reload()는 새 스냅샷을 다 만든 뒤 한 번에 교체 -> 조회 중인 요청은 끝까지 같은 스냅샷(짝이 맞는 키/열)을 봄
+    """
+
+    def __init__(self, products, parts):
+        self.products = products
+        names = ["product_id", "rate", "pax", "start", "end", "price"]
+        columns = {name: np.concatenate([p[name] for p in parts]) if parts else np.zeros(0) for name in names}
+
+        # 그룹 = (상품, 요금 종류, 인원), 그룹 안의 구간은 겹치지 않음
+        group_keys = np.stack([columns["product_id"], columns["rate"], columns["pax"]], axis=1).astype(np.int64)
+        groups, group_ids = np.unique(group_keys, axis=0, return_inverse=True) if len(group_keys) else (np.zeros((0, 3)), np.zeros(0))
+        group_ids = np.asarray(group_ids).reshape(-1).astype(np.int64)
+        order = np.lexsort((columns["start"], group_ids))
+        columns = {name: values[order] for name, values in columns.items()}
+        columns["group"] = group_ids[order]
+        columns["key"] = columns["group"] * GROUP_STRIDE + columns["start"]
+
+        self.columns = columns
+        self.groups = groups.astype(np.int64)
+        self.product_table = {
+            "destination": np.array([p["destination"] for p in products], dtype=object),
+            "grade": np.array([p["grade"] for p in products], dtype=np.int16),
+            "nights": np.array([p["nights"] for p in products], dtype=np.int16),
+            "fx": np.array([QUOTE_FX_RATES.get(p["currency"], np.nan) for p in products], dtype=np.float64),
+        }
+
+
+class PriceTableStore:
+    """
+    [요금표 엔진] 랜드사 요금표 엑셀 -> 타입이 있는 열 단위 표 (NumPy) + 출발일 구간 인덱스
+    - 행: (상품, 요금 종류, 인원, 출발일 구간[start, end], 가격), 상품: 목적지/호텔 등급/박수/통화/시트
+    - 같은 가격이 연속된 출발일은 구간 하나로 합침
+    - lookup(date, ...): 정렬된 (그룹, 시작일) 키 배열에 searchsorted 한 번 -> 엑셀을 다시 읽지 않고 마이크로초 단위 조회
+    - 적재 결과는 PriceTableSnapshot 하나로 교체 (재적재 중에도 조회는 잠금 없이 이전 스냅샷을 그대로 사용)
+    """
+
+    def __init__(self, table_dir=PRICE_TABLE_DIR, store_dir=PRICE_STORE_DIR):
+        self.table_dir = table_dir
+        self.store_dir = store_dir
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 적재
+    # ---------------------------------------------------------
+
+    def workbook_paths(self):
+        return sorted(glob.glob(os.path.join(self.table_dir, '**', '*.xlsx'), recursive=True))
+
+    def snapshot(self):
+        """ 현재 요금표 스냅샷 (처음 호출 때 적재) - 한 요청 안에서는 이것 하나만 읽을 것 """
+        snapshot = self._snapshot
+        if snapshot is not None: return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def ensure_loaded(self):
+        self.snapshot()
+
+    def reload(self, paths=None):
+        """ 요금표 폴더 전체를 (저장된 표가 있으면 그대로, 없으면 추출해서) 다시 적재 -> 스냅샷 한 번에 교체 """
+        snapshot = self._load(paths)
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _load(self, paths=None):
+        products, parts = [], []
+        for path in (paths if paths is not None else self.workbook_paths()):
+            try:
+                table = self.load_workbook(path)
+            except Exception as e:
+                print(f"❌ 요금표 추출 실패 ({os.path.basename(path)}): {e}")
+                continue
+            offset = len(products)
+            products.extend(dict(p, id=p["id"] + offset) for p in table["products"])
+            columns = dict(table["columns"])
+            columns["product_id"] = columns["product_id"] + offset
+            parts.append(columns)
+
+        snapshot = PriceTableSnapshot(products, parts)
+        print(f"  ✅ 요금표 적재: 상품 {len(products)}개, 요금 구간 {len(snapshot.columns['price'])}개")
+        return snapshot
+
+    def load_workbook(self, path):
+        """ 통합문서 하나 -> {"products": [...], "columns": {이름: 배열}} (내용 해시별 .npz 재사용) """
+        store_path = os.path.join(self.store_dir, f"{PRICE_TABLE_VERSION}_{result_cache.file_hash(path)}.npz")
+        if os.path.exists(store_path):
+            with np.load(store_path, allow_pickle=False) as data:
+                columns = {name: data[name] for name in data.files if name != "products"}
+                products = json.loads(str(data["products"]))
+            return {"products": products, "columns": columns}
+
+        table = self.extract_workbook(path)
+        if not os.path.exists(self.store_dir): os.makedirs(self.store_dir)
+        np.savez_compressed(store_path, products=np.array(json.dumps(table["products"], ensure_ascii=False)),
+                            **table["columns"])
+        return table
+
+    # ---------------------------------------------------------
+    # 추출
+    # ---------------------------------------------------------
+
+    def extract_workbook(self, path):
+        """
+        시트마다 '출발일' 머리글 칸을 찾아 그 오른쪽 열들을 요금 열로 읽음
+        - 열 머리글: 'N명' -> 인원별 요금, '싱글' -> 싱글차지, 그 외 -> 상품명 (인원 무관 요금)
+        - 날짜: 날짜 셀 / '2025.11.7' / '11월 01일'(연도는 파일명 연도, 시즌 첫 달보다 앞선 달은 다음 해)
+        - 'X', 빈칸은 판매 없음
+        """
+        file_name = os.path.basename(path)
+        destination = next((d for d in DESTINATIONS if d in file_name), "")
+        year_match = YEAR_PATTERN.search(file_name)
+        base_year = int(year_match.group(1)) if year_match else datetime.date.today().year
+
+        products, rows = [], []
+        for sheet_name, df in pd.read_excel(path, header=None, sheet_name=None, engine='openpyxl').items():
+            grid = df.to_numpy(dtype=object)
+            self._extract_sheet(grid, sheet_name, file_name, destination, base_year, products, rows)
+
+        return {"products": products, "columns": self._merge_intervals(rows)}
+
+    def _extract_sheet(self, grid, sheet_name, file_name, destination, base_year, products, rows):
+        headers = [(r, c) for r, c in zip(*np.nonzero(np.vectorize(self._is_header)(grid)))] if grid.size else []
+        if not headers: return
+
+        currency = self._sheet_currency(grid[:min(r for r, _ in headers)], destination)
+        header_rows = {}
+        for r, c in headers: header_rows.setdefault(r, []).append(c)
+        header_cols = {}
+        for r, c in headers: header_cols.setdefault(c, []).append(r)
+
+        season_start = None
+        product_ids = {}
+        for r, c in sorted(headers, key=lambda rc: (rc[1], rc[0])):
+            row_headers = sorted(header_rows[r])
+            next_col = next((cc for cc in row_headers if cc > c), grid.shape[1])
+            next_row = next((rr for rr in sorted(header_cols[c]) if rr > r), grid.shape[0])
+            title = self._block_title(grid, r, c, next_col)
+
+            for col in range(c + 1, next_col):
+                label = self._text(grid[r, col])
+                if not label or label == "요일": continue
+                pax_match = PAX_PATTERN.search(label)
+                if "싱글" in label: rate, pax, product_label = RATE_SINGLE, 0, ""
+                elif pax_match: rate, pax, product_label = RATE_PRICE, int(pax_match.group(1)), ""
+                else: rate, pax, product_label = RATE_PRICE, 0, label
+
+                name = " ".join(part for part in [title or sheet_name.replace("요금표", "").strip(), product_label] if part)
+                key = (name, currency)
+                if key not in product_ids:
+                    context = f"{sheet_name} {name}"
+                    nights = NIGHTS_PATTERN.search(context)
+                    grade = GRADE_PATTERN.search(context)
+                    product_ids[key] = len(products)
+                    products.append({"id": len(products), "destination": destination, "product": name,
+                                     "grade": int(grade.group(1)) if grade else 0,
+                                     "nights": int(nights.group(1)) if nights else 0,
+                                     "currency": currency, "sheet": sheet_name, "source": file_name})
+
+                for row in range(r + 1, next_row):
+                    date = self._parse_date(grid[row, c], base_year, season_start)
+                    if date is None: continue
+                    if season_start is None and not isinstance(grid[row, c], (datetime.date, pd.Timestamp)):
+                        season_start = date.month
+                    price = self._parse_price(grid[row, col])
+                    if price is None: continue
+                    rows.append((product_ids[key], rate, pax, _day_number(date), price))
+
+    def _is_header(self, value):
+        return isinstance(value, str) and value.strip() == HEADER_TEXT
+
+    def _text(self, value):
+        if value is None or (isinstance(value, float) and np.isnan(value)): return ""
+        return " ".join(str(value).split())
+
+    def _block_title(self, grid, r, c, next_col):
+        """ 머리글 바로 위 3행 안에서 블록 제목 (예: '미야코지마 시내 스마일 호텔 2박3일 조조'), 위 블록의 요금 행을 만나면 중단 """
+        for row in range(r - 1, max(-1, r - 4), -1):
+            if any(self._parse_date(v, 2000, None) is not None for v in grid[row]): break
+            for col in range(c, next_col):
+                text = self._text(grid[row, col])
+                if text and "기준" not in text and "입금가" not in text and not text.startswith("["):
+                    return text
+        return ""
+
+    def _sheet_currency(self, top_rows, destination):
+        text = " ".join(self._text(v) for v in top_rows.ravel())
+        for marker, currency in CURRENCY_MARKERS:
+            if marker in text: return currency
+        return DESTINATION_CURRENCY.get(destination, "KRW")
+
+    def _parse_date(self, value, base_year, season_start):
+        if isinstance(value, (datetime.datetime, pd.Timestamp)): return value.date()
+        if isinstance(value, datetime.date): return value
+        text = self._text(value)
+        if not text: return None
+        match = DOTTED_DATE_PATTERN.match(text)
+        if match: return self._safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = MONTH_DAY_PATTERN.match(text)
+        if match:
+            month, day = int(match.group(1)), int(match.group(2))
+            start = season_start or month
+            return self._safe_date(base_year + (1 if month < start else 0), month, day)
+        return None
+
+    def _safe_date(self, year, month, day):
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            return None
+
+    def _parse_price(self, value):
+        if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+            return None if np.isnan(value) or value <= 0 else float(value)
+        text = self._text(value).replace(",", "")
+        try:
+            price = float(text)
+        except ValueError:
+            return None
+        return price if price > 0 else None
+
+    def _merge_intervals(self, rows):
+        """ (상품, 요금 종류, 인원, 날짜, 가격) 행 -> 연속된 날짜에 같은 가격이면 [start, end] 구간 하나로 """
+        if not rows:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in
+                    [("product_id", np.int32), ("rate", np.int8), ("pax", np.int16),
+                     ("start", np.int32), ("end", np.int32), ("price", np.float64)]}
+
+        data = np.array(rows, dtype=np.float64)
+        data = data[np.lexsort((data[:, 3], data[:, 2], data[:, 1], data[:, 0]))]
+        # 같은 그룹/날짜가 두 번 나오면(시트 오타 등) 처음 값만 사용
+        keys = data[:, :4]
+        unique = np.ones(len(data), dtype=bool)
+        unique[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+        data = data[unique]
+
+        same_group = np.all(data[1:, :3] == data[:-1, :3], axis=1)
+        continues = same_group & (data[1:, 3] == data[:-1, 3] + 1) & (data[1:, 4] == data[:-1, 4])
+        starts = np.flatnonzero(np.concatenate(([True], ~continues)))
+        ends = np.concatenate((starts[1:] - 1, [len(data) - 1]))
+        return {
+            "product_id": data[starts, 0].astype(np.int32),
+            "rate": data[starts, 1].astype(np.int8),
+            "pax": data[starts, 2].astype(np.int16),
+            "start": data[starts, 3].astype(np.int32),
+            "end": data[ends, 3].astype(np.int32),
+            "price": data[starts, 4],
+        }
+
+    # ---------------------------------------------------------
+    # 인덱스 / 조회
+    # ---------------------------------------------------------
+
+    def lookup(self, date, destination=None, grade=None, nights=None, pax=None, product=None):
+        """
+        출발일(date)에 판매 중인 상품별 1인 요금
+        - pax: 인원별 요금표는 pax 이하 중 가장 큰 인원 구간 적용 (예: 5명 -> '4명' 요금), 생략하면 가장 작은 인원 구간
+          (인원 무관 요금은 항상 적용)
+        - 반환: [{product 정보..., pax_tier, price, price_krw, single_supplement, valid_from, valid_to}, ...]
+          (통화가 섞여 있으므로 원화 환산(QUOTE_FX_RATES) 가격 낮은 순, 환산율 없는 통화는 뒤로)
+        """
+        snapshot = self.snapshot()
+        groups, columns, products = snapshot.groups, snapshot.columns, snapshot.products
+        if isinstance(date, str): date = datetime.date.fromisoformat(date[:10])
+        day = _day_number(date)
+        if not len(groups): return []
+
+        product_ids = groups[:, 0]
+        mask = np.ones(len(groups), dtype=bool)
+        if destination: mask &= snapshot.product_table["destination"][product_ids] == destination
+        if grade: mask &= snapshot.product_table["grade"][product_ids] == int(grade)
+        if nights: mask &= snapshot.product_table["nights"][product_ids] == int(nights)
+        if product: mask &= np.array([product in products[i]["product"] for i in product_ids])
+        if pax: mask &= groups[:, 2] <= int(pax)
+        candidates = np.flatnonzero(mask)
+        if not len(candidates): return []
+
+        # 그룹마다 "시작일 <= day" 인 마지막 구간 -> 끝나는 날이 day 이상이면 해당
+        keys = columns["key"]
+        idx = np.searchsorted(keys, candidates * GROUP_STRIDE + day, side='right') - 1
+        found = (idx >= 0) & (columns["group"][np.maximum(idx, 0)] == candidates)
+        idx, candidates = idx[found], candidates[found]
+        hit = columns["end"][idx] >= day
+        idx, candidates = idx[hit], candidates[hit]
+
+        # 그룹은 (상품, 요금 종류, 인원) 순으로 정렬돼 있으므로 상품별 마지막 1인 요금 그룹이 가장 큰 인원 구간
+        product_ids, rates = groups[candidates, 0], groups[candidates, 1]
+        singles = dict(zip(product_ids[rates == RATE_SINGLE].tolist(), columns["price"][idx[rates == RATE_SINGLE]].tolist()))
+        price_rows = rates == RATE_PRICE
+        idx, candidates, product_ids = idx[price_rows], candidates[price_rows], product_ids[price_rows]
+        if not len(product_ids): return []
+        if pax: best = np.flatnonzero(np.append(product_ids[1:] != product_ids[:-1], True))
+        else: best = np.flatnonzero(np.insert(product_ids[1:] != product_ids[:-1], 0, True))
+
+        results = []
+        for i, group, product_id in zip(idx[best].tolist(), candidates[best].tolist(), product_ids[best].tolist()):
+            price = float(columns["price"][i])
+            price_krw = price * snapshot.product_table["fx"][product_id]
+            results.append(dict(products[product_id], pax_tier=int(groups[group, 2]), price=price,
+                                price_krw=None if np.isnan(price_krw) else round(float(price_krw)),
+                                single_supplement=singles.get(product_id),
+                                valid_from=_day_to_iso(columns["start"][i]),
+                                valid_to=_day_to_iso(columns["end"][i])))
+        return sorted(results, key=lambda r: (r["price_krw"] is None, r["price_krw"] or 0, r["price"]))
+
+    def get_stats(self):
+        snapshot = self.snapshot()
+        return {"workbooks": len({p["source"] for p in snapshot.products}), "products": len(snapshot.products),
+                "intervals": int(len(snapshot.columns["price"]))}
+
+
+price_tables = PriceTableStore()
@@ -0,0 +1,175 @@
+import datetime
+import os
+import threading
+import numpy as np
+from services.price_table_service import price_tables, QUOTE_FX_RATES, RATE_PRICE, RATE_SINGLE, EPOCH
+
+# 견적 계산 설정
+# - QUOTE_MAX_PAX: 미리 계산해 둘 최대 인원 (이보다 많으면 가장 큰 인원 구간 요금 적용)
+# - QUOTE_FX_RATES: 통화별 원화 환산율 (price_table_service에서 요금 조회와 함께 씀)
+QUOTE_MAX_PAX = int(os.environ.get('QUOTE_MAX_PAX', 12))
+# 대체 출발일 조회 최대 기간 (일)
+QUOTE_MAX_RANGE_DAYS = 400
+
+
+class PriceMatrix:
+    """
+    견적 요금 행렬 한 벌 (요금표 스냅샷 하나에서 만듦) - 만든 뒤에는 바꾸지 않음
+    - per_person[상품, 인원, 날짜]: 인원별 요금 구간 규칙(인원 이하 중 가장 큰 구간)을 이미 적용한 1인 요금, 판매 없음은 NaN
+    - single[상품, 날짜]: 싱글차지 (싱글룸 1개당), fx[상품]: 원화 환산율, 날짜 축은 first_day(1970-01-01 기준 일수)부터
+    - 요금표가 바뀌면 새 행렬을 다 만든 뒤 한 번에 교체 -> 계산 중인 요청은 끝까지 짝이 맞는 상품 목록/행렬/환산율을 봄
+    """
+
+    def __init__(self, snapshot, max_pax):
+        columns, products = snapshot.columns, list(snapshot.products)
+        n_products = len(products)
+        first_day = int(columns["start"].min()) if len(columns["start"]) else 0
+        n_days = int(columns["end"].max()) - first_day + 1 if len(columns["end"]) else 0
+
+        # 구간 [start, end] -> 날짜별 행 (구간 길이만큼 반복)
+        lengths = (columns["end"] - columns["start"] + 1).astype(np.int64)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        days = columns["start"][rows] - first_day + offsets
+        product_ids, rates = columns["product_id"][rows], columns["rate"][rows]
+        tiers, prices = columns["pax"][rows].astype(np.int64), columns["price"][rows]
+
+        single = np.full((n_products, n_days), np.nan)
+        is_single = rates == RATE_SINGLE
+        single[product_ids[is_single], days[is_single]] = prices[is_single]
+
+        # 인원 구간별로 덮어쓰기 (작은 구간부터) -> 인원 n 에는 n 이하 중 가장 큰 구간 요금이 남음, 0(인원 무관)은 전 인원
+        per_person = np.full((n_products, max_pax + 1, n_days), np.nan)
+        is_price = rates == RATE_PRICE
+        for tier in np.unique(tiers[is_price]):
+            sel = is_price & (tiers == tier)
+            tier_prices = np.full((n_products, n_days), np.nan)
+            tier_prices[product_ids[sel], days[sel]] = prices[sel]
+            for pax in range(max(int(tier), 1), max_pax + 1):
+                per_person[:, pax] = np.where(np.isnan(tier_prices), per_person[:, pax], tier_prices)
+
+        self.source = snapshot
+        self.max_pax = max_pax
+        self.products = products
+        self.first_day = first_day
+        self.per_person = per_person
+        self.single = single
+        self.fx = np.array([QUOTE_FX_RATES.get(p["currency"], np.nan) for p in products], dtype=np.float64)
+        self.attributes = {
+            "destination": np.array([p["destination"] for p in products], dtype=object),
+            "grade": np.array([p["grade"] for p in products], dtype=np.int16),
+            "nights": np.array([p["nights"] for p in products], dtype=np.int16),
+        }
+
+
+class QuotationPricer:
+    """
+    [견적 계산] 요금표(price_tables)에서 상품 x 인원 x 출발일 1인 요금 행렬(PriceMatrix)을 미리 만들어 두고 배열 인덱싱으로 계산
+    - 합계 = 1인 요금 x 인원 + 싱글차지 x 싱글룸 수, total_krw는 QUOTE_FX_RATES로 환산
+    - quote(): 출발일 하루, quote_range(): 기간 전체 (대체 출발일 비교)
+    - 요금표가 다시 적재되면 다음 계산 때 행렬도 다시 만들어 교체, 계산은 시작할 때 잡은 행렬 하나만 사용
+    """
+
+    def __init__(self, tables=price_tables, max_pax=QUOTE_MAX_PAX):
+        self.tables = tables
+        self.max_pax = max_pax
+        self.matrix = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 행렬 생성
+    # ---------------------------------------------------------
+
+    def ensure_built(self):
+        """ 현재 요금표 스냅샷의 PriceMatrix (요금표가 바뀌었으면 새로 만들어 교체) """
+        snapshot = self.tables.snapshot()
+        matrix = self.matrix
+        if matrix is not None and matrix.source is snapshot: return matrix
+        with self._lock:
+            if self.matrix is None or self.matrix.source is not snapshot:
+                self.matrix = self._build(snapshot)
+            return self.matrix
+
+    def _build(self, snapshot):
+        matrix = PriceMatrix(snapshot, self.max_pax)
+        n_products, _, n_days = matrix.per_person.shape
+        print(f"  ✅ 견적 요금 행렬 생성: 상품 {n_products}개 x 인원 {self.max_pax}명 x {n_days}일 ({matrix.per_person.nbytes // 1024}KB)")
+        return matrix
+
+    # ---------------------------------------------------------
+    # 계산
+    # ---------------------------------------------------------
+
+    def _select(self, matrix, destination=None, grade=None, nights=None, product=None):
+        mask = np.ones(len(matrix.products), dtype=bool)
+        if destination: mask &= matrix.attributes["destination"] == destination
+        if grade: mask &= matrix.attributes["grade"] == int(grade)
+        if nights: mask &= matrix.attributes["nights"] == int(nights)
+        if product: mask &= np.array([product in p["product"] for p in matrix.products], dtype=bool)
+        return np.flatnonzero(mask)
+
+    def _to_day(self, matrix, date):
+        if isinstance(date, str): date = datetime.date.fromisoformat(date[:10])
+        return (date - EPOCH).days - matrix.first_day
+
+    def _totals(self, matrix, product_ids, pax, day_slice, single_rooms):
+        """ (상품 k개, 날짜 L개) 1인 요금 / 합계 / 원화 합계 """
+        per_person = matrix.per_person[product_ids, min(pax, matrix.max_pax), day_slice]
+        single = matrix.single[product_ids, day_slice]
+        total = per_person * pax
+        if single_rooms:
+            # 싱글차지가 없는 상품은 싱글룸 요청 시 견적 불가로 처리
+            total = total + single * single_rooms
+        return per_person, total, total * matrix.fx[product_ids, None]
+
+    def quote(self, date, pax, nights=None, grade=None, destination=None, product=None, single_rooms=0):
+        """ 출발일 하루 견적 -> 상품별 [{product 정보..., per_person, total, total_krw, single_supplement}] (원화 합계 낮은 순) """
+        results = self.quote_range(date, date, pax, nights=nights, grade=grade, destination=destination,
+                                   product=product, single_rooms=single_rooms, top=None)
+        return results["dates"][0]["options"] if results["dates"] else []
+
+    def quote_range(self, start_date, end_date, pax, nights=None, grade=None, destination=None, product=None,
+                    single_rooms=0, top=3):
+        """
+        기간 내 출발일마다 견적 (대체 출발일 제안용)
+        - 반환: {"dates": [{date, best, options(top개, 원화 합계 낮은 순)}], "cheapest": 기간 최저가 출발일}
+        - top=None 이면 판매 중인 상품 전체
+        """
+        matrix = self.ensure_built()
+        pax = int(pax)
+        if pax < 1: raise ValueError("인원은 1명 이상이어야 합니다.")
+        first, last = self._to_day(matrix, start_date), self._to_day(matrix, end_date)
+        if last < first: raise ValueError("종료일이 시작일보다 빠릅니다.")
+        if last - first + 1 > QUOTE_MAX_RANGE_DAYS: raise ValueError(f"기간은 최대 {QUOTE_MAX_RANGE_DAYS}일입니다.")
+
+        product_ids = self._select(matrix, destination, grade, nights, product)
+        # 요금표 범위 밖 날짜는 판매 없음
+        lo, hi = max(first, 0), min(last, matrix.per_person.shape[2] - 1)
+        dates = [{"date": (EPOCH + datetime.timedelta(days=matrix.first_day + d)).isoformat(), "best": None, "options": []}
+                 for d in range(first, last + 1)]
+        if not len(product_ids) or hi < lo:
+            return {"dates": dates, "cheapest": None}
+
+        per_person, total, total_krw = self._totals(matrix, product_ids, pax, slice(lo, hi + 1), single_rooms)
+        single = matrix.single[product_ids, lo:hi + 1]
+        # 날짜별 원화 합계 오름차순 (판매 없음(NaN)은 뒤로)
+        order = np.argsort(np.where(np.isnan(total_krw), np.inf, total_krw), axis=0, kind='stable')
+        available = ~np.isnan(total_krw)
+
+        cheapest = None
+        for column in range(hi - lo + 1):
+            entry = dates[lo - first + column]
+            ranked = [k for k in order[:, column] if available[k, column]]
+            for k in (ranked if top is None else ranked[:top]):
+                option = dict(matrix.products[product_ids[k]], pax=pax, per_person=float(per_person[k, column]),
+                              total=float(total[k, column]), total_krw=round(float(total_krw[k, column])),
+                              single_supplement=None if np.isnan(single[k, column]) else float(single[k, column]))
+                entry["options"].append(option)
+            if entry["options"]:
+                entry["best"] = entry["options"][0]
+                if cheapest is None or entry["best"]["total_krw"] < cheapest["best"]["total_krw"]:
+                    cheapest = entry
+        return {"dates": dates, "cheapest": {"date": cheapest["date"], **cheapest["best"]} if cheapest else None}
+
+
+quotation_pricer = QuotationPricer()
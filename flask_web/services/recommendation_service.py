@@ -0,0 +1,230 @@
+import datetime
+import re
+import threading
+import numpy as np
+from services.price_table_service import EPOCH
+from services.quotation_service import quotation_pricer
+
+# 선호도 설문 항목 -> 점수 특성 (설문 TOP 3 값도 이 이름으로 받음)
+FEATURES = ["budget", "hotel_grade", "golf_location", "tee_time", "rounds", "difficulty"]
+# TOP 3 가중치 (1순위, 2순위, 3순위), 나머지 항목은 1
+TOP3_WEIGHTS = (3.0, 2.0, 1.5)
+# 예산을 넘으면 점수가 선형으로 줄어 예산 x (1 + BUDGET_TOLERANCE) 에서 0
+BUDGET_TOLERANCE = 0.5
+# 상품 정보에 없는 특성 점수 (좋지도 나쁘지도 않음)
+UNKNOWN_SCORE = 0.5
+
+DESTINATION_COUNTRY = {"오키나와": "일본", "미야코지마": "일본", "후쿠오카": "일본", "시즈오카": "일본", "가고시마": "일본",
+                       "미야자키": "일본", "치앙마이": "태국", "방콕": "태국", "파타야": "태국", "나트랑": "베트남",
+                       "다낭": "베트남", "호이안": "베트남", "세부": "필리핀", "보홀": "필리핀", "클락": "필리핀",
+                       "바기오": "필리핀", "제주": "한국"}
+LOCATIONS = {"시내": 0, "골프텔": 1, "리조트": 2}
+LOCATION_KEYWORDS = [("골프텔", "골프텔"), ("카누차", "리조트"), ("리조트", "리조트"), ("브리즈베이", "리조트"), ("시내", "시내")]
+TEE_TIMES = {"오전": 0, "오후": 1}
+TEE_TIME_KEYWORDS = [("조조", "오전"), ("석석", "오후")]
+# 라운딩 강도: 하루 홀 수 (무제한 = 54로 취급)
+ROUNDS = {"18홀": 18, "27홀": 27, "36홀": 36, "무제한": 54}
+HOLES_PATTERN = re.compile(r'(18|27|36|54)\s*H', re.IGNORECASE)
+DIFFICULTY = {"하": 0, "중": 1, "상": 2}
+
+
+class RecommendationCatalog:
+    """
+    추천 카탈로그 한 벌 (행 배열 + 상품 특성 벡터 + 상품별 행 범위 + 역색인) - 만든 뒤에는 바꾸지 않음
+    - 재구성은 새 카탈로그를 다 만든 뒤 한 번에 교체 -> 추천 중인 요청은 끝까지 같은 카탈로그(짝이 맞는 색인/행 범위)를 봄
+    """
+
+    def __init__(self, products, product_ids, days, prices):
+        order = np.lexsort((days, product_ids))
+        self.products = products
+        self.row_product = np.asarray(product_ids, dtype=np.int32)[order]
+        self.row_day = np.asarray(days, dtype=np.int32)[order]
+        self.prices = np.asarray(prices, dtype=np.float32)[order]
+
+        # 상품 특성 벡터 (없는 값은 NaN) -> 행 특성은 row_product로 인덱싱
+        def column(values):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+        self.product_vectors = {
+            "hotel_grade": column([p.get("grade") or None for p in products]),
+            "golf_location": column([LOCATIONS.get(p.get("golf_location")) for p in products]),
+            "tee_time": column([TEE_TIMES.get(p.get("tee_time")) for p in products]),
+            "rounds": column([p.get("holes") for p in products]),
+            "difficulty": column([DIFFICULTY.get(p.get("difficulty")) for p in products]),
+        }
+
+        # 행은 상품별로 연속 -> 상품마다 [row_start, row_end) 범위
+        counts = np.bincount(self.row_product, minlength=len(products))
+        self.row_end = np.cumsum(counts)
+        self.row_start = self.row_end - counts
+
+        # 역색인: 키 -> 정렬된 상품 번호 배열 (후보 행은 상품 범위를 이어 붙여 만듦)
+        index = {"country": {}, "destination": {}, "nights": {}}
+        for product_id, product in enumerate(products):
+            if not counts[product_id]: continue
+            for field in index:
+                key = product.get(field)
+                if key: index[field].setdefault(key, []).append(product_id)
+        self.index = {field: {key: np.array(ids, dtype=np.int64) for key, ids in postings.items()}
+                      for field, postings in index.items()}
+
+
+class ProductRecommender:
+    """
+    [상품 추천] 선호도 설문 -> 등록 상품(상품 x 출발일) 중 잘 맞는 상위 k개
+    - 카탈로그 행: 요금표 상품 x 판매 출발일, 인원별 1인 요금(원화)은 행렬로 미리 계산 (quotation_pricer)
+    - 역색인: 국가/목적지, 박수 -> 상품 번호 목록, 교집합으로 후보 상품을 먼저 줄인 뒤 그 상품들의 출발일 행만 점수 계산
+    - 점수: 특성별 0~1 점수 행렬 @ 가중치 (TOP 3 항목은 TOP3_WEIGHTS), 상위 k는 argpartition
+    - 상품 특성은 상품명/시트/파일명에서 추출 (조조/석석 -> 티업 시간, 36H -> 홀 수, 시내/골프텔/리조트 -> 위치)
+    - 카탈로그는 RecommendationCatalog 하나로 교체, recommend()는 시작할 때 잡은 카탈로그만 사용
+    """
+
+    def __init__(self, pricer=quotation_pricer):
+        self.pricer = pricer
+        self.catalog = None
+        self._source = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 카탈로그 / 특성 / 역색인
+    # ---------------------------------------------------------
+
+    def ensure_built(self):
+        if self.pricer is None: return self.catalog
+        matrix = self.pricer.ensure_built()
+        if self._source is matrix: return self.catalog
+        with self._lock:
+            if self._source is not matrix:
+                self._build_from_pricer(matrix)
+            return self.catalog
+
+    def _build_from_pricer(self, matrix):
+        """ 견적 행렬 한 벌(PriceMatrix)에서만 읽어서 카탈로그 구성 (상품 목록/행렬/환산율이 항상 같은 요금표 기준) """
+        # (상품, 날짜) 중 어느 인원이든 판매 요금이 있는 칸이 카탈로그 행
+        per_person_krw = matrix.per_person * matrix.fx[:, None, None]
+        product_ids, days = np.nonzero(~np.all(np.isnan(matrix.per_person), axis=1))
+        self.build([self.product_features(p) for p in matrix.products], product_ids,
+                   days + matrix.first_day, per_person_krw[product_ids, :, days])
+        self._source = matrix
+
+    def product_features(self, product):
+        """ 요금표 상품 -> 점수용 특성 (모르는 값은 None) """
+        # 상품명 -> 시트명 -> 파일명 순으로 찾음 (파일 하나에 여러 호텔이 있는 경우 상품명이 우선)
+        texts = [product.get('product', ''), product.get('sheet', ''), product.get('source', '')]
+        text = " ".join(texts)
+        location = next((value for t in texts for keyword, value in LOCATION_KEYWORDS if keyword in t), None)
+        tee_time = next((value for t in texts for keyword, value in TEE_TIME_KEYWORDS if keyword in t), None)
+        holes = HOLES_PATTERN.search(text)
+        return dict(product, country=DESTINATION_COUNTRY.get(product.get("destination"), ""),
+                    golf_location=location, tee_time=tee_time,
+                    holes=int(holes.group(1)) if holes else ("무제한" in text and 54) or None,
+                    difficulty=product.get("difficulty"))
+
+    def build(self, products, product_ids, days, prices):
+        """
+        products: 상품 특성 목록, 행마다 product_ids[i] 상품의 days[i] 출발 (1970-01-01 기준 일수)
+        prices: (행 수, 인원+1) 인원별 1인 요금(원화), 판매 없음은 NaN
+        """
+        self.catalog = RecommendationCatalog(products, product_ids, days, prices)
+        return self.catalog
+
+    # ---------------------------------------------------------
+    # 추천
+    # ---------------------------------------------------------
+
+    def _candidates(self, catalog, profile):
+        empty = np.zeros(0, dtype=np.int64)
+        product_ids = None
+        country = profile.get("country")
+        if country:
+            product_ids = catalog.index["country"].get(country)
+            if product_ids is None: product_ids = catalog.index["destination"].get(country, empty)
+        if profile.get("nights"):
+            postings = catalog.index["nights"].get(int(profile["nights"]), empty)
+            product_ids = postings if product_ids is None else np.intersect1d(product_ids, postings, assume_unique=True)
+
+        if product_ids is None:
+            rows = np.arange(len(catalog.row_day))
+        else:
+            # 상품별 행 범위 [start, end) 를 이어 붙임
+            starts, counts = catalog.row_start[product_ids], catalog.row_end[product_ids] - catalog.row_start[product_ids]
+            rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        # 출발 가능 기간
+        if profile.get("start_date") or profile.get("end_date"):
+            days = catalog.row_day[rows]
+            mask = np.ones(len(rows), dtype=bool)
+            if profile.get("start_date"): mask &= days >= _to_day(profile["start_date"])
+            if profile.get("end_date"): mask &= days <= _to_day(profile["end_date"])
+            rows = rows[mask]
+        return rows
+
+    def weights(self, top3):
+        weights = np.ones(len(FEATURES), dtype=np.float32)
+        for weight, feature in zip(TOP3_WEIGHTS, top3 or []):
+            if feature in FEATURES: weights[FEATURES.index(feature)] = weight
+        return weights
+
+    def score(self, catalog, profile, rows, price):
+        """ 후보 행 x 특성 점수 행렬 (0~1), 설문에서 '무관'/미입력 항목은 전부 1 """
+        scores = np.ones((len(rows), len(FEATURES)), dtype=np.float32)
+        products = catalog.row_product[rows]
+
+        budget = profile.get("budget")
+        if budget:
+            over = (price - float(budget)) / (float(budget) * BUDGET_TOLERANCE)
+            scores[:, 0] = np.clip(1 - over, 0, 1)
+
+        def match(column, target, scale=None):
+            values = catalog.product_vectors[column][products]
+            if scale is None: result = (values == target).astype(np.float32)
+            else: result = np.clip(1 - np.abs(values - target) / scale, 0, 1)
+            return np.where(np.isnan(values), UNKNOWN_SCORE, result)
+
+        if profile.get("hotel_grade"): scores[:, 1] = match("hotel_grade", int(profile["hotel_grade"]), 2.0)
+        if profile.get("golf_location") in LOCATIONS: scores[:, 2] = match("golf_location", LOCATIONS[profile["golf_location"]])
+        if profile.get("tee_time") in TEE_TIMES: scores[:, 3] = match("tee_time", TEE_TIMES[profile["tee_time"]])
+        if profile.get("rounds") in ROUNDS: scores[:, 4] = match("rounds", ROUNDS[profile["rounds"]], 36.0)
+        if profile.get("difficulty") in DIFFICULTY: scores[:, 5] = match("difficulty", DIFFICULTY[profile["difficulty"]], 2.0)
+        return scores
+
+    def recommend(self, profile, k=10):
+        """
+        profile: {"country", "nights", "pax", "budget"(1인 원화), "hotel_grade", "golf_location"(시내/골프텔/리조트),
+                  "tee_time"(오전/오후/무관), "rounds"(18홀/27홀/36홀/무제한), "difficulty"(상/중/하),
+                  "top3": ["budget", "tee_time", ...], "start_date", "end_date"}
+        -> [{product 정보..., date, per_person_krw, score, feature_scores}, ...] (점수 높은 순, 같으면 싼 순)
+        """
+        catalog = self.ensure_built()
+        if catalog is None: return []
+        rows = self._candidates(catalog, profile)
+        pax = min(int(profile.get("pax") or 2), catalog.prices.shape[1] - 1)
+        price = catalog.prices[rows, pax]
+        # 해당 인원으로 판매하지 않는 출발일 제외
+        rows, price = rows[~np.isnan(price)], price[~np.isnan(price)]
+        if not len(rows): return []
+
+        scores = self.score(catalog, profile, rows, price)
+        weights = self.weights(profile.get("top3"))
+        total = scores @ weights / weights.sum()
+
+        # k번째 점수 이상만 남긴 뒤 점수 내림차순, 동점이면 가격 오름차순
+        k = min(int(k), len(rows))
+        threshold = np.partition(total, len(total) - k)[len(total) - k]
+        top = np.flatnonzero(total >= threshold)
+        top = top[np.lexsort((price[top], -total[top]))][:k]
+
+        results = []
+        for i in top.tolist():
+            product = catalog.products[catalog.row_product[rows[i]]]
+            results.append(dict(product, date=(EPOCH + datetime.timedelta(days=int(catalog.row_day[rows[i]]))).isoformat(),
+                                per_person_krw=round(float(price[i])), score=round(float(total[i]), 4),
+                                feature_scores={f: round(float(s), 3) for f, s in zip(FEATURES, scores[i])}))
+        return results
+
+
+def _to_day(date):
+    if isinstance(date, str): date = datetime.date.fromisoformat(date[:10])
+    return (date - EPOCH).days
+
+
+product_recommender = ProductRecommender()
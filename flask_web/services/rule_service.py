@@ -0,0 +1,131 @@
+import re
+from bisect import bisect_right
+from services.price_table_service import DESTINATIONS
+
+# 규칙으로 확정할 수 있는 필드 (형식이 정해진 값) -> 모델 없이 정규식/사전으로 태깅
+AIRLINES = ["대한항공", "아시아나항공", "아시아나", "제주항공", "진에어", "티웨이항공", "티웨이", "에어부산", "에어서울",
+            "이스타항공", "이스타", "에어프레미아", "비엣젯", "베트남항공", "필리핀항공", "세부퍼시픽", "타이항공",
+            "에어아시아", "피치항공", "일본항공", "전일본공수", "Korean Air", "Asiana", "Jeju Air", "Jin Air",
+            "T'way", "Air Busan", "VietJet", "Vietnam Airlines", "Philippine Airlines", "Cebu Pacific",
+            "Thai Airways", "AirAsia", "JAL", "ANA"]
+# 항공편명 앞 IATA 항공사 코드 (한국 출발 노선 운항사) - 목록에 없는 두 글자(CC, GC, AM, PM, US 등)는 편명으로 보지 않음
+AIRLINE_CODES = ["KE", "OZ", "7C", "LJ", "TW", "BX", "RS", "ZE", "RF", "YP", "4V", "VJ", "VN", "QH", "VU", "PR", "5J",
+                 "Z2", "TG", "FD", "XJ", "WE", "MM", "JL", "NH", "GK", "BC", "7G", "CX", "UO", "HX", "NX", "CI", "BR",
+                 "IT", "JX", "SQ", "TR", "MH", "AK", "D7", "OD", "GA", "QZ", "CZ", "MU", "CA", "HO", "SC", "FM", "MF",
+                 "3U", "OM", "UL", "KC", "HY", "EK", "QR", "EY", "TK", "UA", "DL", "AA", "AC", "AF", "KL", "LH", "QF"]
+CITIES = DESTINATIONS + ["하노이", "호치민", "푸꾸옥", "달랏", "마닐라", "치앙라이", "푸켓", "코타키나발루", "발리",
+                         "오사카", "도쿄", "삿포로", "괌", "사이판", "하이난", "칭다오", "상하이", "타이베이"]
+
+WEEKDAY = r'(?:\s?\(?[월화수목금토일](?:요일)?\)?)?'
+RULE_PATTERNS = [
+    # KE463, OZ 741, 7C2201 (항공사 코드가 AIRLINE_CODES에 있을 때만, 앞뒤가 영숫자면 제외: 3N4D, ABC1234 등)
+    # 골프장/시각 표기는 제외: 라헨느CC 12:42, 카누챠CC18홀, KE 18홀 (뒤에 ':'/'홀'이 붙으면 편명 아님)
+    ("FLIGHT_NUM", re.compile(r'(?<![A-Za-z0-9])(?:' + "|".join(AIRLINE_CODES) + r') ?[0-9]{2,4}(?![A-Za-z0-9:]| ?홀)')),
+    # 09:00, 9:30 (항공 문맥 줄만 - CONTEXT_TAGS)
+    ("DEPART_TIME", re.compile(r'(?<![0-9:])(?:[01]?[0-9]|2[0-3]):[0-5][0-9](?![0-9:])')),
+    # 2025.11.7 / 2025-11-07 / 2025년 11월 7일 / 11월 7일(금) / 10/16(수) (항공 문맥 줄만 - CONTEXT_TAGS)
+    ("DATE", re.compile(r'(?<![0-9.])(?:20[0-9]{2}\s?[.\-/년]\s?[0-9]{1,2}\s?[.\-/월]\s?[0-9]{1,2}일?' + WEEKDAY +
+                        r'|[0-9]{1,2}월\s?[0-9]{1,2}일' + WEEKDAY +
+                        r'|[0-9]{1,2}/[0-9]{1,2}(?:\s?\([월화수목금토일]\))?)(?![0-9])')),
+    # 1,590,000원 / ₩1,590,000 / $350 / USD 350 / 17,000엔 / ¥17,000 / 159만원 / 350달러
+    ("PRICE", re.compile(r'(?:[₩$¥€]|USD|KRW|JPY)\s?[0-9][0-9,]*(?:\.[0-9]+)?'
+                         r'|(?<![0-9,.])[0-9][0-9,]*(?:\.[0-9]+)?\s?(?:만\s?원|천\s?원|원|엔|円|달러|불|바트|페소|USD|KRW|JPY)(?![가-힣A-Za-z])')),
+    # 5성급, 4.5성, 5성, 5성급호텔, 5성 리조트 (2성인 같은 인원수는 제외)
+    ("HOTEL_GRADE", re.compile(r'(?<![0-9])[1-5](?:\.5)?\s?성(?:급|(?![가-힣])|(?=호텔|리조트|레지던스|숙소))')),
+]
+
+
+def _keyword_pattern(words):
+    # 긴 이름부터 (아시아나항공 > 아시아나)
+    return re.compile("|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True)))
+
+
+KEYWORD_PATTERNS = [("FLIGHT_NAME", _keyword_pattern(AIRLINES)), ("CITY", _keyword_pattern(CITIES))]
+
+# 시간/날짜는 체크인, 티오프, 마감일에도 나오므로 항공 문맥이 있는 줄에서만 규칙으로 확정 (출발 시간/출발일로 매핑됨)
+# 다른 줄의 시간/날짜는 모델이 판단
+CONTEXT_TAGS = {"DEPART_TIME", "DATE"}
+FLIGHT_CONTEXT_PATTERN = re.compile(
+    '(?-i:' + RULE_PATTERNS[0][1].pattern + ')|' + KEYWORD_PATTERNS[0][1].pattern +
+    r'|출발|도착|출국|귀국|입국|항공|공항|편명|탑승|depart|arriv|flight', re.IGNORECASE)
+# 규칙/사전 스팬을 빼고 남은 글자가 이런 말뿐인 줄은 모델이 찾을 것이 없음 (그 외 글자가 남으면 모델로)
+RULE_FILLER_PATTERN = re.compile(
+    r'출발|도착|출국|귀국|입국|편명|항공편|항공|공항|탑승|시간|시각|날짜|일자|요금|가격|금액|인당|1인|왕복|편도|합계|총|기준|예정|'
+    r'[월화수목금토일]요일|dep(?:arture)?|arr(?:ival)?|flight|[^\w]|_', re.IGNORECASE)
+
+
+class RuleExtractor:
+    """
+    [규칙 추출] 형식이 정해진 필드는 정규식/사전으로 바로 태깅, 모델은 필요한 줄에만
+    - 정규식: 항공편명(KE463), 시간(09:00), 날짜(10/16(수), 2025.11.7), 금액+통화, 호텔 등급(5성급)
+      시간/날짜는 항공 문맥(FLIGHT_CONTEXT_PATTERN)이 있는 줄에서만
+    - 사전: 항공사, 도시 (이름 목록을 긴 것부터 하나의 정규식으로 묶어 한 번에 검색)
+    - model_segments(): 규칙/사전 스팬으로 다 설명되지 않는 줄을 붙어 있는 줄끼리 한 구간으로 -> 이 구간만 NER 모델
+      (편명/시간/금액뿐인 줄만 건너뜀, 단서 없는 호텔/골프장 이름 한 줄도 모델로 감)
+    """
+
+    def extract(self, text):
+        """ 규칙 스팬 [{tag, text, start, end, score=1.0, source="rule"}] (겹치면 먼저/길게 잡힌 것 우선) """
+        spans, context = [], {}
+        for tag, pattern in RULE_PATTERNS + KEYWORD_PATTERNS:
+            for match in pattern.finditer(text):
+                if tag in CONTEXT_TAGS and not self._flight_context(text, match.start(), context): continue
+                spans.append({"tag": tag, "text": match.group(0).strip(), "start": match.start(), "end": match.end(),
+                              "score": 1.0, "source": "rule"})
+        return self.resolve_overlaps(spans)
+
+    def _flight_context(self, text, pos, cache):
+        """ pos가 있는 줄에 항공 문맥이 있는지 (줄 시작 위치별 캐시) """
+        line_start = text.rfind('\n', 0, pos) + 1
+        found = cache.get(line_start)
+        if found is None:
+            line_end = text.find('\n', pos)
+            found = cache[line_start] = bool(FLIGHT_CONTEXT_PATTERN.search(text, line_start, len(text) if line_end < 0 else line_end))
+        return found
+
+    def resolve_overlaps(self, spans):
+        """ 시작 위치순, 같은 위치면 긴 스팬 우선으로 겹치지 않게 고름 """
+        chosen, last_end = [], -1
+        for span in sorted(spans, key=lambda s: (s["start"], -(s["end"] - s["start"]))):
+            if span["start"] >= last_end:
+                chosen.append(span)
+                last_end = span["end"]
+        return chosen
+
+    def merge(self, fixed, model_spans):
+        """ 확정 스팬(규칙/사전, 겹치지 않고 위치순)은 그대로, 모델 스팬은 확정 스팬과 겹치지 않는 것만 추가 """
+        if not fixed: return model_spans
+        starts = [span["start"] for span in fixed]
+        merged = list(fixed)
+        for span in model_spans:
+            i = bisect_right(starts, span["start"])
+            if i and fixed[i - 1]["end"] > span["start"]: continue
+            if i < len(fixed) and fixed[i]["start"] < span["end"]: continue
+            merged.append(span)
+        return sorted(merged, key=lambda s: s["start"])
+
+    def model_segments(self, text, fixed=()):
+        """
+        모델이 필요한 (start, end) 구간 목록 - fixed(규칙/사전 스팬, 위치순)와 채움말을 빼고도 글자가 남는 줄
+        붙어 있는 줄은 하나로 합침 (문맥 유지)
+        """
+        segments = []
+        i = 0
+        for line in re.finditer(r'[^\n]+', text):
+            start, end = line.span()
+            while i < len(fixed) and fixed[i]["end"] <= start: i += 1
+            rest, pos, j = [], start, i
+            while j < len(fixed) and fixed[j]["start"] < end:
+                rest.append(text[pos:max(pos, fixed[j]["start"])])
+                pos = max(pos, fixed[j]["end"])
+                j += 1
+            rest.append(text[pos:end])
+            if not RULE_FILLER_PATTERN.sub("", "".join(rest)): continue
+            if segments and text[segments[-1][1]:start].strip() == "":
+                segments[-1] = (segments[-1][0], end)
+            else:
+                segments.append((start, end))
+        return segments
+
+
+rule_extractor = RuleExtractor()
@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from services.batching_service import MicroBatcher
+from services.chat_service import ChatIngestionService, AGENCY_USER
+
+# 실시간 고객 메시지 분류(트리아지) 설정
+# - TRIAGE_MAX_WAIT_MS: 메시지 하나가 배치를 기다리는 최대 시간 (메시지당 지연 상한)
+# - TRIAGE_BATCH_SIZE: 한 번에 분류하는 최대 메시지 수
+# - TRIAGE_MAX_LENGTH: 메시지 토큰 상한 (카톡 메시지는 대부분 짧음)
+# - TRIAGE_ALERT_THRESHOLD: '불가' 확률이 이 값 이상이면 알림
+# - TRIAGE_CHAT_DB: 대화 파일 감시용 워터마크 DB (요약/NER 수집용 CHAT_DB와 별도로 진행)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRIAGE_MAX_WAIT_MS = float(os.environ.get('TRIAGE_MAX_WAIT_MS', 50))
+TRIAGE_BATCH_SIZE = int(os.environ.get('TRIAGE_BATCH_SIZE', 64))
+TRIAGE_MAX_LENGTH = int(os.environ.get('TRIAGE_MAX_LENGTH', 64))
+TRIAGE_ALERT_LABEL = "불가"
+TRIAGE_ALERT_THRESHOLD = float(os.environ.get('TRIAGE_ALERT_THRESHOLD', 0.7))
+TRIAGE_POLL_SECONDS = float(os.environ.get('TRIAGE_POLL_SECONDS', 5))
+TRIAGE_CHAT_DB = os.environ.get('TRIAGE_CHAT_DB', os.path.join(BASE_DIR, '../data/triage_watermarks.db'))
+TRIAGE_RECENT_ALERTS = 200
+# "네", "감사합니다" 같은 반복 메시지는 분류 결과 재사용
+TRIAGE_MEMO_SIZE = 4096
+
+
+class SentimentTriage:
+    """
+    [메시지 트리아지] 고객 메시지를 한 건씩 받아 배치로 3중 분류하고, 불가(부정) 메시지는 바로 알림
+    - submit(message): 비동기 (Future), triage(messages): 여러 건을 넣고 결과까지 대기
+    - 들어온 메시지는 MicroBatcher가 최대 TRIAGE_MAX_WAIT_MS 동안 모아 한 번에 분류
+    - poll_chats()/watch(): 카톡 대화 폴더를 감시하며 새로 들어온 고객 메시지만 분류
+      워터마크는 분류에 성공한 메시지까지만 전진 (실패한 메시지부터 다음 확인 때 다시, at-least-once)
+    - 알림: 최근 목록(alerts) + on_alert(listener)로 등록한 콜백 호출 (별도 알림 스레드, 분류 배치를 막지 않음)
+    """
+
+    def __init__(self, chat_db=TRIAGE_CHAT_DB):
+        self.batcher = MicroBatcher(self._classify_batch, max_batch_size=TRIAGE_BATCH_SIZE,
+                                    max_wait_ms=TRIAGE_MAX_WAIT_MS, name="sentiment-triage")
+        self.chats = ChatIngestionService(db_path=chat_db)
+        self.alerts = deque(maxlen=TRIAGE_RECENT_ALERTS)
+        self.stats = {"messages": 0, "alerts": 0, "memo_hits": 0}
+
+        self._listeners = []
+        self._notifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment-triage-alert")
+        self._memo = OrderedDict()
+        self._latencies = deque(maxlen=2000)
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def on_alert(self, listener):
+        """ listener(alert dict) - 알림 스레드 하나에서 순서대로 호출 (오래 걸리면 다음 알림만 늦어짐) """
+        self._listeners.append(listener)
+
+    # ---------------------------------------------------------
+    # 메시지 입력
+    # ---------------------------------------------------------
+
+    def submit(self, message):
+        """ message: 문자열 또는 {"message": ..., "chat", "user", "date"} -> Future(분류 결과가 붙은 메시지) """
+        if isinstance(message, str): message = {"message": message}
+        started = time.monotonic()
+        done = Future()
+
+        def finish(future):
+            # 결과/알림 처리가 끝난 뒤에 done을 완료 (기다리는 쪽이 항상 sentiment가 붙은 메시지를 받도록)
+            try:
+                self._finish(message, started, future)
+            finally:
+                done.set_result(message)
+
+        self.batcher.submit_async(message["message"]).add_done_callback(finish)
+        return done
+
+    def triage(self, messages, timeout=None):
+        """ 여러 메시지를 넣고 모두 분류될 때까지 대기 -> (분류된 메시지 목록, 이번에 생긴 알림 목록) """
+        futures = [self.submit({"message": m} if isinstance(m, str) else dict(m)) for m in messages]
+        items = [future.result(timeout=timeout) for future in futures]
+        return items, [item for item in items if item.get("alert")]
+
+    def _finish(self, message, started, future):
+        if future.exception() is not None:
+            message["sentiment"] = {"status": "error", "message": str(future.exception())}
+            return
+        sentiment = future.result()
+        message["sentiment"] = sentiment
+        latency = time.monotonic() - started
+
+        with self._lock:
+            self.stats["messages"] += 1
+            self._latencies.append(latency)
+
+        probability = sentiment.get("scores", {}).get(TRIAGE_ALERT_LABEL, 0.0)
+        if sentiment.get("status") == "success" and probability >= TRIAGE_ALERT_THRESHOLD:
+            message["alert"] = True
+            alert = {"chat": message.get("chat"), "user": message.get("user"), "date": message.get("date"),
+                     "message": message["message"], "label": TRIAGE_ALERT_LABEL, "score": probability}
+            with self._lock:
+                self.stats["alerts"] += 1
+                self.alerts.append(alert)
+            print(f"  ⚠️ [불가 메시지] {alert['chat'] or ''} {alert['user'] or ''}: {alert['message'][:40].replace(chr(10), ' ')} ({probability:.2f})")
+            if self._listeners: self._notifier.submit(self._notify, alert)
+
+    def _notify(self, alert):
+        for listener in self._listeners:
+            try:
+                listener(alert)
+            except Exception as e:
+                print(f"❌ 알림 처리 실패: {e}")
+
+    def _classify_batch(self, texts):
+        from services.ai_service import ai_service
+
+        results = [None] * len(texts)
+        misses = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._memo.get(text)
+                if cached is not None:
+                    self._memo.move_to_end(text)
+                    results[i] = cached
+                    self.stats["memo_hits"] += 1
+                else:
+                    misses.setdefault(text, []).append(i)
+
+        if misses:
+            unique = list(misses)
+            scored = ai_service.analyze_sentiment_batch(unique, batch_size=len(unique), max_length=TRIAGE_MAX_LENGTH)
+            with self._lock:
+                for text, result in zip(unique, scored):
+                    for i in misses[text]:
+                        results[i] = result
+                    if result.get("status") == "success":
+                        self._memo[text] = result
+                while len(self._memo) > TRIAGE_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return results
+
+    # ---------------------------------------------------------
+    # 카톡 대화 폴더 감시
+    # ---------------------------------------------------------
+
+    def poll_chats(self):
+        """
+        지난 확인 이후 새로 들어온 고객 메시지를 분류 -> 이번에 생긴 알림 목록
+        - 대화방마다 처음으로 분류에 실패한 메시지 앞까지만 워터마크 저장 (그 뒤 메시지는 다음 확인 때 다시 분류, 알림도 다시 날 수 있음)
+        """
+        messages, chats = [], []
+        for file_path in self.chats.chat_files():
+            try:
+                new_messages, watermark, _ = self.chats.read_new_messages(file_path)
+            except OSError as e:
+                print(f"❌ 대화 파일 읽기 실패 ({os.path.basename(file_path)}): {e}")
+                continue
+            chat = self.chats.chat_id(file_path)
+            positions = [i for i, m in enumerate(new_messages) if m["user"] != AGENCY_USER]
+            messages.extend(dict(new_messages[i], chat=chat) for i in positions)
+            chats.append((chat, new_messages, watermark, positions))
+
+        items, alerts = self.triage(messages)
+        start = 0
+        for chat, new_messages, watermark, positions in chats:
+            chat_items = items[start:start + len(positions)]
+            start += len(positions)
+            failed = next((i for i, item in zip(positions, chat_items) if item["sentiment"].get("status") != "success"), None)
+            if failed is not None:
+                print(f"⚠️ 분류 실패 메시지부터 다음 확인 때 다시 처리 ({chat}, {len(new_messages) - failed}건)")
+                watermark = self.chats.partial_watermark(new_messages, watermark, failed)
+            if watermark is not None: self.chats.save_watermark(chat, watermark)
+        return alerts
+
+    def watch(self, poll_seconds=TRIAGE_POLL_SECONDS):
+        """ 백그라운드에서 poll_seconds 마다 poll_chats() (이미 돌고 있으면 무시) """
+        with self._lock:
+            if self._watcher is not None: return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch_loop, args=(poll_seconds,),
+                                             name="sentiment-triage-watch", daemon=True)
+            self._watcher.start()
+        print(f"  ✅ 카톡 메시지 트리아지 감시 시작 ({poll_seconds}s 간격)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch_loop(self, poll_seconds):
+        while not self._stop.is_set():
+            try:
+                self.poll_chats()
+            except Exception as e:
+                print(f"❌ 트리아지 감시 에러: {e}")
+            self._stop.wait(poll_seconds)
+        self._watcher = None
+
+    def get_stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            stats = dict(self.stats)
+        stats["batches"] = self.batcher.stats["batches"]
+        if len(latencies):
+            stats["latency_ms"] = {"p50": round(float(np.percentile(latencies, 50)), 1),
+                                   "p95": round(float(np.percentile(latencies, 95)), 1),
+                                   "max": round(float(latencies.max()), 1)}
+        return stats
+
+
+sentiment_triage = SentimentTriage()
@@ -0,0 +1,61 @@
+import datetime
+import json
+import os
+import sys
+import time
+from services.ai_service import ai_service
+from services.chat_service import chat_ingestion
+
+# ======================================================
+# [야간 배치] 하루치 고객 카톡 대화를 한 번에 요약
+# 입력: 카톡 내보내기 CSV (DATE,USER,MESSAGE) - 대화방 하나당 파일 하나 (CHAT_DIR)
+# 출력: SUMMARY_OUT_DIR/<날짜>.json  [{chat, messages, summary}, ...]
+# 실행: python summarize_chats.py [YYYY-MM-DD]   (날짜 생략 시 어제)
+# ======================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_OUT_DIR = os.environ.get('SUMMARY_OUT_DIR', os.path.join(BASE_DIR, '../data/summaries'))
+
+
+def load_day(day):
+    """ 대화방별로 해당 날짜 메시지를 'USER: MESSAGE' 줄로 이어 붙인 텍스트 """
+    conversations = []
+    for path in chat_ingestion.chat_files():
+        try:
+            messages = [m for m in chat_ingestion.read_messages(path) if m["date"].startswith(day)]
+        except OSError as e:
+            print(f"❌ 대화 파일 읽기 실패 ({os.path.basename(path)}): {e}")
+            continue
+        if not messages: continue
+
+        chat = chat_ingestion.chat_id(path).split('_', 1)[-1]
+        lines = [f"{m['user']}: {m['message']}" for m in messages]
+        conversations.append({"chat": chat, "messages": len(lines), "text": "\n".join(lines)})
+    return conversations
+
+
+def main(day):
+    conversations = load_day(day)
+    print(f"🚀 {day} 대화 {len(conversations)}개 요약 시작")
+    if not conversations: return
+
+    start = time.perf_counter()
+    results = ai_service.summarize_batch([c["text"] for c in conversations])
+    elapsed = time.perf_counter() - start
+
+    output = []
+    for conversation, result in zip(conversations, results):
+        if result["status"] != "success":
+            print(f"  ⚠️ {conversation['chat']}: {result.get('message')}")
+        output.append({"chat": conversation["chat"], "messages": conversation["messages"],
+                       "summary": result.get("summary", "")})
+
+    if not os.path.exists(SUMMARY_OUT_DIR): os.makedirs(SUMMARY_OUT_DIR)
+    out_path = os.path.join(SUMMARY_OUT_DIR, f"{day}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"✅ 요약 완료 ({elapsed:.1f}s): {out_path}")
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    main(target)
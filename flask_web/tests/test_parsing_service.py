@@ -0,0 +1,56 @@
+import datetime
+import glob
+import os
+import openpyxl
+import pandas as pd
+import pytest
+from services.parsing_service import parsing_manager
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'ERP 필요한 데이터')
+SAMPLE_FILES = sorted(glob.glob(os.path.join(SAMPLE_DIR, '**', '*.xlsx'), recursive=True))
+
+
+def _frame_lines(path, vectorize):
+    sheets = pd.read_excel(path, header=None, sheet_name=None, engine='openpyxl')
+    return [line for df in sheets.values() for line in parsing_manager._frame_to_lines(df, vectorize)]
+
+
+def _stream_lines(path):
+    return [line for _, _, line in parsing_manager._iter_excel_rows(path)]
+
+
+@pytest.fixture
+def mixed_workbook(tmp_path):
+    """ 요금표에 나오는 셀 종류를 섞은 통합문서 (날짜/시각, 빈 칸 있는 숫자 열, 정수/실수, 앞뒤 공백 문자열) """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["  상품명 ", "출발일", "티오프", "요금", "비고"])
+    ws.append(["오키나와 3박", datetime.datetime(2025, 11, 7), datetime.time(7, 30), 1590000, None])
+    ws.append(["  ", datetime.datetime(2025, 11, 8, 9, 15), None, None, "조조"])
+    ws.append(["미야코지마", datetime.datetime(2025, 11, 9, 9, 15, 30), datetime.time(12, 42, 5), 1234.5, 3])
+    ws.append([None, None, None, None, None])
+    ws.append(["세부", None, None, 2 ** 70 * 1.0, "  석석 "])
+    wb.create_sheet("두번째").append([1, 2.0, "  ", True])
+    path = tmp_path / "mixed.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("vectorize", [False, True])
+def test_frame_and_stream_lines_match(mixed_workbook, vectorize):
+    assert _frame_lines(mixed_workbook, vectorize) == _stream_lines(mixed_workbook)
+
+
+def test_cell_formatting(mixed_workbook):
+    lines = _stream_lines(mixed_workbook)
+    assert lines[1] == "오키나와 3박 | 2025-11-07 | 07:30 | 1590000"
+    assert lines[2] == "2025-11-08 09:15 | 조조"
+    assert lines[3] == "미야코지마 | 2025-11-09 09:15:30 | 12:42:05 | 1234.5 | 3"
+
+
+@pytest.mark.skipif(not SAMPLE_FILES, reason="샘플 엑셀 없음")
+@pytest.mark.parametrize("path", SAMPLE_FILES, ids=os.path.basename)
+def test_sample_workbooks_match(path):
+    stream = _stream_lines(path)
+    assert _frame_lines(path, False) == stream
+    assert _frame_lines(path, True) == stream
@@ -0,0 +1,45 @@
+import pytest
+from services.rule_service import rule_extractor
+
+# 샘플 문서(ERP 필요한 데이터)에 실제로 있는 골프/시각 줄 - 편명이나 항공 문맥으로 잡히면 안 됨
+GOLF_LINES = [
+    "기타히로시마CC 18홀 셀프플레이",
+    "10월26일(토) 라헨느CC 12:42 (조인)",
+    "05월15일(목) 블랙스톤CC 07:53 (4인플레이)",
+    "오션캐슬,팜힐즈,츄라오챠드CC18홀(카트+셀프플레이)",
+    "■ 동방목가 CC 27홀 라운딩",
+    "베버리CC 27홀 09:00 티오프",
+    "PM 12:30 티오프",
+    "GS 25 편의점 앞 미팅",
+    "골프 US50  18H",
+]
+
+FLIGHT_LINES = [
+    ("인천 LJ357 08:00 인천 출발", "LJ357", "08:00"),
+    ("1일차 | 인 천 | LJ 009 | 16:05", "LJ 009", "16:05"),
+    ("TW285 09:50 사가 국제공항 출발", "TW285", "09:50"),
+    ("KE835 08:15-12:20", "KE835", "08:15"),
+    ("1일차 7C1603  제주항공  09:00", "7C1603", "09:00"),
+]
+
+
+def _tags(line):
+    return [(span["tag"], span["text"]) for span in rule_extractor.extract(line)]
+
+
+@pytest.mark.parametrize("line", GOLF_LINES)
+def test_golf_lines_have_no_flight_spans(line):
+    tags = _tags(line)
+    assert not [tag for tag, _ in tags if tag in ("FLIGHT_NUM", "DEPART_TIME")], tags
+
+
+@pytest.mark.parametrize("line,flight,time", FLIGHT_LINES)
+def test_flight_lines(line, flight, time):
+    tags = _tags(line)
+    assert ("FLIGHT_NUM", flight) in tags
+    assert ("DEPART_TIME", time) in tags
+
+
+def test_flight_number_does_not_span_lines():
+    tags = _tags("110,000원 / 1인 KE\n2025-11-05 | 20년식 K5\n2024년 7월 30일")
+    assert not [tag for tag, _ in tags if tag == "FLIGHT_NUM"], tags
@@ -0,0 +1,124 @@
+import csv
+import os
+import random
+from functools import partial
+import torch
+from torch.optim import AdamW
+from torch.utils.data import DataLoader, Dataset
+from transformers import AutoTokenizer, ElectraConfig
+from ner_dataset import load_or_build, LengthBucketSampler, collate_dynamic
+from services.multitask_model import ElectraForMultiTask
+from train_ner import LABEL_LIST
+
+# ======================================================
+# [M1+M2 멀티태스크 학습] 인코더 하나로 NER(train_data.json) + 3중 분류(3중분류.csv)를 함께 파인튜닝
+# - 배치는 과제별로 따로 만들고(NER 배치 / 분류 배치), 에폭마다 두 과제의 배치를 섞어서 번갈아 학습
+# - 저장: models/koelectra_multitask (AIService가 있으면 분류+태깅을 인코더 한 번으로 처리)
+# ======================================================
+EPOCHS = 5
+LEARNING_RATE = 5e-5
+BATCH_SIZE = 8
+MAX_LEN = 128
+SEED = 0
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, '../models')
+NER_DATA_FILE = os.path.join(BASE_DIR, 'train_data.json')
+SENTIMENT_DATA_FILE = os.environ.get('SENTIMENT_DATA_FILE', os.path.join(
+    BASE_DIR, '../ERP 필요한 데이터/6. 랜드사한테 고객 요청 답변 내용_집에서추가/3중분류.csv'))
+BASE_MODEL = os.environ.get('MULTITASK_BASE_MODEL', 'monologg/koelectra-base-v3-discriminator')
+# 분류 손실 가중치 (분류 데이터가 NER보다 훨씬 적어서 한쪽으로 쏠리면 조절)
+SENTIMENT_LOSS_WEIGHT = float(os.environ.get('SENTIMENT_LOSS_WEIGHT', 1.0))
+
+# [M2] 3중분류.csv의 label 번호 순서
+SENTIMENT_LABELS = ["불가", "확정", "보류"]
+
+
+class SentimentDataset(Dataset):
+    """ 3중분류.csv (id, text, label, label_name) -> (토큰 ids, 라벨 번호), 토크나이즈는 한 번만 """
+
+    def __init__(self, data_file, tokenizer, max_len):
+        with open(data_file, 'r', encoding='utf-8-sig') as f:
+            rows = [row for row in csv.DictReader(f) if row.get('text') and row.get('label') not in (None, '')]
+        self.input_ids = tokenizer([row['text'] for row in rows], truncation=True, max_length=max_len)["input_ids"]
+        self.labels = [int(row['label']) for row in rows]
+        self.lengths = [len(ids) for ids in self.input_ids]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, index):
+        return self.input_ids[index], self.labels[index]
+
+
+def collate_sentiment(batch, pad_token_id=0):
+    max_len = max(len(ids) for ids, _ in batch)
+    input_ids = torch.full((len(batch), max_len), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(batch), max_len), dtype=torch.long)
+    for row, (ids, _) in enumerate(batch):
+        input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+        attention_mask[row, :len(ids)] = 1
+    labels = torch.tensor([label for _, label in batch], dtype=torch.long)
+    return {"input_ids": input_ids, "attention_mask": attention_mask, "sentiment_labels": labels}
+
+
+def train():
+    print("🚀 멀티태스크(NER + 3중 분류) 학습 준비 중...")
+    save_path = os.path.join(MODEL_DIR, 'koelectra_multitask')
+    if not os.path.exists(save_path): os.makedirs(save_path)
+
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
+    # 두 헤드의 라벨 정보는 config에 저장 (추론 때 분류 라벨 이름도 여기서 읽음)
+    config = ElectraConfig.from_pretrained(
+        BASE_MODEL,
+        num_labels=len(LABEL_LIST),
+        id2label=dict(enumerate(LABEL_LIST)),
+        label2id={label: i for i, label in enumerate(LABEL_LIST)},
+        num_sentiment_labels=len(SENTIMENT_LABELS),
+        sentiment_labels=SENTIMENT_LABELS,
+        sentiment_loss_weight=SENTIMENT_LOSS_WEIGHT,
+    )
+    config.architectures = [ElectraForMultiTask.__name__]
+    model = ElectraForMultiTask.from_pretrained(BASE_MODEL, config=config)
+
+    ner_dataset = load_or_build(NER_DATA_FILE, tokenizer, MAX_LEN, LABEL_LIST)
+    sentiment_dataset = SentimentDataset(SENTIMENT_DATA_FILE, tokenizer, MAX_LEN)
+    loaders = {
+        "ner": DataLoader(ner_dataset, batch_sampler=LengthBucketSampler(ner_dataset.lengths, BATCH_SIZE, seed=SEED),
+                          collate_fn=partial(collate_dynamic, pad_token_id=tokenizer.pad_token_id)),
+        "sentiment": DataLoader(sentiment_dataset,
+                                batch_sampler=LengthBucketSampler(sentiment_dataset.lengths, BATCH_SIZE, seed=SEED),
+                                collate_fn=partial(collate_sentiment, pad_token_id=tokenizer.pad_token_id)),
+    }
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+    optimizer = AdamW(model.parameters(), lr=LEARNING_RATE)
+    rng = random.Random(SEED)
+
+    print(f"🔥 학습 시작! (Device: {device}, NER {len(ner_dataset)}문장, 분류 {len(sentiment_dataset)}건)")
+    model.train()
+    for epoch in range(EPOCHS):
+        # 두 과제의 배치 순서를 섞어서 번갈아 학습 (한 과제만 연달아 학습해 다른 쪽을 잊지 않도록)
+        schedule = [task for task, loader in loaders.items() for _ in range(len(loader))]
+        rng.shuffle(schedule)
+        iterators = {task: iter(loader) for task, loader in loaders.items()}
+        totals = dict.fromkeys(loaders, 0.0)
+
+        for task in schedule:
+            batch = {k: v.to(device) for k, v in next(iterators[task]).items()}
+            optimizer.zero_grad()
+            loss = model(**batch).loss
+            loss.backward()
+            optimizer.step()
+            totals[task] += loss.item()
+
+        losses = ", ".join(f"{task} {totals[task] / max(len(loaders[task]), 1):.4f}" for task in loaders)
+        print(f"  Epoch {epoch + 1}/{EPOCHS} - Loss: {losses}")
+
+    model.save_pretrained(save_path)
+    tokenizer.save_pretrained(os.path.join(MODEL_DIR, 'tokenizer'))
+    print(f"\n🎉 학습 완료! 멀티태스크 모델이 '{save_path}'에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    train()
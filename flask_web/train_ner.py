@@ -1,18 +1,20 @@
-import json
 import os
 import torch
-import numpy as np
-from torch.utils.data import Dataset, DataLoader
+from functools import partial
+from torch.utils.data import DataLoader
 from transformers import AutoTokenizer, ElectraForTokenClassification
 from torch.optim import AdamW
+from ner_dataset import load_or_build, LengthBucketSampler, collate_dynamic
 
 # --- 1. 설정 및 태그 정의 (ERP 폼 구조와 1:1 매핑) ---
 EPOCHS = 5
 LEARNING_RATE = 5e-5
 BATCH_SIZE = 2
+MAX_LEN = 128
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, '../models')
 DATA_FILE = os.path.join(BASE_DIR, 'train_data.json')
+BASE_MODEL = os.environ.get('NER_BASE_MODEL', 'monologg/koelectra-base-v3-discriminator')
 
 # [중요] 세분화된 태그 리스트 (총 31개)
 LABEL_LIST = [
@@ -23,53 +25,6 @@ LABEL_LIST = [
     "B-PRICE", "I-PRICE", "B-INCLUSION", "I-INCLUSION", "B-EXCLUSION", "I-EXCLUSION",
     "B-REFUND", "I-REFUND", "B-DATE", "I-DATE", "B-CITY", "I-CITY", "B-NOTE", "I-NOTE"
 ]
-LABEL2ID = {label: i for i, label in enumerate(LABEL_LIST)}
-
-
-class NERDataset(Dataset):
-    def __init__(self, data, tokenizer, max_len=128):
-        self.data = data
-        self.tokenizer = tokenizer
-        self.max_len = max_len
-
-    def __len__(self):
-        return len(self.data)
-
-    def __getitem__(self, index):
-        item = self.data[index]
-        text = item['text']
-        labels = item['labels']
-
-        words = text.split()
-        token_list = []
-        label_ids = []
-
-        for word, label in zip(words, labels):
-            word_tokens = self.tokenizer.tokenize(word)
-            if not word_tokens: continue
-            token_list.extend(word_tokens)
-            try:
-                label_ids.append(LABEL2ID[label])
-            except KeyError:
-                label_ids.append(0)  # 모르는 라벨은 'O' 처리
-            label_ids.extend([-100] * (len(word_tokens) - 1))
-
-        encoding = self.tokenizer.encode_plus(
-            token_list, max_length=self.max_len, padding='max_length',
-            truncation=True, is_split_into_words=True, return_tensors='pt'
-        )
-
-        pad_len = self.max_len - len(label_ids)
-        if pad_len > 0:
-            label_ids += [-100] * pad_len
-        else:
-            label_ids = label_ids[:self.max_len]
-
-        return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label_ids, dtype=torch.long)
-        }
 
 
 def train():
@@ -79,19 +34,18 @@ def train():
     ner_save_path = os.path.join(MODEL_DIR, 'koelectra_ner')
     if not os.path.exists(ner_save_path): os.makedirs(ner_save_path)
 
-    tokenizer = AutoTokenizer.from_pretrained("monologg/koelectra-base-v3-discriminator")
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
 
     # [핵심] num_labels를 31개로 설정하여 모델 초기화
     model = ElectraForTokenClassification.from_pretrained(
-        "monologg/koelectra-base-v3-discriminator",
+        BASE_MODEL,
         num_labels=len(LABEL_LIST)
     )
 
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        raw_data = json.load(f)
-
-    dataset = NERDataset(raw_data, tokenizer)
-    loader = DataLoader(dataset, batch_size=BATCH_SIZE, shuffle=True)
+    # 토크나이즈는 데이터/토크나이저가 바뀔 때만 (이후 에폭/실행은 mmap 캐시에서 바로 읽음)
+    dataset = load_or_build(DATA_FILE, tokenizer, MAX_LEN, LABEL_LIST)
+    loader = DataLoader(dataset, batch_sampler=LengthBucketSampler(dataset.lengths, BATCH_SIZE),
+                        collate_fn=partial(collate_dynamic, pad_token_id=tokenizer.pad_token_id))
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)